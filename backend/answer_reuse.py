@@ -0,0 +1,300 @@
+"""
+Answer Reuse Module
+Score reuse for near-identical answers to the same question
+Answers the LLM has evaluated are indexed per question with MinHash/LSH. A new
+answer close enough to earlier ones gets their LLM-judged technical and grammar
+scores, weighted by similarity, instead of any LLM call; the local scores and
+template feedback are still computed for the answer itself. Every reuse is
+written to an audit table, and a sample is re-evaluated in the background to
+measure the error
+"""
+
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Scores judged by the LLM, the only ones taken from other answers
+REUSED_SCORES = ('technical_score', 'grammar_score')
+
+# Scores compared when a reuse is verified
+VERIFIED_SCORES = ('technical_score', 'grammar_score', 'communication_score', 'confidence_score', 'overall_score')
+
+# Lower edges of the similarity buckets the accuracy report is split into
+SIMILARITY_BUCKETS = (0.5, 0.6, 0.7, 0.8, 0.9, 0.95)
+
+
+def similarity_bucket(similarity):
+    return max((edge for edge in SIMILARITY_BUCKETS if similarity >= edge), default=0.0)
+
+
+class AnswerScoreReuse:
+    def __init__(self, database, index, evaluate, complete, version, llm_calls, exact_similarity=0.95,
+                 max_neighbours=3, max_answers=200, verify_rate=0.05):
+        """
+        Args:
+            database: shared Database holding the answer_scores and score_reuse_audit tables
+            index: NearDuplicateIndex over answers; its threshold is the
+                similarity at which scores are reused
+            evaluate: callable(question, answer, expected_points, criteria)
+                running a real evaluation, used to verify sampled reuses
+            complete: callable(question, answer, expected_points, criteria,
+                technical_score, grammar_score) building the full evaluation of
+                an answer from reused scores without calling the LLM
+            version: evaluation prompt version and mode; scores from other
+                versions are never reused
+            llm_calls: LLM calls one evaluation makes in the configured mode,
+                to report the calls reuse avoids
+            exact_similarity: at or above this the closest answer's scores are
+                reused as they are, below it neighbours are interpolated
+            max_neighbours: neighbours interpolated
+            max_answers: evaluated answers kept per question; the oldest go first
+            verify_rate: fraction of reuses re-evaluated to measure the error
+        """
+        self.db = database
+        self.index = index
+        self.evaluate = evaluate
+        self.complete = complete
+        self.version = version
+        self.llm_calls = llm_calls
+        self.exact_similarity = exact_similarity
+        self.max_neighbours = max_neighbours
+        self.max_answers = max_answers
+        self.verify_rate = verify_rate
+        
+        # One thread: verification is sampled and never on a request's path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='answer-reuse-verify')
+        
+        self._lock = threading.Lock()
+        self._stats = {
+            'lookups': 0,
+            'reused': 0,
+            'interpolated': 0,
+            'recorded': 0,
+            'skipped_degraded': 0,
+            'evicted': 0,
+            'verify_runs': 0,
+            'verified': 0,
+            'overall_error': 0.0,
+            'max_overall_error': 0.0
+        }
+        self._buckets = {}  # similarity bucket -> {'reuses', 'verified', 'error'}
+        
+        self._init_tables()
+    
+    def _init_tables(self):
+        with self.db.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS answer_scores (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    question_key TEXT NOT NULL,
+                    technical_score REAL NOT NULL,
+                    communication_score REAL NOT NULL,
+                    confidence_score REAL NOT NULL,
+                    feedback TEXT,
+                    created_at REAL NOT NULL,
+                    grammar_score REAL
+                )
+            ''')
+            try:
+                conn.execute('ALTER TABLE answer_scores ADD COLUMN grammar_score REAL')
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_answer_scores_question ON answer_scores (question_key)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS score_reuse_audit (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    question_key TEXT NOT NULL,
+                    answer_hash TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    neighbours TEXT NOT NULL,
+                    scores TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    verified_scores TEXT,
+                    overall_error REAL
+                )
+            ''')
+    
+    def question_key(self, question, expected_points):
+        normalized = re.sub(r'\s+', ' ', question or '').strip().lower()
+        payload = json.dumps({'version': self.version, 'question': normalized, 'expected_points': expected_points},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def lookup(self, question, answer, expected_points, criteria):
+        """
+        Scores for an answer from near-identical evaluated answers, or None
+        
+        Only the technical and grammar scores come from the neighbours; the
+        rest of the result, feedback included, is built for this answer by
+        complete(). The result carries a 'score_reuse' entry with the method,
+        similarity and audit row id.
+        """
+        key = self.question_key(question, expected_points)
+        neighbours = self.index.neighbours(key, answer, limit=self.max_neighbours)
+        self._count('lookups')
+        if not neighbours:
+            return None
+        
+        ids = [item_id for item_id, _ in neighbours]
+        with self.db.connection() as conn:
+            rows = conn.execute(f'''
+                SELECT id, technical_score, grammar_score
+                FROM answer_scores WHERE id IN ({','.join('?' * len(ids))}) AND grammar_score IS NOT NULL
+            ''', ids).fetchall()
+        found = {row[0]: row for row in rows}
+        neighbours = [(item_id, similarity) for item_id, similarity in neighbours if item_id in found]
+        if not neighbours:
+            return None
+        
+        top_similarity = neighbours[0][1]
+        if top_similarity >= self.exact_similarity:
+            method = 'reused'
+            neighbours = neighbours[:1]
+        else:
+            method = 'interpolated'
+        
+        total = sum(similarity for _, similarity in neighbours)
+        reused = {
+            name: sum(found[item_id][position + 1] * similarity for item_id, similarity in neighbours) / total
+            for position, name in enumerate(REUSED_SCORES)
+        }
+        result = self.complete(
+            question, answer, expected_points, criteria, reused['technical_score'], reused['grammar_score']
+        )
+        scores = {name: result[name] for name in VERIFIED_SCORES}
+        
+        with self.db.connection() as conn:
+            cursor = conn.execute('''
+                INSERT INTO score_reuse_audit (question_key, answer_hash, method, neighbours, scores, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                key,
+                hashlib.sha256(answer.encode('utf-8')).hexdigest(),
+                method,
+                json.dumps([[item_id, similarity] for item_id, similarity in neighbours]),
+                json.dumps(scores),
+                time.time()
+            ))
+            audit_id = cursor.lastrowid
+        
+        bucket = similarity_bucket(top_similarity)
+        with self._lock:
+            self._stats[method] += 1
+            self._buckets.setdefault(bucket, {'reuses': 0, 'verified': 0, 'error': 0.0})['reuses'] += 1
+        
+        if random.random() < self.verify_rate:
+            self._count('verify_runs')
+            self._executor.submit(self._verify, audit_id, bucket, question, answer, expected_points, criteria, scores)
+        
+        result['score_reuse'] = {'method': method, 'similarity': top_similarity, 'audit_id': audit_id}
+        return result
+    
+    def record(self, question, answer, expected_points, result):
+        """
+        Index an answer the LLM evaluated, dropping the question's oldest answers over max_answers
+        
+        Degraded results, where defaults stood in for failed LLM calls, are
+        not recorded so they never spread to other answers.
+        """
+        if result.get('degraded') or 'grammar_score' not in result:
+            self._count('skipped_degraded')
+            return
+        
+        key = self.question_key(question, expected_points)
+        try:
+            with self.db.connection() as conn:
+                cursor = conn.execute('''
+                    INSERT INTO answer_scores (question_key, technical_score, grammar_score,
+                                               communication_score, confidence_score, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (
+                    key, result['technical_score'], result['grammar_score'],
+                    result['communication_score'], result['confidence_score'], time.time()
+                ))
+                answer_id = cursor.lastrowid
+                self.index.add(key, answer_id, answer)
+                
+                evicted = [row[0] for row in conn.execute('''
+                    SELECT id FROM answer_scores WHERE question_key = ?
+                    ORDER BY id DESC LIMIT -1 OFFSET ?
+                ''', (key, self.max_answers)).fetchall()]
+                for old_id in evicted:
+                    conn.execute('DELETE FROM answer_scores WHERE id = ?', (old_id,))
+                    self.index.remove(key, old_id)
+        except Exception as e:
+            print(f"Error recording answer scores: {str(e)}")
+            return
+        
+        self._count('recorded')
+        self._count('evicted', len(evicted))
+    
+    def _verify(self, audit_id, bucket, question, answer, expected_points, criteria, scores):
+        """Evaluate a reused answer for real and record how far off the reuse was"""
+        try:
+            result = self.evaluate(question, answer, expected_points, criteria)
+            result.pop('timings', None)
+            if result.get('degraded'):
+                return  # defaults are no yardstick
+            error = abs(result['overall_score'] - scores['overall_score'])
+            
+            with self.db.connection() as conn:
+                conn.execute('''
+                    UPDATE score_reuse_audit SET verified_scores = ?, overall_error = ? WHERE id = ?
+                ''', (json.dumps({name: result[name] for name in VERIFIED_SCORES}),
+                      error, audit_id))
+            
+            # The real evaluation is as good a neighbour as any
+            self.record(question, answer, expected_points, result)
+        except Exception as e:
+            print(f"Error verifying reused score: {str(e)}")
+            return
+        
+        with self._lock:
+            self._stats['verified'] += 1
+            self._stats['overall_error'] += error
+            self._stats['max_overall_error'] = max(self._stats['max_overall_error'], error)
+            totals = self._buckets[bucket]
+            totals['verified'] += 1
+            totals['error'] += error
+    
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+    
+    def get_stats(self):
+        """
+        Savings and accuracy of score reuse
+        
+        llm_calls_saved is the evaluation calls reuse avoided, less those spent
+        re-evaluating sampled reuses. by_similarity splits reuses by the closest answer's similarity, with the
+        mean absolute overall-score error of the verified ones, to show where
+        the threshold can sit.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            buckets = {edge: dict(totals) for edge, totals in sorted(self._buckets.items())}
+        
+        reuses = stats['reused'] + stats['interpolated']
+        stats['threshold'] = self.index.threshold
+        stats['exact_similarity'] = self.exact_similarity
+        stats['llm_calls_per_evaluation'] = self.llm_calls
+        stats['llm_calls_saved'] = (reuses - stats['verify_runs']) * self.llm_calls
+        stats['reuse_rate'] = round(reuses / stats['lookups'], 4) if stats['lookups'] else 0
+        overall_error = stats.pop('overall_error')
+        stats['mean_overall_error'] = round(overall_error / stats['verified'], 2) if stats['verified'] else None
+        stats['max_overall_error'] = round(stats['max_overall_error'], 2)
+        stats['by_similarity'] = {
+            f"{edge:.2f}": {
+                'reuses': totals['reuses'],
+                'verified': totals['verified'],
+                'mean_overall_error': round(totals['error'] / totals['verified'], 2) if totals['verified'] else None
+            }
+            for edge, totals in buckets.items()
+        }
+        return stats
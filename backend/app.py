@@ -1,26 +1,22 @@
 # app.py
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, make_response, Response, stream_with_context, g
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash, check_password_hash
 import os
 import jwt
 from functools import wraps
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from groq import Groq
-import PyPDF2
 import hashlib
 import sqlite3
 from pathlib import Path
 import json
 import pyotp
-import qrcode
-import io
-import base64
 import smtplib
 from email.mime.text import MIMEText
 import secrets
 import time
+import threading
 from cryptography.fernet import Fernet
 from dotenv import load_dotenv
 
@@ -28,7 +24,24 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import new modules
-from evaluation_engine import EvaluationEngine
+from evaluation_engine import EvaluationEngine, EVALUATION_MODEL, LLM_CALLS_PER_EVALUATION, PROMPT_VERSION
+from database import Database
+from evaluation_cache import EvaluationCache
+from llm_gateway import LLMGateway, LLM_ERRORS
+from job_queue import JobQueue, PermanentJobError
+from rate_limiter import RateLimiter
+from audit_writer import AuditLogWriter
+from risk_signals import RiskSignalStore
+from auth_workers import AuthWorkerPool, AuthWorkersBusy
+from authorization_cache import AuthorizationCache
+from resume_store import ResumeStore
+from pdf_extractor import PDFExtractor
+from resume_condenser import ResumeCondenser
+from question_bank import QuestionBank
+from near_duplicates import NearDuplicateIndex
+from answer_reuse import AnswerScoreReuse
+import json_repair
+from query_plans import INDEXES, check_query_plans, report as report_query_plans
 from improvement_generator import ImprovementPlanGenerator
 
 app = Flask(__name__)
@@ -51,6 +64,75 @@ app.config['DATABASE'] = 'interview_system.db'
 app.config['GROQ_API_KEY'] = os.environ.get('GROQ_API_KEY', '')
 app.config['JWT_EXPIRATION_HOURS'] = 24
 
+# Pooled SQLite connections: idle connections kept open and how long writers wait for a lock
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 16))
+app.config['DB_BUSY_TIMEOUT_MS'] = int(os.environ.get('DB_BUSY_TIMEOUT_MS', 5000))
+
+# Shared LLM gateway: global cap on in-flight completions and pooled connections
+app.config['LLM_MAX_CONCURRENCY'] = int(os.environ.get('LLM_MAX_CONCURRENCY', 16))
+app.config['LLM_MAX_CONNECTIONS'] = int(os.environ.get('LLM_MAX_CONNECTIONS', 32))
+
+# Answer evaluation mode: 'serial', 'concurrent' or 'fused' (see evaluation_engine.EVALUATION_MODES)
+app.config['EVALUATION_MODE'] = os.environ.get('EVALUATION_MODE', 'fused')
+# Per-dimension mode used when a fused evaluation fails
+app.config['EVALUATION_FALLBACK_MODE'] = os.environ.get('EVALUATION_FALLBACK_MODE', 'concurrent')
+app.config['EVALUATION_MAX_WORKERS'] = int(os.environ.get('EVALUATION_MAX_WORKERS', 8))
+# Weight (0-1) of the local expected-point coverage score in the technical score
+app.config['TECHNICAL_COVERAGE_BLEND'] = float(os.environ.get('TECHNICAL_COVERAGE_BLEND', 0.0))
+app.config['EVALUATION_CACHE_SIZE'] = int(os.environ.get('EVALUATION_CACHE_SIZE', 1024))
+app.config['EVALUATION_CACHE_TTL'] = int(os.environ.get('EVALUATION_CACHE_TTL', 604800))  # 7 days in seconds
+# Start generating the follow-up from a local pre-score while the answer is being evaluated
+app.config['SPECULATIVE_FOLLOWUP'] = os.environ.get('SPECULATIVE_FOLLOWUP', 'true').lower() == 'true'
+app.config['FOLLOWUP_MAX_WORKERS'] = int(os.environ.get('FOLLOWUP_MAX_WORKERS', 4))
+# Generate every round's questions when a multi-round interview is created
+app.config['ROUND_PREFETCH'] = os.environ.get('ROUND_PREFETCH', 'true').lower() == 'true'
+app.config['ROUND_PREFETCH_WORKERS'] = int(os.environ.get('ROUND_PREFETCH_WORKERS', 4))
+# Seconds start_round waits for a prefetch that is already running before generating on demand
+app.config['ROUND_PREFETCH_WAIT'] = float(os.environ.get('ROUND_PREFETCH_WAIT', 30))
+# Round questions are drawn from per-role pools that are only topped up by the LLM
+app.config['QUESTION_BANK'] = os.environ.get('QUESTION_BANK', 'true').lower() == 'true'
+app.config['QUESTION_BANK_POOL_TARGET'] = int(os.environ.get('QUESTION_BANK_POOL_TARGET', 25))
+app.config['QUESTION_BANK_MAX_POOL'] = int(os.environ.get('QUESTION_BANK_MAX_POOL', 100))
+app.config['QUESTION_BANK_REFILL_BATCH'] = int(os.environ.get('QUESTION_BANK_REFILL_BATCH', 10))
+app.config['QUESTION_BANK_REFILL_COOLDOWN'] = int(os.environ.get('QUESTION_BANK_REFILL_COOLDOWN', 60))
+app.config['ROUND_SUGGESTION_TTL'] = int(os.environ.get('ROUND_SUGGESTION_TTL', 86400))  # 1 day in seconds
+# Estimated Jaccard similarity of word shingles at which two questions are paraphrases
+app.config['NEAR_DUPLICATE_THRESHOLD'] = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.5))
+# Answers at least ANSWER_REUSE_THRESHOLD similar to evaluated answers to the same question
+# take their scores instead of an LLM evaluation; ANSWER_REUSE_EXACT and above copy the
+# closest answer's scores, below it the nearest ANSWER_REUSE_NEIGHBOURS are interpolated
+app.config['ANSWER_REUSE'] = os.environ.get('ANSWER_REUSE', 'true').lower() == 'true'
+app.config['ANSWER_REUSE_THRESHOLD'] = float(os.environ.get('ANSWER_REUSE_THRESHOLD', 0.8))
+app.config['ANSWER_REUSE_EXACT'] = float(os.environ.get('ANSWER_REUSE_EXACT', 0.95))
+app.config['ANSWER_REUSE_NEIGHBOURS'] = int(os.environ.get('ANSWER_REUSE_NEIGHBOURS', 3))
+app.config['ANSWER_REUSE_MAX_PER_QUESTION'] = int(os.environ.get('ANSWER_REUSE_MAX_PER_QUESTION', 200))
+# Fraction of reused scores re-evaluated in the background to measure their error
+app.config['ANSWER_REUSE_VERIFY_RATE'] = float(os.environ.get('ANSWER_REUSE_VERIFY_RATE', 0.05))
+
+# Resume text extraction budget; files of PDF_POOL_MIN_BYTES or more are parsed in a
+# worker process that is killed after PDF_TIMEOUT seconds, at most PDF_WORKERS at once
+app.config['RESUME_MAX_CHARS'] = int(os.environ.get('RESUME_MAX_CHARS', 12000))
+app.config['RESUME_MAX_PAGES'] = int(os.environ.get('RESUME_MAX_PAGES', 10))
+app.config['RESUME_MAX_BYTES'] = int(os.environ.get('RESUME_MAX_BYTES', 10485760))  # 10 MB
+app.config['PDF_POOL_MIN_BYTES'] = int(os.environ.get('PDF_POOL_MIN_BYTES', 524288))  # 512 KB
+app.config['PDF_WORKERS'] = int(os.environ.get('PDF_WORKERS', 1))
+app.config['PDF_TIMEOUT'] = float(os.environ.get('PDF_TIMEOUT', 15))
+# Estimated tokens of resume text placed in the generate_questions prompt after condensing
+app.config['RESUME_PROMPT_TOKENS'] = int(os.environ.get('RESUME_PROMPT_TOKENS', 1000))
+# Follow-up calls asking only for the questions missing from a partially valid generation
+app.config['QUESTION_TOPUP_ATTEMPTS'] = int(os.environ.get('QUESTION_TOPUP_ATTEMPTS', 2))
+
+# Re-uploads of the same resume: question sets are reused 'never', for the 'same_user' or 'always'
+app.config['QUESTION_SET_REUSE'] = os.environ.get('QUESTION_SET_REUSE', 'same_user')
+app.config['QUESTION_SET_TTL'] = int(os.environ.get('QUESTION_SET_TTL', 604800))  # 7 days in seconds
+
+# Background jobs: worker threads and whether /api/submit-answer-enhanced queues by default
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 4))
+app.config['JOB_STREAM_TIMEOUT'] = 300  # seconds an SSE job stream stays open
+app.config['ASYNC_ANSWER_EVALUATION'] = os.environ.get('ASYNC_ANSWER_EVALUATION', 'false').lower() == 'true'
+# Whether /api/upload-resume extracts, condenses and generates questions in a background job
+app.config['ASYNC_RESUME_PROCESSING'] = os.environ.get('ASYNC_RESUME_PROCESSING', 'true').lower() == 'true'
+
 # ============ ZERO TRUST ARCHITECTURE CONFIGURATION ============
 # Token expiry times
 app.config['ACCESS_TOKEN_EXPIRY'] = 900  # 15 minutes in seconds
@@ -69,9 +151,20 @@ RATE_LIMITS = {
     'submit_answer': {'requests': 100, 'window': 3600},  # 100 per hour
     'default': {'requests': 1000, 'window': 3600}  # 1000 per hour
 }
+app.config['RATE_LIMIT_FLUSH_INTERVAL'] = float(os.environ.get('RATE_LIMIT_FLUSH_INTERVAL', 30))  # seconds between snapshots
+
+# Write-behind audit logging: queued events are inserted in batches
+app.config['AUDIT_QUEUE_SIZE'] = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
+app.config['AUDIT_BATCH_SIZE'] = int(os.environ.get('AUDIT_BATCH_SIZE', 200))
+app.config['AUDIT_FLUSH_INTERVAL_MS'] = int(os.environ.get('AUDIT_FLUSH_INTERVAL_MS', 250))
 
 # Session management
 app.config['MAX_CONCURRENT_SESSIONS'] = 3
+app.config['TOTP_SETUP_TOKEN_EXPIRY'] = 900  # seconds a registration may fetch its QR code
+
+# Worker processes for password hashing and QR rendering; 0 runs them inline
+app.config['AUTH_WORKERS'] = int(os.environ.get('AUTH_WORKERS', 2))
+app.config['AUTH_WORKER_TIMEOUT'] = float(os.environ.get('AUTH_WORKER_TIMEOUT', 10))
 
 # Ensure upload directory exists
 Path(app.config['UPLOAD_FOLDER']).mkdir(exist_ok=True)
@@ -80,9 +173,29 @@ Path(app.config['UPLOAD_FOLDER']).mkdir(exist_ok=True)
 sqlite3.register_adapter(datetime, lambda val: val.isoformat())
 sqlite3.register_converter("TIMESTAMP", lambda val: datetime.fromisoformat(val.decode()))
 
+# Shared connection pool used for every database access in the app
+db = Database(
+    app.config['DATABASE'],
+    pool_size=app.config['DB_POOL_SIZE'],
+    busy_timeout_ms=app.config['DB_BUSY_TIMEOUT_MS']
+)
+
+# Started here, before any background thread, because their workers are forked
+auth_workers = AuthWorkerPool(app.config['AUTH_WORKERS'], timeout=app.config['AUTH_WORKER_TIMEOUT'])
+auth_workers.start()
+
+pdf_extractor = PDFExtractor(
+    max_chars=app.config['RESUME_MAX_CHARS'],
+    max_pages=app.config['RESUME_MAX_PAGES'],
+    max_bytes=app.config['RESUME_MAX_BYTES'],
+    pool_min_bytes=app.config['PDF_POOL_MIN_BYTES'],
+    workers=app.config['PDF_WORKERS'],
+    timeout=app.config['PDF_TIMEOUT']
+)
+
 # Database initialization
 def init_db():
-    with sqlite3.connect(app.config['DATABASE']) as conn:
+    with db.connection() as conn:
         conn.execute('''
             CREATE TABLE IF NOT EXISTS users (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -116,24 +229,24 @@ def init_db():
                 FOREIGN KEY (interview_id) REFERENCES interviews (id)
             )
         ''')
-
+        
         # Add new columns if they do not exist
         try:
             conn.execute("ALTER TABLE users ADD COLUMN totp_secret TEXT;")
         except sqlite3.OperationalError:
             pass  # Column already exists
-
+        
         try:
             conn.execute("ALTER TABLE users ADD COLUMN totp_verified BOOLEAN DEFAULT FALSE;")
         except sqlite3.OperationalError:
             pass  # Column already exists
-
+        
 
         try:
             conn.execute("ALTER TABLE interviews ADD COLUMN violations INTEGER DEFAULT 0;")
         except sqlite3.OperationalError:
             pass
-
+        
         try:
             conn.execute("ALTER TABLE interviews ADD COLUMN violation_summary TEXT DEFAULT '';")
         except sqlite3.OperationalError:
@@ -182,6 +295,12 @@ def init_db():
         except sqlite3.OperationalError:
             pass
         
+        # Set by start-multi-round-interview
+        try:
+            conn.execute("ALTER TABLE interviews ADD COLUMN status TEXT;")
+        except sqlite3.OperationalError:
+            pass
+        
         try:
             conn.execute("ALTER TABLE interviews ADD COLUMN completed_at TIMESTAMP;")
         except sqlite3.OperationalError:
@@ -258,7 +377,7 @@ def init_db():
             )
         ''')
         
-        
+
         # Interview rounds table for multi-round interviews
         conn.execute('''
             CREATE TABLE IF NOT EXISTS interview_rounds (
@@ -315,6 +434,17 @@ def init_db():
         except sqlite3.OperationalError:
             pass
         
+        # Questions generated ahead of time for multi-round interviews
+        try:
+            conn.execute("ALTER TABLE interview_rounds ADD COLUMN prefetch_status TEXT;")
+        except sqlite3.OperationalError:
+            pass
+        
+        try:
+            conn.execute("ALTER TABLE interview_rounds ADD COLUMN prefetched_questions TEXT;")
+        except sqlite3.OperationalError:
+            pass
+        
         # Create custom_roles table for user-created interview roles
         conn.execute('''
             CREATE TABLE IF NOT EXISTS custom_roles (
@@ -406,6 +536,17 @@ def init_db():
             )
         ''')
         
+        # Token-bucket snapshot columns written by RateLimiter.flush
+        try:
+            conn.execute("ALTER TABLE rate_limits ADD COLUMN tokens REAL;")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        
+        try:
+            conn.execute("ALTER TABLE rate_limits ADD COLUMN updated_at REAL;")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        
         # User sessions table for session management
         conn.execute('''
             CREATE TABLE IF NOT EXISTS user_sessions (
@@ -438,91 +579,67 @@ def init_db():
                 FOREIGN KEY (granted_by) REFERENCES users (id)
             )
         ''')
-        
-        
-        
+    
+    # Secondary indexes for the hot access paths (see query_plans.HOT_QUERIES)
+    created, dropped = db.ensure_indexes(INDEXES)
+    if created or dropped:
+        print(f"Database indexes created: {created}, dropped: {dropped}")
+
+
 init_db()
 
+# In-memory token buckets for the rate_limit decorator, snapshotted to rate_limits
+rate_limiter = RateLimiter(db, RATE_LIMITS, flush_interval=app.config['RATE_LIMIT_FLUSH_INTERVAL'])
+rate_limiter.start()
+
+# Background writer behind log_audit
+audit_writer = AuditLogWriter(
+    db,
+    max_queue=app.config['AUDIT_QUEUE_SIZE'],
+    batch_size=app.config['AUDIT_BATCH_SIZE'],
+    flush_interval_ms=app.config['AUDIT_FLUSH_INTERVAL_MS']
+)
+audit_writer.start()
+
+# Sliding-window login risk counters fed by log_audit, restored from audit_logs on startup
+risk_signals = RiskSignalStore(db)
+risk_signals.rebuild()
+
+# Role/permission lookups for require_role; access tokens carry the same data as claims
+authorization_cache = AuthorizationCache(db, token_lifetime=app.config['ACCESS_TOKEN_EXPIRY'])
+
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Fail if any hot query falls back to a full table scan or is missing from the source"""
+    with db.connection() as conn:
+        failures = report_query_plans(check_query_plans(conn))
+    if failures:
+        raise SystemExit(1)
+
 
 # ============ ZERO TRUST ARCHITECTURE HELPER FUNCTIONS ============
 
 def log_audit(user_id, action, resource=None, resource_id=None, details=None, success=True):
-    """Log security-relevant actions to audit log"""
+    """Log security-relevant actions to audit log (written in the background by audit_writer)"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO audit_logs (user_id, action, resource, resource_id, ip_address, user_agent, details, success)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                user_id,
-                action,
-                resource,
-                resource_id,
-                request.remote_addr,
-                request.headers.get('User-Agent', ''),
-                details,
-                success
-            ))
+        audit_writer.log((
+            user_id,
+            action,
+            resource,
+            resource_id,
+            request.remote_addr,
+            request.headers.get('User-Agent', ''),
+            details,
+            success,
+            # Same format as CURRENT_TIMESTAMP, so datetime('now', ...) comparisons keep working
+            datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        ))
+        risk_signals.record(user_id, action, request.remote_addr)
     except Exception as e:
         print(f"Audit logging error: {str(e)}")
 
 
-def check_rate_limit(identifier, endpoint='default'):
-    """Check if request is within rate limit"""
-    limit_config = RATE_LIMITS.get(endpoint, RATE_LIMITS['default'])
-    max_requests = limit_config['requests']
-    window_seconds = limit_config['window']
-    
-    try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
-            cursor = conn.cursor()
-            
-            # Get current rate limit record
-            cursor.execute('''
-                SELECT request_count, window_start FROM rate_limits
-                WHERE identifier = ? AND endpoint = ?
-            ''', (identifier, endpoint))
-            
-            record = cursor.fetchone()
-            current_time = datetime.now()
-            
-            if record:
-                count, window_start = record
-                window_start = datetime.fromisoformat(window_start)
-                
-                # Check if window has expired
-                if (current_time - window_start).total_seconds() > window_seconds:
-                    # Reset window
-                    cursor.execute('''
-                        UPDATE rate_limits
-                        SET request_count = 1, window_start = ?
-                        WHERE identifier = ? AND endpoint = ?
-                    ''', (current_time, identifier, endpoint))
-                    return True
-                elif count < max_requests:
-                    # Increment count
-                    cursor.execute('''
-                        UPDATE rate_limits
-                        SET request_count = request_count + 1
-                        WHERE identifier = ? AND endpoint = ?
-                    ''', (identifier, endpoint))
-                    return True
-                else:
-                    # Rate limit exceeded
-                    return False
-            else:
-                # Create new record
-                cursor.execute('''
-                    INSERT INTO rate_limits (identifier, endpoint, request_count, window_start)
-                    VALUES (?, ?, 1, ?)
-                ''', (identifier, endpoint, current_time))
-                return True
-    except Exception as e:
-        print(f"Rate limit check error: {str(e)}")
-        return True  # Allow on error to avoid blocking legitimate users
-
-
 def rate_limit(endpoint='default'):
     """Decorator for rate limiting endpoints"""
     def decorator(f):
@@ -533,18 +650,25 @@ def rate_limit(endpoint='default'):
             if hasattr(request, 'user_id'):
                 identifier = f"user_{request.user_id}"
             
-            if not check_rate_limit(identifier, endpoint):
+            result = rate_limiter.check(identifier, endpoint)
+            if not result['allowed']:
                 log_audit(
                     getattr(request, 'user_id', None),
                     'rate_limit_exceeded',
                     endpoint,
                     None,
-                    f"Exceeded {RATE_LIMITS[endpoint]['requests']} requests",
+                    f"Exceeded {result['limit']} requests",
                     False
                 )
-                return jsonify({'error': 'Rate limit exceeded. Please try again later.'}), 429
+                response = make_response(jsonify({'error': 'Rate limit exceeded. Please try again later.'}), 429)
+                response.headers['Retry-After'] = str(result['retry_after'])
+            else:
+                response = make_response(f(*args, **kwargs))
             
-            return f(*args, **kwargs)
+            response.headers['X-RateLimit-Limit'] = str(result['limit'])
+            response.headers['X-RateLimit-Remaining'] = str(result['remaining'])
+            response.headers['X-RateLimit-Reset'] = str(result['reset'])
+            return response
         return decorated_function
     return decorator
 
@@ -566,13 +690,24 @@ def decrypt_data(encrypted_data):
         return encrypted_data  # Return as-is if decryption fails (for backward compatibility)
 
 
-def generate_tokens(user_id):
-    """Generate access and refresh tokens"""
+def generate_tokens(user_id, authorization=None):
+    """
+    Generate access and refresh tokens
+    
+    authorization is the user's {'role', 'permissions'}, embedded in the access
+    token so require_role needs no query; it is looked up when not given.
+    """
+    authorization = authorization or authorization_cache.get(user_id)
+    now = datetime.now(timezone.utc)
+    
     # Access token (short-lived)
     access_payload = {
         'user_id': user_id,
         'type': 'access',
-        'exp': datetime.now(timezone.utc) + timedelta(seconds=app.config['ACCESS_TOKEN_EXPIRY'])
+        'role': authorization['role'],
+        'permissions': authorization['permissions'],
+        'iat': now,
+        'exp': now + timedelta(seconds=app.config['ACCESS_TOKEN_EXPIRY'])
     }
     access_token = jwt.encode(access_payload, app.config['SECRET_KEY'], algorithm='HS256')
     
@@ -587,7 +722,7 @@ def generate_tokens(user_id):
     
     # Store refresh token in database
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             expires_at = datetime.now(timezone.utc) + timedelta(seconds=app.config['REFRESH_TOKEN_EXPIRY'])
             device_id = request.headers.get('X-Device-ID', 'unknown')
@@ -609,32 +744,44 @@ def generate_tokens(user_id):
     return access_token, refresh_token
 
 
+def decode_token(token, token_type):
+    """
+    Decode a JWT signed with SECRET_KEY, accepting only the given 'type' claim
+    
+    Every token the server issues carries a type ('access', 'refresh',
+    'totp_setup' or 'password_reset'), so none can stand in for another.
+    
+    Raises:
+        jwt.InvalidTokenError: bad signature, expired, or another type
+    """
+    data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+    if data.get('type') != token_type:
+        raise jwt.InvalidTokenError(f'not a {token_type} token')
+    return data
+
+
 def create_session(user_id):
     """Create a new user session"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
-            # Check concurrent sessions limit
+            # Enforce concurrent sessions limit: revoke the oldest session
+            # if the user is already at the limit, in a single statement
             cursor.execute('''
-                SELECT COUNT(*) FROM user_sessions
-                WHERE user_id = ? AND active = TRUE AND expires_at > ?
-            ''', (user_id, datetime.now(timezone.utc)))
-            
-            active_sessions = cursor.fetchone()[0]
-            
-            if active_sessions >= app.config['MAX_CONCURRENT_SESSIONS']:
-                # Revoke oldest session
-                cursor.execute('''
-                    UPDATE user_sessions
-                    SET active = FALSE
-                    WHERE id = (
-                        SELECT id FROM user_sessions
-                        WHERE user_id = ? AND active = TRUE
-                        ORDER BY created_at ASC
-                        LIMIT 1
-                    )
-                ''', (user_id,))
+                UPDATE user_sessions
+                SET active = FALSE
+                WHERE id = (
+                    SELECT id FROM user_sessions
+                    WHERE user_id = ? AND active = TRUE
+                    ORDER BY created_at ASC
+                    LIMIT 1
+                )
+                AND (
+                    SELECT COUNT(*) FROM user_sessions
+                    WHERE user_id = ? AND active = TRUE AND expires_at > ?
+                ) >= ?
+            ''', (user_id, user_id, datetime.now(timezone.utc), app.config['MAX_CONCURRENT_SESSIONS']))
             
             # Create new session
             session_id = secrets.token_urlsafe(32)
@@ -676,34 +823,29 @@ def get_device_fingerprint():
 def assign_default_role(user_id):
     """Assign default 'candidate' role to new user"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO user_roles (user_id, role, permissions)
                 VALUES (?, 'candidate', ?)
             ''', (user_id, json.dumps(['take_interview', 'view_own_results'])))
+        authorization_cache.invalidate(user_id)
     except Exception as e:
         print(f"Error assigning default role: {str(e)}")
 
 
 def get_user_role(user_id):
     """Get user's role"""
-    try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT role FROM user_roles WHERE user_id = ?', (user_id,))
-            result = cursor.fetchone()
-            return result[0] if result else 'candidate'
-    except:
-        return 'candidate'
+    return authorization_cache.get(user_id)['role']
 
 
 def require_role(*allowed_roles):
-    """Decorator to check if user has required role"""
+    """Decorator to check if user has required role; apply it below token_required"""
     def decorator(f):
         @wraps(f)
         def decorated_function(current_user_id, *args, **kwargs):
-            user_role = get_user_role(current_user_id)
+            # Claims of the token token_required just verified, else the cache
+            user_role = authorization_cache.resolve(current_user_id, g.get('token_claims'))['role']
             if user_role not in allowed_roles:
                 log_audit(current_user_id, 'unauthorized_access', f.__name__, None, 
                          f"Required role: {allowed_roles}, has: {user_role}", False)
@@ -716,51 +858,30 @@ def require_role(*allowed_roles):
 def check_suspicious_activity(user_id):
     """Detect suspicious behavior patterns"""
     risk_score = 0
+    signals = risk_signals.get_signals(user_id)
     
-    try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
-            cursor = conn.cursor()
-            
-            # Check 1: Multiple failed logins in last hour
-            cursor.execute('''
-                SELECT COUNT(*) FROM audit_logs
-                WHERE user_id = ? AND action = 'login_failed'
-                AND timestamp > datetime('now', '-1 hour')
-            ''', (user_id,))
-            failed_logins = cursor.fetchone()[0]
-            if failed_logins > 3:
-                risk_score += 30
-            
-            # Check 2: Login from new location (different IP)
-            cursor.execute('''
-                SELECT DISTINCT ip_address FROM audit_logs
-                WHERE user_id = ? AND action = 'login_success'
-                ORDER BY timestamp DESC LIMIT 5
-            ''', (user_id,))
-            recent_ips = [row[0] for row in cursor.fetchall()]
-            current_ip = request.remote_addr
-            
-            if current_ip not in recent_ips and len(recent_ips) > 0:
-                risk_score += 20  # New location
-            
-            # Check 3: Rapid API calls (potential bot)
-            cursor.execute('''
-                SELECT COUNT(*) FROM audit_logs
-                WHERE user_id = ? AND timestamp > datetime('now', '-5 minutes')
-            ''', (user_id,))
-            recent_actions = cursor.fetchone()[0]
-            if recent_actions > 50:
-                risk_score += 40  # Too many actions
-            
-            return min(risk_score, 100)
-    except:
-        return 0
+    # Check 1: Multiple failed logins in last hour
+    if signals['failed_logins'] > 3:
+        risk_score += 30
+    
+    # Check 2: Login from new location (different IP)
+    recent_ips = signals['recent_ips']
+    current_ip = request.remote_addr
+    
+    if current_ip not in recent_ips and len(recent_ips) > 0:
+        risk_score += 20  # New location
+    
+    # Check 3: Rapid API calls (potential bot)
+    if signals['recent_actions'] > 50:
+        risk_score += 40  # Too many actions
+    
+    return min(risk_score, 100)
 
 
 def cleanup_old_data():
     """Delete old data based on retention policy (30 days default)"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Delete old audit logs (keep 90 days)
@@ -792,69 +913,70 @@ def cleanup_old_data():
         print(f"Error cleaning up data: {str(e)}")
 
 
-def generate_personalized_feedback(interview_id):
-    """Generate personalized feedback with strengths, weaknesses, and learning path"""
-    try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
-            cursor = conn.cursor()
-            
-            # Get interview data
-            cursor.execute('''
-                SELECT job_role, score FROM interviews WHERE id = ?
-            ''', (interview_id,))
-            interview_data = cursor.fetchone()
-            
-            if not interview_data:
-                return None
-            
-            job_role, overall_score = interview_data
-            
-            # Get all questions and answers with scores
-            cursor.execute('''
-                SELECT question, answer, score, technical_score, communication_score, 
-                       confidence_score, feedback, question_type
-                FROM interview_questions
-                WHERE interview_id = ?
-                ORDER BY id
-            ''', (interview_id,))
-            questions_data = cursor.fetchall()
-            
-            # Prepare data for LLM analysis
-            performance_summary = {
-                'overall_score': overall_score or 0,
-                'job_role': job_role,
-                'questions': []
-            }
+def _personalized_feedback_messages(cursor, interview_id):
+    """
+    Build the chat messages for personalized feedback from the interview's scored answers
+    
+    Returns:
+        list of messages, or None if the interview does not exist
+    """
+    # Get interview data
+    cursor.execute('''
+        SELECT job_role, score FROM interviews WHERE id = ?
+    ''', (interview_id,))
+    interview_data = cursor.fetchone()
+    
+    if not interview_data:
+        return None
+    
+    job_role, overall_score = interview_data
+    
+    # Get all questions and answers with scores
+    cursor.execute('''
+        SELECT question, answer, score, technical_score, communication_score, 
+               confidence_score, feedback, question_type
+        FROM interview_questions
+        WHERE interview_id = ?
+        ORDER BY id
+    ''', (interview_id,))
+    questions_data = cursor.fetchall()
+    
+    # Prepare data for LLM analysis
+    performance_summary = {
+        'overall_score': overall_score or 0,
+        'job_role': job_role,
+        'questions': []
+    }
+    
+    total_technical = 0
+    total_communication = 0
+    total_confidence = 0
+    count = 0
+    
+    for q in questions_data:
+        question, answer, score, tech, comm, conf, feedback, q_type = q
+        if score is not None:
+            performance_summary['questions'].append({
+                'question': question,
+                'answer': answer,
+                'score': score,
+                'technical': tech or 0,
+                'communication': comm or 0,
+                'confidence': conf or 0,
+                'type': q_type or 'main'
+            })
             
-            total_technical = 0
-            total_communication = 0
-            total_confidence = 0
-            count = 0
-            
-            for q in questions_data:
-                question, answer, score, tech, comm, conf, feedback, q_type = q
-                if score is not None:
-                    performance_summary['questions'].append({
-                        'question': question,
-                        'answer': answer,
-                        'score': score,
-                        'technical': tech or 0,
-                        'communication': comm or 0,
-                        'confidence': conf or 0,
-                        'type': q_type or 'main'
-                    })
-                    
-                    if tech: total_technical += tech
-                    if comm: total_communication += comm
-                    if conf: total_confidence += conf
-                    count += 1
-            
-            avg_technical = total_technical / count if count > 0 else 0
-            avg_communication = total_communication / count if count > 0 else 0
-            avg_confidence = total_confidence / count if count > 0 else 0
-            
-            # Generate feedback using LLM
-            prompt = f"""Analyze this interview performance and generate personalized feedback.
+            if tech: total_technical += tech
+            if comm: total_communication += comm
+            if conf: total_confidence += conf
+            count += 1
+    
+    avg_technical = total_technical / count if count > 0 else 0
+    avg_communication = total_communication / count if count > 0 else 0
+    avg_confidence = total_confidence / count if count > 0 else 0
+    
+    # Generate feedback using LLM
+    prompt = f"""Analyze this interview performance and generate personalized feedback.
 
 Job Role: {job_role}
 Overall Score: {overall_score:.1f}/100
@@ -883,51 +1005,111 @@ Generate a JSON response with:
 
 Respond with ONLY valid JSON, no other text."""
 
-            response = groq_client.chat.completions.create(
+    return [
+        {"role": "system", "content": "You are an expert career coach and technical interviewer. Generate detailed, actionable feedback."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _store_personalized_feedback(cursor, interview_id, feedback_json):
+    """Parse the model's feedback JSON and store it as the interview's learning path"""
+    # Parse JSON response
+    try:
+        feedback_data = json.loads(feedback_json)
+    except json.JSONDecodeError:
+        # Try to extract JSON if wrapped in markdown
+        json_match = re.search(r'```json\n(.*?)\n```', feedback_json, re.DOTALL)
+        if json_match:
+            feedback_data = json.loads(json_match.group(1))
+        else:
+            feedback_data = json.loads(feedback_json)
+    
+    # Store in database
+    cursor.execute('''
+        INSERT INTO learning_paths (interview_id, strengths, weaknesses, roadmap, recommended_resources)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (
+        interview_id,
+        json.dumps(feedback_data.get('strengths', [])),
+        json.dumps(feedback_data.get('weaknesses', [])),
+        json.dumps(feedback_data.get('roadmap', {})),
+        json.dumps(feedback_data.get('resources', []))
+    ))
+    
+    return feedback_data
+
+
+def generate_personalized_feedback(interview_id):
+    """Generate personalized feedback with strengths, weaknesses, and learning path"""
+    try:
+        with db.connection() as conn:
+            cursor = conn.cursor()
+            
+            messages = _personalized_feedback_messages(cursor, interview_id)
+            if not messages:
+                return None
+            
+            response = llm_gateway.chat(
+                'generate_personalized_feedback',
                 model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": "You are an expert career coach and technical interviewer. Generate detailed, actionable feedback."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=messages,
                 temperature=0.7,
                 max_tokens=2000
             )
             
             feedback_json = response.choices[0].message.content.strip()
             
-            # Parse JSON response
-            try:
-                feedback_data = json.loads(feedback_json)
-            except json.JSONDecodeError:
-                # Try to extract JSON if wrapped in markdown
-                json_match = re.search(r'```json\n(.*?)\n```', feedback_json, re.DOTALL)
-                if json_match:
-                    feedback_data = json.loads(json_match.group(1))
-                else:
-                    feedback_data = json.loads(feedback_json)
-            
-            # Store in database
-            cursor.execute('''
-                INSERT INTO learning_paths (interview_id, strengths, weaknesses, roadmap, recommended_resources)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                interview_id,
-                json.dumps(feedback_data.get('strengths', [])),
-                json.dumps(feedback_data.get('weaknesses', [])),
-                json.dumps(feedback_data.get('roadmap', {})),
-                json.dumps(feedback_data.get('resources', []))
-            ))
-            
-            return feedback_data
-            
+            return _store_personalized_feedback(cursor, interview_id, feedback_json)
+    
     except Exception as e:
         print(f"Error generating personalized feedback: {str(e)}")
         return None
 
 
+def stream_personalized_feedback(interview_id):
+    """
+    Streaming variant of generate_personalized_feedback
+    
+    Yields ('token', text) for every chunk as it arrives, then ('done', feedback_data)
+    once the assembled JSON has been stored, or ('error', message) on failure.
+    """
+    try:
+        with db.connection() as conn:
+            messages = _personalized_feedback_messages(conn.cursor(), interview_id)
+        
+        if not messages:
+            yield 'error', 'Interview not found'
+            return
+        
+        # No connection is held while tokens stream to the client
+        chunks = []
+        for text in llm_gateway.stream(
+            'stream_personalized_feedback',
+            model="llama-3.3-70b-versatile",
+            messages=messages,
+            temperature=0.7,
+            max_tokens=2000
+        ):
+            chunks.append(text)
+            yield 'token', text
+        
+        with db.connection() as conn:
+            feedback_data = _store_personalized_feedback(conn.cursor(), interview_id, ''.join(chunks).strip())
+        
+        yield 'done', feedback_data
+    
+    except Exception as e:
+        print(f"Error streaming personalized feedback: {str(e)}")
+        yield 'error', 'Could not generate feedback'
+
 
 def suggest_interview_rounds(job_role, job_description=""):
     """Use LLM to suggest appropriate interview rounds based on job role"""
+    if app.config['QUESTION_BANK']:
+        cached = question_bank.get_suggestions(job_role, job_description)
+        if cached is not None:
+            return cached
+    
     try:
         prompt = f"""Based on the following job role, suggest appropriate interview rounds.
 
@@ -962,7 +1144,8 @@ Respond with ONLY valid JSON in this format:
   ]
 }}"""
 
-        response = groq_client.chat.completions.create(
+        response = llm_gateway.chat(
+            'suggest_interview_rounds',
             model="llama-3.3-70b-versatile",
             messages=[
                 {"role": "system", "content": "You are an expert HR consultant and technical recruiter. Suggest appropriate interview rounds based on job roles."},
@@ -984,8 +1167,11 @@ Respond with ONLY valid JSON in this format:
             else:
                 result = json.loads(result_json)
         
-        return result.get('suggested_rounds', [])
-        
+        suggested_rounds = result.get('suggested_rounds', [])
+        if suggested_rounds and app.config['QUESTION_BANK']:
+            question_bank.put_suggestions(job_role, job_description, suggested_rounds)
+        return suggested_rounds
+    
     except Exception as e:
         print(f"Error suggesting rounds: {str(e)}")
         return []
@@ -999,17 +1185,17 @@ def generate_round_questions(round_type, round_name, job_role, job_description,
             'hr': f"""Generate {question_count} HR screening questions for a {job_role} position.
 Focus on: background, motivation, cultural fit, expectations, availability.
 Questions should assess: work history, career goals, company fit, salary expectations, notice period.""",
-            
+
             'technical': f"""Generate {question_count} technical interview questions for a {job_role} position.
 Focus on: coding problems, algorithms, data structures, technical concepts, problem-solving.
 Questions should be open-ended and test practical knowledge.
 Job Description: {job_description or "Not provided"}""",
-            
+
             'system_design': f"""Generate {question_count} system design questions for a {job_role} position.
 Focus on: scalable architecture, design patterns, trade-offs, database design, API design.
 Questions should test high-level thinking and architectural skills.
 Job Description: {job_description or "Not provided"}""",
-            
+
             'behavioral': f"""Generate {question_count} behavioral/managerial questions for a {job_role} position.
 Focus on: leadership, teamwork, conflict resolution, decision-making, project management.
 Use STAR method format (Situation, Task, Action, Result).
@@ -1032,7 +1218,8 @@ Generate exactly {question_count} questions in JSON format:
 
 Respond with ONLY valid JSON, no other text."""
 
-        response = groq_client.chat.completions.create(
+        response = llm_gateway.chat(
+            'generate_round_questions',
             model="llama-3.3-70b-versatile",
             messages=[
                 {"role": "system", "content": f"You are an expert interviewer conducting a {round_name}. Generate relevant, insightful questions."},
@@ -1055,12 +1242,29 @@ Respond with ONLY valid JSON, no other text."""
                 result = json.loads(result_json)
         
         return result.get('questions', [])
-        
+    
     except Exception as e:
         print(f"Error generating round questions: {str(e)}")
         return []
 
 
+def draw_round_questions(user_id, round_type, round_name, job_role, job_description, question_count):
+    """Questions for a round from the question bank, or straight from the LLM when the bank is off"""
+    def generate(count):
+        return generate_round_questions(round_type, round_name, job_role, job_description, count)
+    
+    if not app.config['QUESTION_BANK']:
+        return generate(question_count)
+    return question_bank.draw(user_id, round_type, round_name, job_role, job_description, question_count, generate)
+
+
+def auth_workers_busy_response(error):
+    """503 with Retry-After for a password hash or QR code the auth workers could not produce in time"""
+    response = make_response(jsonify({'error': f'{str(error)}. Please try again later.'}), 503)
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
 # User Registration Endpoint
 @app.route('/api/register', methods=['POST'])
 @rate_limit('login')
@@ -1072,7 +1276,7 @@ def register():
         return jsonify({'error': 'Missing required fields'}), 400
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Check if user already exists
@@ -1085,7 +1289,7 @@ def register():
             totp_secret = pyotp.random_base32()
             
             # Hash password and create user
-            password_hash = generate_password_hash(data['password'])
+            password_hash = auth_workers.hash_password(data['password'])
             cursor.execute(
                 'INSERT INTO users (email, password_hash, name, totp_secret, totp_verified) VALUES (?, ?, ?, ?, ?)',
                 (data['email'], password_hash, data['name'], totp_secret, False)
@@ -1099,35 +1303,94 @@ def register():
             # Log successful registration
             log_audit(user_id, 'user_registered', 'user', user_id, f"New user: {data['name']}", True)
             
-            # Generate QR code
-            totp = pyotp.TOTP(totp_secret)
-            provisioning_uri = totp.provisioning_uri(data['email'], issuer_name="Interview Assistant")
-            
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(provisioning_uri)
-            qr.make(fit=True)
-            
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffered = io.BytesIO()
-            img.save(buffered)
-            qr_code_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
+            # The QR code is rendered on demand by /api/totp/qr
+            setup_token = jwt.encode({
+                'user_id': user_id,
+                'type': 'totp_setup',
+                'exp': datetime.now(timezone.utc) + timedelta(seconds=app.config['TOTP_SETUP_TOKEN_EXPIRY'])
+            }, app.config['SECRET_KEY'], algorithm='HS256')
             
             return jsonify({
                 'message': 'User registered successfully',
                 'user_id': user_id,
                 'totp_secret': totp_secret,
-                'qr_code': qr_code_base64
+                'totp_setup_token': setup_token,
+                'qr_url': '/api/totp/qr'
             }), 201
-            
+    
+    except AuthWorkersBusy as e:
+        return auth_workers_busy_response(e)
     except Exception as e:
         log_audit(None, 'registration_failed', 'user', None, str(e), False)
         return jsonify({'error': str(e)}), 500
 
+
+# TOTP QR Code Endpoint
+@app.route('/api/totp/qr', methods=['GET'])
+@rate_limit('default')
+def get_totp_qr():
+    """QR code for an unverified authenticator, authorized by the setup token from /api/register"""
+    token = request.headers.get('Authorization', '')
+    try:
+        token_data = decode_token(token.split(' ')[-1], 'totp_setup')
+    except jwt.ExpiredSignatureError:
+        return jsonify({'error': 'Setup token has expired'}), 401
+    except jwt.InvalidTokenError:
+        return jsonify({'error': 'Invalid setup token'}), 401
+    
+    user_id = token_data['user_id']
+    try:
+        with db.connection() as conn:
+            user = conn.execute(
+                'SELECT email, totp_secret, totp_verified FROM users WHERE id = ?',
+                (user_id,)
+            ).fetchone()
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        if user[2]:
+            return jsonify({'error': 'Authenticator already set up'}), 409
+        
+        provisioning_uri = pyotp.TOTP(user[1]).provisioning_uri(user[0], issuer_name="Interview Assistant")
+        return jsonify({'qr_code': auth_workers.totp_qr(user_id, provisioning_uri)}), 200
+    
+    except AuthWorkersBusy as e:
+        return auth_workers_busy_response(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+login_stats_lock = threading.Lock()
+login_stats = {'logins': 0, 'queries': 0, 'max_queries': 0, 'last_queries': 0}
+login_durations_ms = deque(maxlen=1000)
+
+
+def record_login(statements, duration_ms):
+    """Record the statement count and latency of one successful login"""
+    # Transaction control statements are not queries
+    queries = sum(1 for sql in statements if sql.split(None, 1)[0].upper() not in ('BEGIN', 'COMMIT', 'ROLLBACK'))
+    
+    with login_stats_lock:
+        login_stats['logins'] += 1
+        login_stats['queries'] += queries
+        login_stats['max_queries'] = max(login_stats['max_queries'], queries)
+        login_stats['last_queries'] = queries
+        login_durations_ms.append(duration_ms)
+
+
+def get_login_stats():
+    """Queries per successful login and latency percentiles over the last 1000 logins"""
+    with login_stats_lock:
+        stats = dict(login_stats)
+        durations = sorted(login_durations_ms)
+    
+    stats['avg_queries'] = round(stats.pop('queries') / stats['logins'], 2) if stats['logins'] else 0
+    if durations:
+        stats['p50_ms'] = round(durations[len(durations) // 2], 2)
+        stats['p99_ms'] = round(durations[min(len(durations) - 1, int(len(durations) * 0.99))], 2)
+    return stats
+
+
 @app.route('/api/login', methods=['POST'])
 @rate_limit('login')
 def login():
@@ -1136,16 +1399,25 @@ def login():
     if not all(k in data for k in ['email', 'password']):
         return jsonify({'error': 'Missing email or password'}), 400
     
+    # Every statement the login issues, including BEGIN/COMMIT
+    statements = []
+    started = time.perf_counter()
+    
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        # One pooled connection and one write transaction: the credential check
+        # reads outside the transaction, then the refresh token, session and
+        # session-limit writes commit together
+        with db.connection(trace=statements.append) as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                'SELECT id, password_hash, name, totp_secret, totp_verified FROM users WHERE email = ?',
-                (data['email'],)
-            )
+            cursor.execute('''
+                SELECT id, password_hash, name, totp_secret, totp_verified,
+                       (SELECT role FROM user_roles WHERE user_id = users.id) AS role,
+                       (SELECT permissions FROM user_roles WHERE user_id = users.id) AS permissions
+                FROM users WHERE email = ?
+            ''', (data['email'],))
             user = cursor.fetchone()
             
-            if not user or not check_password_hash(user[1], data['password']):
+            if not user or not auth_workers.verify_password(user[1], data['password']):
                 log_audit(None, 'login_failed', 'user', None, f"Failed login attempt: {data['email']}", False)
                 return jsonify({'error': 'Invalid email or password'}), 401
             
@@ -1168,8 +1440,11 @@ def login():
             # Check for suspicious activity
             risk_score = check_suspicious_activity(user_id)
             
-            # Generate tokens (access + refresh)
-            access_token, refresh_token = generate_tokens(user_id)
+            # Generate tokens (access + refresh), with the role already read above
+            access_token, refresh_token = generate_tokens(user_id, {
+                'role': user[5] or 'candidate',
+                'permissions': json.loads(user[6]) if user[6] else []
+            })
             
             # Create session
             session_id = create_session(user_id)
@@ -1180,7 +1455,7 @@ def login():
             # Log successful login
             log_audit(user_id, 'login_success', 'user', user_id, f"Device: {device_id}", True)
             
-            return jsonify({
+            response = jsonify({
                 'access_token': access_token,
                 'refresh_token': refresh_token,
                 'session_id': session_id,
@@ -1190,14 +1465,19 @@ def login():
                     'id': user_id,
                     'email': data['email'],
                     'name': user[2],
-                    'role': get_user_role(user_id)
+                    'role': user[5] or 'candidate'
                 }
             })
-                
+        
+        record_login(statements, (time.perf_counter() - started) * 1000)
+        return response
+    
+    except AuthWorkersBusy as e:
+        return auth_workers_busy_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    
-    
+
+
 
 @app.route('/api/verify-totp', methods=['POST'])
 def verify_totp():
@@ -1207,7 +1487,7 @@ def verify_totp():
         return jsonify({'error': 'Missing required fields'}), 400
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 'SELECT id, totp_secret FROM users WHERE email = ?',
@@ -1226,6 +1506,7 @@ def verify_totp():
                     'UPDATE users SET totp_verified = ? WHERE id = ?',
                     (True, user[0])
                 )
+                auth_workers.invalidate_qr(user[0])
                 
                 return jsonify({
                     'message': 'TOTP verification successful',
@@ -1236,7 +1517,7 @@ def verify_totp():
                     'message': 'Invalid TOTP code',
                     'verified': False
                 }), 400
-                
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500  
 
@@ -1249,12 +1530,14 @@ def token_required(f):
             return jsonify({'message': 'Token is missing'}), 401
         try:
             token = token.split(" ")[1]  # Remove 'Bearer ' prefix
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+            # Refresh, reset and TOTP setup tokens are not accepted here
+            data = decode_token(token, 'access')
             current_user_id = data['user_id']
         except jwt.ExpiredSignatureError:
             return jsonify({'message': 'Token has expired'}), 401
         except jwt.InvalidTokenError:
             return jsonify({'message': 'Invalid token'}), 401
+        g.token_claims = data
         return f(current_user_id, *args, **kwargs)
     return decorated
 
@@ -1267,7 +1550,7 @@ def reset_password_request():
         return jsonify({'error': 'Email is required'}), 400
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT id FROM users WHERE email = ?', (data['email'],))
             user = cursor.fetchone()
@@ -1276,6 +1559,7 @@ def reset_password_request():
                 # Generate reset token
                 reset_token = jwt.encode({
                     'user_id': user[0],
+                    'type': 'password_reset',
                     'exp': datetime.now(timezone.utc) + timedelta(hours=1)
                 }, app.config['SECRET_KEY'], algorithm="HS256")
                 
@@ -1288,7 +1572,7 @@ def reset_password_request():
             else:
                 # Don't reveal if email exists or not
                 return jsonify({'message': 'If email exists, reset link will be sent'}), 200
-                
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1302,95 +1586,266 @@ def reset_password():
     
     try:
         # Verify reset token
-        token_data = jwt.decode(data['reset_token'], app.config['SECRET_KEY'], algorithms=["HS256"])
+        token_data = decode_token(data['reset_token'], 'password_reset')
         user_id = token_data['user_id']
         
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             # Update password
-            password_hash = generate_password_hash(data['new_password'])
+            password_hash = auth_workers.hash_password(data['new_password'])
             cursor.execute(
                 'UPDATE users SET password_hash = ? WHERE id = ?',
                 (password_hash, user_id)
             )
             
             return jsonify({'message': 'Password updated successfully'})
-            
+    
     except jwt.ExpiredSignatureError:
         return jsonify({'error': 'Reset token has expired'}), 401
     except jwt.InvalidTokenError:
         return jsonify({'error': 'Invalid reset token'}), 401
+    except AuthWorkersBusy as e:
+        return auth_workers_busy_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-# Initialize Groq client
-groq_client = Groq(api_key=app.config['GROQ_API_KEY'])
+# Initialize the shared LLM gateway used by every Groq call site
+llm_gateway = LLMGateway(
+    app.config['GROQ_API_KEY'],
+    max_concurrency=app.config['LLM_MAX_CONCURRENCY'],
+    max_connections=app.config['LLM_MAX_CONNECTIONS']
+)
 
 # Initialize evaluation engine and improvement generator
-evaluation_engine = EvaluationEngine(app.config['GROQ_API_KEY'])
-improvement_generator = ImprovementPlanGenerator(app.config['GROQ_API_KEY'])
+evaluation_engine = EvaluationEngine(
+    llm_gateway,
+    mode=app.config['EVALUATION_MODE'],
+    max_workers=app.config['EVALUATION_MAX_WORKERS'],
+    fallback_mode=app.config['EVALUATION_FALLBACK_MODE'],
+    coverage_blend=app.config['TECHNICAL_COVERAGE_BLEND']
+)
+improvement_generator = ImprovementPlanGenerator(llm_gateway, db)
+
+# Identifies what produced an evaluation, so cached or reused scores from another setup are not served
+EVALUATION_VERSION = f"{PROMPT_VERSION}:{evaluation_engine.mode}:{evaluation_engine.coverage_blend}"
+
+# Content-addressed cache in front of answer evaluation
+evaluation_cache = EvaluationCache(
+    db,
+    max_entries=app.config['EVALUATION_CACHE_SIZE'],
+    ttl_seconds=app.config['EVALUATION_CACHE_TTL']
+)
+
+# Bump whenever the evaluate_answer prompt changes
+EVALUATE_ANSWER_PROMPT_VERSION = 1
+
+# Uploaded resumes stored once per content hash, with cached text and question sets
+resume_store = ResumeStore(
+    db,
+    app.config['UPLOAD_FOLDER'],
+    reuse_policy=app.config['QUESTION_SET_REUSE'],
+    question_set_ttl=app.config['QUESTION_SET_TTL']
+)
+
+# Bump whenever the generate_questions prompt changes, so cached question sets are not reused
+GENERATE_QUESTIONS_PROMPT_VERSION = 2
+
+# Trims resume text to the sections and lines relevant to the role before prompting
+resume_condenser = ResumeCondenser(token_budget=app.config['RESUME_PROMPT_TOKENS'])
+
+# Near-duplicate question lookups for the question bank and custom roles
+question_index = NearDuplicateIndex(db, threshold=app.config['NEAR_DUPLICATE_THRESHOLD'])
+
+# Pools of generated round questions shared by every candidate for the same role
+question_bank = QuestionBank(
+    db,
+    index=question_index,
+    pool_target=app.config['QUESTION_BANK_POOL_TARGET'],
+    max_pool=app.config['QUESTION_BANK_MAX_POOL'],
+    refill_batch=app.config['QUESTION_BANK_REFILL_BATCH'],
+    refill_cooldown=app.config['QUESTION_BANK_REFILL_COOLDOWN'],
+    suggestion_ttl=app.config['ROUND_SUGGESTION_TTL']
+)
+
+# Index questions stored before the index existed; rows already indexed are skipped
+with db.connection() as conn:
+    stored_questions = conn.execute('SELECT bank_key, id, question FROM question_bank').fetchall()
+    stored_questions += [
+        (f"custom_role:{role_id}", question_id, question)
+        for question_id, role_id, question in conn.execute('SELECT id, role_id, question FROM custom_questions')
+    ]
+question_index.backfill(stored_questions)
+
+# Scores of evaluated answers, reused for near-identical answers to the same question
+answer_reuse = AnswerScoreReuse(
+    db,
+    NearDuplicateIndex(db, threshold=app.config['ANSWER_REUSE_THRESHOLD'], table='answer_signatures'),
+    evaluation_engine.evaluate_response,
+    evaluation_engine.complete_evaluation,
+    version=EVALUATION_VERSION,
+    llm_calls=LLM_CALLS_PER_EVALUATION[evaluation_engine.mode],
+    exact_similarity=app.config['ANSWER_REUSE_EXACT'],
+    max_neighbours=app.config['ANSWER_REUSE_NEIGHBOURS'],
+    max_answers=app.config['ANSWER_REUSE_MAX_PER_QUESTION'],
+    verify_rate=app.config['ANSWER_REUSE_VERIFY_RATE']
+)
+
+# Generates the questions of every round of a new multi-round interview in parallel
+round_prefetch_executor = ThreadPoolExecutor(
+    max_workers=app.config['ROUND_PREFETCH_WORKERS'],
+    thread_name_prefix='round-prefetch'
+)
+round_prefetch_lock = threading.Lock()
+round_prefetch_futures = {}  # round_id -> Future of a prefetch submitted by this process
+round_prefetch_stats = {
+    'queued': 0,      # rounds submitted for prefetch
+    'ready': 0,       # prefetches that stored questions
+    'failed': 0,      # prefetches that produced no questions
+    'served': 0,      # rounds started with prefetched questions
+    'waited': 0,      # of those, rounds that waited for a running prefetch
+    'on_demand': 0,   # rounds started by generating questions in the request
+    'generate_ms': 0.0
+}
+
+# Runs speculative follow-up generation alongside answer evaluation
+followup_executor = ThreadPoolExecutor(
+    max_workers=app.config['FOLLOWUP_MAX_WORKERS'],
+    thread_name_prefix='followup'
+)
+followup_speculation_lock = threading.Lock()
+followup_speculation_stats = {
+    'speculated': 0,   # follow-ups started from the pre-score
+    'used': 0,         # speculation matched the real score and was returned
+    'cancelled': 0,    # speculation was wrong but cancelled before it reached the LLM
+    'wasted': 0,       # speculation was wrong and its LLM call was thrown away
+    'missed': 0,       # real score needed a follow-up the pre-score did not predict
+    'skipped': 0       # neither the pre-score nor the real score needed a follow-up
+}
+
+# Durable background job queue; handlers are registered next to the code they run
+job_queue = JobQueue(db, num_workers=app.config['JOB_WORKERS'])
 
 def extract_text_from_pdf(pdf_path):
-    with open(pdf_path, 'rb') as file:
-        reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
-        return text
+    """Resume text within the RESUME_MAX_CHARS/RESUME_MAX_PAGES budget; raises ValueError if unreadable"""
+    return pdf_extractor.extract(pdf_path)
 
 import json
 import re
 from datetime import datetime, UTC
 
-def clean_json_response(response_text):
-    """Clean and format LLM response into valid JSON"""
-    # Extract content between JSON tags
-    match = re.search(r'<JSON>(.*?)</JSON>', response_text, re.DOTALL)
-    if not match:
-        raise ValueError("No JSON tags found in response")
-    
-    json_str = match.group(1).strip()
-    
-    # Remove newlines and extra whitespace
-    json_str = re.sub(r'\s+', ' ', json_str)
-    
-    # Fix escaped underscores
-    json_str = json_str.replace('\\_', '_')
+def parse_json_response(response_text):
+    """
+    Parse the JSON an LLM wrapped in <JSON></JSON> tags
     
-    # Ensure property names are properly quoted
-    json_str = re.sub(r'(\w+)(?=\s*:)', r'"\1"', json_str)
+    A missing closing tag (output cut off) or missing tags altogether are
+    tolerated, and the JSON itself goes through json_repair.
     
-    # Ensure string values are properly quoted
-    json_str = re.sub(r':\s*([^"{[\s][^,}\]]*)(?=[,}\]])', r': "\1"', json_str)
+    Returns:
+        (value, repaired) where repaired is True when the JSON needed repair
+    """
+    match = re.search(r'<JSON>(.*?)(?:</JSON>|$)', response_text, re.DOTALL)
+    if match:
+        # Models often fence the JSON in ```json even inside the tags
+        json_text = re.sub(r'^\s*```[a-zA-Z]*\s*|\s*```\s*$', '', match.group(1))
+    else:
+        start = response_text.find('{')
+        if start < 0:
+            raise ValueError("No JSON found in response")
+        json_text = response_text[start:]
     
-    return json_str
+    return json_repair.loads(json_text)
 
-def generate_questions(resume_text, job_role):
-    prompt = f"""You must respond with only valid JSON wrapped in <JSON></JSON> tags.
-    Generate 5 technical interview questions based on this resume and job role.
-    
-    Resume: {resume_text}
-    Job Role: {job_role}
+def clean_json_response(response_text):
+    """Clean and format LLM response into valid JSON"""
+    return json.dumps(parse_json_response(response_text)[0])
+
+
+QUESTIONS_PER_INTERVIEW = 5
+ANSWER_POINTS_PER_QUESTION = 3
+
+question_generation_lock = threading.Lock()
+question_generation_stats = {
+    'generations': 0,
+    'llm_calls': 0,
+    'complete_first_try': 0,
+    'repaired_responses': 0,
+    'unparseable_responses': 0,
+    'llm_errors': 0,
+    'rejected_questions': 0,
+    'topups': 0,
+    'topup_questions': 0,
+    'short_sets': 0,
+    'failures': 0
+}
+
+
+def count_question_generation(**amounts):
+    with question_generation_lock:
+        for key, amount in amounts.items():
+            question_generation_stats[key] += amount
+
+
+def get_question_generation_stats():
+    """Generation outcomes; topups are the follow-up calls that replaced full regenerations"""
+    with question_generation_lock:
+        stats = dict(question_generation_stats)
     
-    Respond with EXACTLY this format (maintain all quotes):
-    <JSON>
-    {{"questions": [
-        {{"question": "Question text here?", "expected_answer_points": ["point1", "point2", "point3"]}}
-    ]}}
-    </JSON>
+    generations = stats['generations']
+    stats['complete_first_try_rate'] = round(stats['complete_first_try'] / generations, 4) if generations else 0
+    stats['avg_llm_calls'] = round(stats['llm_calls'] / generations, 2) if generations else 0
+    return stats
 
-    Rules:
-    - Use ONLY double quotes, never single quotes
-    - Include EXACTLY 5 questions
-    - Each question MUST have EXACTLY 3 answer points
-    - No special characters or escape sequences in strings
-    - No newlines within the JSON structure"""
+
+def accept_questions(result, accepted):
+    """
+    Append the usable questions in a parsed response to accepted
+    
+    A question needs non-empty text that is not a near-duplicate of one
+    already in accepted, and at least ANSWER_POINTS_PER_QUESTION answer
+    points; extra points are dropped.
+    
+    Returns:
+        number of questions rejected
+    """
+    questions = result.get('questions') if isinstance(result, dict) else result
+    if not isinstance(questions, list):
+        return 1
+    
+    kept = [question_index.signature(q['question']) for q in accepted]
+    rejected = 0
+    for q in questions:
+        if len(accepted) >= QUESTIONS_PER_INTERVIEW:
+            break
+        
+        text = q.get('question') if isinstance(q, dict) else None
+        points = q.get('expected_answer_points') if isinstance(q, dict) else None
+        if not isinstance(text, str) or not text.strip() or not isinstance(points, list):
+            rejected += 1
+            continue
+        
+        points = [str(point).strip() for point in points if isinstance(point, (str, int, float)) and str(point).strip()]
+        signature = question_index.signature(text)
+        if len(points) < ANSWER_POINTS_PER_QUESTION or question_index.matches(signature, kept):
+            rejected += 1
+            continue
+        
+        kept.append(signature)
+        accepted.append({'question': text.strip(), 'expected_answer_points': points[:ANSWER_POINTS_PER_QUESTION]})
+    return rejected
 
 
-    content = None  # Initialize to avoid UnboundLocalError
+def request_questions(call_site, prompt, accepted):
+    """
+    One generation call; usable questions are added to accepted
+    
+    Returns:
+        False if the call itself failed (API error or timeout), else True
+    """
+    content = None
     try:
-        response = groq_client.chat.completions.create(
+        response = llm_gateway.chat(
+            call_site,
             model="llama-3.3-70b-versatile",
             messages=[
                 {
@@ -1404,62 +1859,128 @@ def generate_questions(resume_text, job_role):
             ],
             temperature=0.3
         )
+        count_question_generation(llm_calls=1)
         
         content = response.choices[0].message.content
+        result, repaired = parse_json_response(content)
+        rejected = accept_questions(result, accepted)
+        count_question_generation(repaired_responses=int(repaired), rejected_questions=rejected)
+    
+    except ValueError as e:
+        # Nothing usable in this response; the caller asks again for what is missing
+        print(f"Error parsing generated questions: {str(e)}")
+        if content:
+            print(f"Response content: {content}")
+        count_question_generation(unparseable_responses=1)
+    
+    except LLM_ERRORS as e:
+        print(f"Error requesting generated questions: {str(e)}")
+        count_question_generation(llm_errors=1)
+        return False
+    
+    return True
+
+
+def generate_questions(resume_text, job_role):
+    """
+    Generate QUESTIONS_PER_INTERVIEW questions for a resume
+    
+    Valid questions from a near-miss response are kept, and follow-up calls
+    ask only for the missing ones, up to QUESTION_TOPUP_ATTEMPTS times. A set
+    that is still short is returned as long as it has at least one question,
+    also when a call fails outright; no more top-ups are attempted after that.
+    """
+    prompt = f"""You must respond with only valid JSON wrapped in <JSON></JSON> tags.
+    Generate {QUESTIONS_PER_INTERVIEW} technical interview questions based on this resume and job role.
+    
+    Resume: {resume_text}
+    Job Role: {job_role}
+    
+    Respond with EXACTLY this format (maintain all quotes):
+    <JSON>
+    {{"questions": [
+        {{"question": "Question text here?", "expected_answer_points": ["point1", "point2", "point3"]}}
+    ]}}
+    </JSON>
+    
+    Rules:
+    - Use ONLY double quotes, never single quotes
+    - Include EXACTLY {QUESTIONS_PER_INTERVIEW} questions
+    - Each question MUST have EXACTLY {ANSWER_POINTS_PER_QUESTION} answer points
+    - No special characters or escape sequences in strings
+    - No newlines within the JSON structure"""
+    
+    accepted = []
+    try:
+        count_question_generation(generations=1)
+        available = request_questions('generate_questions', prompt, accepted)
+        count_question_generation(complete_first_try=int(len(accepted) == QUESTIONS_PER_INTERVIEW))
         
-        # Clean and parse JSON
-        json_str = clean_json_response(content)
+        for _ in range(app.config['QUESTION_TOPUP_ATTEMPTS'] if available else 0):
+            missing = QUESTIONS_PER_INTERVIEW - len(accepted)
+            if missing <= 0:
+                break
+            
+            existing = '\n'.join(f"    - {q['question']}" for q in accepted) or '    (none)'
+            topup_prompt = f"""You must respond with only valid JSON wrapped in <JSON></JSON> tags.
+    Generate {missing} more technical interview questions based on this resume and job role.
+    They must be different from these questions, which are already in the interview:
+{existing}
+
+    Resume: {resume_text}
+    Job Role: {job_role}
+    
+    Respond with EXACTLY this format (maintain all quotes):
+    <JSON>
+    {{"questions": [
+        {{"question": "Question text here?", "expected_answer_points": ["point1", "point2", "point3"]}}
+    ]}}
+    </JSON>
+    
+    Rules:
+    - Use ONLY double quotes, never single quotes
+    - Include EXACTLY {missing} question{'s' if missing > 1 else ''}
+    - Each question MUST have EXACTLY {ANSWER_POINTS_PER_QUESTION} answer points
+    - No special characters or escape sequences in strings"""
+            
+            before = len(accepted)
+            available = request_questions('generate_questions_topup', topup_prompt, accepted)
+            count_question_generation(topups=1, topup_questions=len(accepted) - before)
+            if not available:
+                break
         
-        try:
-            # First attempt to parse
-            result = json.loads(json_str)
-        except json.JSONDecodeError:
-            # If first attempt fails, try additional cleaning
-            json_str = re.sub(r'([{,]\s*)(\w+)(\s*:)', r'\1"\2"\3', json_str)
-            result = json.loads(json_str)
-        
-        # Validate structure
-        if not isinstance(result, dict) or 'questions' not in result:
-            raise ValueError("Missing 'questions' array in JSON")
-            
-        questions = result['questions']
-        if not isinstance(questions, list) or len(questions) != 5:
-            raise ValueError("Must have exactly 5 questions")
-            
-        for i, q in enumerate(questions):
-            if not isinstance(q, dict):
-                raise ValueError(f"Question {i+1} is not an object")
-            if 'question' not in q:
-                raise ValueError(f"Question {i+1} missing 'question' field")
-            if 'expected_answer_points' not in q:
-                raise ValueError(f"Question {i+1} missing 'expected_answer_points' field")
-            if not isinstance(q['expected_answer_points'], list):
-                raise ValueError(f"Question {i+1} 'expected_answer_points' must be an array")
-            if len(q['expected_answer_points']) != 3:
-                raise ValueError(f"Question {i+1} must have exactly 3 answer points")
-        
-        # Return the cleaned and validated JSON
-        return json.dumps(result, ensure_ascii=True)
+        if not accepted:
+            raise ValueError("No valid questions in any response")
+        if len(accepted) < QUESTIONS_PER_INTERVIEW:
+            count_question_generation(short_sets=1)
         
+        return json.dumps({'questions': accepted}, ensure_ascii=True)
+    
     except Exception as e:
         print(f"Error in generate_questions: {str(e)}")
-        if content:
-            print(f"Response content: {content}")
-        else:
-            print("No response content available (error occurred before API response)")
+        count_question_generation(failures=1)
         raise ValueError(f"Failed to generate valid questions: {str(e)}")
 
 
-def generate_followup_question(original_question, user_answer, evaluation_score):
+def followup_prompt_type(evaluation_score):
+    """Follow-up variant for a score: 'deeper', 'clarification' or None if no follow-up is needed"""
+    if evaluation_score >= 85:
+        return "deeper"
+    elif evaluation_score < 60:
+        return "clarification"
+    return None
+
+
+def generate_followup_question(original_question, user_answer, evaluation_score=None, prompt_type=None):
     """
     Generate dynamic follow-up question based on user's answer quality
+    
+    Pass prompt_type to choose the variant directly instead of deriving it from evaluation_score.
     """
     # Determine if follow-up is needed
-    if evaluation_score >= 85:
-        prompt_type = "deeper"
-    elif evaluation_score < 60:
-        prompt_type = "clarification"
-    else:
+    if prompt_type is None:
+        prompt_type = followup_prompt_type(evaluation_score)
+    if prompt_type is None:
         return None
     
     if prompt_type == "clarification":
@@ -1480,7 +2001,8 @@ Generate ONE follow-up question that probes deeper into an interesting point the
 Respond with ONLY the follow-up question text, no extra formatting."""
 
     try:
-        response = groq_client.chat.completions.create(
+        response = llm_gateway.chat(
+            'generate_followup_question',
             model="llama-3.3-70b-versatile",
             messages=[
                 {"role": "system", "content": "You are an expert interviewer who asks insightful follow-up questions."},
@@ -1504,20 +2026,21 @@ def evaluate_answer(question, expected_points, actual_answer):
     Question: {question}
     Expected Answer Points: {expected_points}
     Candidate's Answer: {actual_answer}
-
+    
     Calculate score (0-100) based on:
     - Technical accuracy (0-100)
     - Completeness vs expected points (0-100)
     - Clarity of explanation (0-100)
-
+    
     Requirements:
     - Respond with EXACTLY this format: <SCORE>85.5</SCORE>
     - Must be a single number between 0 and 100
     - Include up to 2 decimal places
     - NO text outside the tags"""
-
+    
     try:
-        response = groq_client.chat.completions.create(
+        response = llm_gateway.chat(
+            'evaluate_answer',
             model="llama-3.3-70b-versatile",
             messages=[
                 {
@@ -1545,16 +2068,72 @@ def evaluate_answer(question, expected_points, actual_answer):
             raise ValueError("Score must be between 0 and 100")
         
         return round(score, 2)
-        
+    
     except Exception as e:
         print(f"Error in evaluate_answer: {str(e)}")
         print(f"Response content: {response.choices[0].message.content}")
         raise ValueError(f"Failed to generate valid score: {str(e)}")
 
+
+def evaluate_answer_cached(question, expected_points, actual_answer):
+    """evaluate_answer behind the evaluation cache"""
+    key = evaluation_cache.make_key(
+        'evaluate_answer', EVALUATION_MODEL, EVALUATE_ANSWER_PROMPT_VERSION,
+        question=question, expected_points=expected_points, answer=actual_answer
+    )
+    score, _ = evaluation_cache.get_or_compute(
+        key, lambda: evaluate_answer(question, expected_points, actual_answer)
+    )
+    return score
+
+
+def evaluate_response_cached(question, answer, expected_points, evaluation_criteria, on_evaluate=None):
+    """
+    EvaluationEngine.evaluate_response behind the evaluation cache
+    
+    Cached results are returned with 'cached': True and without the timing
+    breakdown of the original evaluation. On a cache miss, scores of
+    near-identical answers to the same question are reused when there are
+    any (see AnswerScoreReuse), and only otherwise is the answer evaluated.
+    on_evaluate, if given, is called just before that evaluation starts.
+    """
+    key = evaluation_cache.make_key(
+        'evaluate_response', EVALUATION_MODEL, EVALUATION_VERSION,
+        question=question, answer=answer, expected_points=expected_points, weights=evaluation_criteria
+    )
+    
+    timings = {}
+    
+    def compute():
+        if app.config['ANSWER_REUSE']:
+            try:
+                reused = answer_reuse.lookup(question, answer, expected_points, evaluation_criteria)
+                if reused is not None:
+                    return reused
+            except Exception as e:
+                print(f"Error looking up reusable answer scores: {str(e)}")
+        
+        if on_evaluate:
+            on_evaluate()
+        result = evaluation_engine.evaluate_response(question, answer, expected_points, evaluation_criteria)
+        timings.update(result.pop('timings', {}))
+        # Only full LLM evaluations are reused; degraded ones would spread their defaults
+        if app.config['ANSWER_REUSE'] and not result.get('degraded'):
+            answer_reuse.record(question, answer, expected_points, result)
+        return result
+    
+    result, hit = evaluation_cache.get_or_compute(key, compute)
+    result = dict(result)
+    if hit:
+        result['cached'] = True
+    elif timings:
+        result['timings'] = timings
+    return result
+
 # # Fix for the deprecation warning
 # def generate_token_expiration():
 #     return datetime.now(UTC) + timedelta(hours=app.config['JWT_EXPIRATION_HOURS'])
-    
+
 @app.route('/api/upload-resume', methods=['POST'])
 @token_required
 @rate_limit('upload_resume')
@@ -1570,42 +2149,112 @@ def upload_resume(current_user_id):
     
     if not job_role:
         return jsonify({'error': 'No job role specified'}), 400
-
+    
     if resume_file.filename == '':
         return jsonify({'error': 'File not selected'}), 400
-
-    # Save files with secure filenames
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    resume_filename = secure_filename(resume_file.filename)
-    resume_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{current_user_id}_{timestamp}_{resume_filename}")
-    resume_file.save(resume_path)
     
-    # Extract text and generate questions
-    resume_text = extract_text_from_pdf(resume_path)
+    run_async = request.form.get('async', str(app.config['ASYNC_RESUME_PROCESSING'])).lower() == 'true'
     
-    # Include job description and focus areas in question generation
-    context = f"Job Role: {job_role}\n"
-    if job_description:
-        context += f"Job Description: {job_description}\n"
-    if focus_areas:
-        context += f"Focus Areas: {focus_areas}\n"
+    # Upload stage: save under the content hash, so a re-uploaded file is stored once
+    started = time.perf_counter()
+    resume_hash, resume_path = resume_store.save(resume_file)
+    upload_ms = (time.perf_counter() - started) * 1000
+    
+    context_hash = resume_store.context_hash(
+        GENERATE_QUESTIONS_PROMPT_VERSION,
+        job_role=job_role,
+        job_description=job_description,
+        focus_areas=focus_areas
+    )
+    questions = resume_store.get_question_set(resume_hash, context_hash, current_user_id)
+    
+    # The interview is created together with its questions; only an async job,
+    # whose interview id is returned up front, creates it first
+    payload = {
+        'interview_id': None,
+        'user_id': current_user_id,
+        'resume_hash': resume_hash,
+        'resume_path': resume_path,
+        'context_hash': context_hash,
+        'job_role': job_role,
+        'job_description': job_description,
+        'focus_areas': focus_areas,
+        'evaluation_weights': evaluation_weights,
+        'upload_ms': upload_ms
+    }
+    
+    # A cached question set only needs persisting, so answer right away
+    if questions is not None:
+        interview_id, questions_with_ids = create_resume_interview(payload, questions)
+        return jsonify({
+            'message': 'Resume uploaded and questions generated',
+            'interview_id': interview_id,
+            'questions': questions_with_ids,
+        })
     
-    questions = generate_questions(resume_text, context)
+    if run_async:
+        interview_id = create_resume_interview(payload)[0]
+        payload['interview_id'] = interview_id
+        job_id = job_queue.enqueue('process_resume', payload, user_id=current_user_id)
+        return jsonify({
+            'message': 'Resume uploaded, questions are being generated',
+            'interview_id': interview_id,
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/jobs/{job_id}',
+            'stream_url': f'/api/jobs/{job_id}/stream'
+        }), 202
+    
+    try:
+        result = run_resume_pipeline(payload)
+    except PermanentJobError as e:
+        return jsonify({'error': str(e)}), 400
+    except ValueError as e:
+        # The question generator gave up; no interview was created
+        return jsonify({'error': f'Failed to generate questions: {str(e)}'}), 502
+    
+    return jsonify({
+        'message': 'Resume uploaded and questions generated',
+        'interview_id': result['interview_id'],
+        'questions': result['questions'],
+    })
 
-    print(f"Raw questions: {questions}")
 
-    # Ensure questions is a dictionary
-    if isinstance(questions, str):
-        questions = json.loads(questions)
+def create_resume_interview(payload, questions=None):
+    """
+    Create a resume interview, with its questions in the same transaction when given
     
-    with sqlite3.connect(app.config['DATABASE']) as conn:
+    Returns:
+        (interview_id, [{'id', 'question'}] or None)
+    """
+    with db.connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO interviews (user_id, job_role, resume_path, job_description, focus_areas, evaluation_weights)
             VALUES (?, ?, ?, ?, ?, ?)
-        ''', (current_user_id, job_role, resume_path, job_description, focus_areas, evaluation_weights))
+        ''', (payload['user_id'], payload['job_role'], payload['resume_path'], payload['job_description'],
+              payload['focus_areas'], payload['evaluation_weights']))
         interview_id = cursor.lastrowid
+        
+        if questions is None:
+            return interview_id, None
+        return interview_id, persist_generated_questions(interview_id, questions)
 
+
+def persist_generated_questions(interview_id, questions):
+    """Insert a generated question set for an interview; returns [{'id', 'question'}]"""
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        
+        # A retried job may already have stored the questions
+        existing = cursor.execute('''
+            SELECT id, question FROM interview_questions
+            WHERE interview_id = ?
+            ORDER BY id
+        ''', (interview_id,)).fetchall()
+        if existing:
+            return [{'id': row[0], 'question': row[1]} for row in existing]
+        
         # Store questions and capture the generated IDs
         questions_with_ids = []
         for question in questions['questions']:
@@ -1615,17 +2264,119 @@ def upload_resume(current_user_id):
             ''', (interview_id, question['question']))
             q_id = cursor.lastrowid
             questions_with_ids.append({'id': q_id, 'question': question['question']})
+        return questions_with_ids
+
+
+# Stages of the resume pipeline in order; 'upload' runs in the request
+RESUME_PIPELINE_STAGES = ('upload', 'extract', 'condense', 'generate', 'persist')
+
+resume_pipeline_lock = threading.Lock()
+resume_pipeline_stats = {
+    'runs': 0,
+    'stages': {stage: {'total_ms': 0.0, 'max_ms': 0.0} for stage in RESUME_PIPELINE_STAGES}
+}
+
+
+def run_resume_pipeline(payload):
+    """
+    Extract, condense, generate and persist questions for an uploaded resume
     
-    return jsonify({
-        'message': 'Resume uploaded and questions generated',
+    Runs as the 'process_resume' background job, or inline when async
+    processing is off. The current stage and finished stage durations are
+    published as job progress.
+    """
+    stages = {'upload': round(payload['upload_ms'], 2)}
+    
+    def run_stage(name, func, *args):
+        job_queue.update_progress({'stage': name, 'stages_ms': stages})
+        started = time.perf_counter()
+        result = func(*args)
+        stages[name] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+    
+    try:
+        resume_text = run_stage('extract', resume_store.get_text,
+                                payload['resume_hash'], payload['resume_path'], extract_text_from_pdf)
+    except ValueError as e:
+        # An unreadable PDF stays unreadable on retry
+        raise PermanentJobError(str(e))
+    
+    # Include job description and focus areas in question generation
+    context = f"Job Role: {payload['job_role']}\n"
+    if payload['job_description']:
+        context += f"Job Description: {payload['job_description']}\n"
+    if payload['focus_areas']:
+        context += f"Focus Areas: {payload['focus_areas']}\n"
+    
+    # Only the resume lines that matter for the role, within RESUME_PROMPT_TOKENS
+    resume_text, condensed = run_stage('condense', resume_condenser.condense, resume_text, context)
+    
+    questions = run_stage('generate', generate_questions, resume_text, context)
+    
+    print(f"Raw questions: {questions}")
+    
+    # Ensure questions is a dictionary
+    if isinstance(questions, str):
+        questions = json.loads(questions)
+    
+    resume_store.put_question_set(payload['resume_hash'], payload['context_hash'], payload['user_id'], questions)
+    if payload['interview_id'] is None:
+        interview_id, questions_with_ids = run_stage('persist', create_resume_interview, payload, questions)
+    else:
+        interview_id = payload['interview_id']
+        questions_with_ids = run_stage('persist', persist_generated_questions, interview_id, questions)
+    
+    with resume_pipeline_lock:
+        resume_pipeline_stats['runs'] += 1
+        for stage, duration_ms in stages.items():
+            totals = resume_pipeline_stats['stages'][stage]
+            totals['total_ms'] += duration_ms
+            totals['max_ms'] = max(totals['max_ms'], duration_ms)
+    
+    return {
         'interview_id': interview_id,
         'questions': questions_with_ids,
-    })
+        'stages_ms': stages,
+        'condensed': condensed
+    }
+
+
+def get_resume_pipeline_stats():
+    """Average and max duration per pipeline stage, and the slowest stage on average"""
+    with resume_pipeline_lock:
+        runs = resume_pipeline_stats['runs']
+        stages = {
+            stage: {
+                'avg_ms': round(totals['total_ms'] / runs, 2) if runs else 0,
+                'max_ms': round(totals['max_ms'], 2)
+            }
+            for stage, totals in resume_pipeline_stats['stages'].items()
+        }
+    
+    return {
+        'runs': runs,
+        'stages': stages,
+        'bottleneck': max(stages, key=lambda stage: stages[stage]['avg_ms']) if runs else None
+    }
+
+
+def discard_failed_resume_interview(payload, error):
+    """Delete the interview of a resume job that failed for good, unless it got its questions"""
+    with db.connection() as conn:
+        conn.execute('''
+            DELETE FROM interviews
+            WHERE id = ? AND NOT EXISTS (SELECT 1 FROM interview_questions WHERE interview_id = ?)
+        ''', (payload['interview_id'], payload['interview_id']))
+
+
+job_queue.register('process_resume', run_resume_pipeline, on_failure=discard_failed_resume_interview)
+
+
 @app.route('/api/my-interviews', methods=['GET'])
 @token_required
 def my_interviews(current_user_id):
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM interviews WHERE user_id = ?", (current_user_id,))
@@ -1650,31 +2401,30 @@ def report_violation(current_user_id):
     data = request.json
     interview_id = data.get('interviewId')
     violation_message = data.get('violation') or "Security violation detected."
-
+    
     if not interview_id:
         return jsonify({'error': 'Missing interview ID'}), 400
-
+    
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             # Ensure the interview belongs to the current user
             cursor.execute('SELECT id, violations, violation_summary FROM interviews WHERE id = ? AND user_id = ?', (interview_id, current_user_id))
             interview = cursor.fetchone()
             if not interview:
                 return jsonify({'error': 'Interview not found or unauthorized'}), 404
-
+            
             # Increment violation count and update summary
             current_violations = interview[1] if interview[1] is not None else 0
             new_violations = current_violations + 1
-
+            
             current_summary = interview[2] if interview[2] else ""
             new_violation_entry = f"{datetime.now(timezone.utc).isoformat()} - {violation_message}"
             new_summary = f"{current_summary} | {new_violation_entry}" if current_summary else new_violation_entry
-
+            
             cursor.execute('UPDATE interviews SET violations = ?, violation_summary = ? WHERE id = ?', (new_violations, new_summary, interview_id))
-            conn.commit()
             return jsonify({'message': 'Violation recorded', 'violations': new_violations, 'violation_summary': new_summary}), 200
-
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1683,12 +2433,12 @@ def send_final_score_email(recipient, score):
     SMTP_PORT = 587  # 465 for SSL, 587 for TLS
     EMAIL_ADDRESS = "abhisheksaraff18@gmail.com"
     EMAIL_PASSWORD = "wwtx zfew vgzq odzx"  # Use App Password if 2FA is enabled
-
+    
     msg = MIMEText(f"Your final interview score is: {score:.1f} out of 100.")
     msg['Subject'] = "Your Interview Final Score"
     msg['From'] = EMAIL_ADDRESS
     msg['To'] = recipient
-
+    
     try:
         with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
             server.starttls()  # Secure the connection
@@ -1710,7 +2460,7 @@ def submit_answer(current_user_id):
         return jsonify({'error': 'Missing required fields (interviewId, questionId, answer)'}), 400
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # First check if the interview exists and belongs to the user
@@ -1765,7 +2515,7 @@ def submit_answer(current_user_id):
                 question_text = cursor.fetchone()[0]
                 
                 # Evaluate answer
-                score = evaluate_answer(question_text, [], answer)  # Using empty list for expected points for now
+                score = evaluate_answer_cached(question_text, [], answer)  # Using empty list for expected points for now
                 
                 # Store answer and score
                 cursor.execute('''
@@ -1791,7 +2541,7 @@ def submit_answer(current_user_id):
                     'interviewId': interview_id,
                     'questionId': question_id
                 })
-                
+            
             except Exception as e:
                 return jsonify({
                     'error': f'Error processing answer: {str(e)}',
@@ -1800,7 +2550,7 @@ def submit_answer(current_user_id):
                         'question_id': question_id
                     }
                 }), 500
-                
+    
     except Exception as e:
         return jsonify({
             'error': f'Database error: {str(e)}',
@@ -1819,7 +2569,7 @@ def calculate_final_score(current_user_id):
     if not interview_id:
         return jsonify({'error': 'Missing interview ID'}), 400
     
-    with sqlite3.connect(app.config['DATABASE']) as conn:
+    with db.connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT AVG(score)
@@ -1854,7 +2604,7 @@ def calculate_final_score(current_user_id):
 @token_required
 def get_interview_violations(current_user_id, interview_id):
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             # Ensure the interview belongs to the current user
             cursor.execute('SELECT violations, violation_summary FROM interviews WHERE id = ? AND user_id = ?', 
@@ -1863,17 +2613,17 @@ def get_interview_violations(current_user_id, interview_id):
             
             if not result:
                 return jsonify({'error': 'Interview not found or unauthorized'}), 404
-                
+            
             violations, violation_summary = result
             
             return jsonify({
                 'violations': violations if violations is not None else 0,
                 'violation_summary': violation_summary if violation_summary else ""
             }), 200
-            
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-        
+
 
 # ============ NEW ENDPOINTS FOR ROLE-BASED INTERVIEWS ============
 
@@ -1884,7 +2634,7 @@ def get_interview_violations(current_user_id, interview_id):
 def get_roles(current_user_id):
     """Get all available roles (user's custom roles)"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -1921,7 +2671,7 @@ def create_role(current_user_id):
         return jsonify({'error': 'Role name is required'}), 400
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Default evaluation criteria
@@ -1960,7 +2710,7 @@ def create_role(current_user_id):
 def get_role(current_user_id, role_id):
     """Get detailed information about a specific role"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -2012,7 +2762,7 @@ def update_role(current_user_id, role_id):
     data = request.json
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Verify ownership
@@ -2060,7 +2810,7 @@ def update_role(current_user_id, role_id):
 def delete_role(current_user_id, role_id):
     """Delete a role"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Verify ownership
@@ -2089,7 +2839,7 @@ def add_question(current_user_id, role_id):
         return jsonify({'error': 'Question text is required'}), 400
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Verify role ownership
@@ -2099,6 +2849,14 @@ def add_question(current_user_id, role_id):
             if not role or role[0] != current_user_id:
                 return jsonify({'error': 'Role not found or unauthorized'}), 404
             
+            duplicate = question_index.find(f"custom_role:{role_id}", data['question'])
+            if duplicate and not data.get('allow_duplicate'):
+                return jsonify({
+                    'error': 'A similar question already exists for this role',
+                    'duplicate_id': duplicate[0],
+                    'similarity': duplicate[1]
+                }), 409
+            
             cursor.execute('''
                 INSERT INTO custom_questions (role_id, question, topic, difficulty_level, expected_points)
                 VALUES (?, ?, ?, ?, ?)
@@ -2111,6 +2869,7 @@ def add_question(current_user_id, role_id):
             ))
             
             question_id = cursor.lastrowid
+            question_index.add(f"custom_role:{role_id}", question_id, data['question'])
             
             return jsonify({
                 'message': 'Question added successfully',
@@ -2127,12 +2886,12 @@ def update_question(current_user_id, question_id):
     data = request.json
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Verify ownership through role
             cursor.execute('''
-                SELECT cr.user_id
+                SELECT cr.user_id, cq.role_id
                 FROM custom_questions cq
                 JOIN custom_roles cr ON cq.role_id = cr.id
                 WHERE cq.id = ?
@@ -2147,6 +2906,13 @@ def update_question(current_user_id, question_id):
             params = []
             
             if 'question' in data:
+                duplicate = question_index.find(f"custom_role:{result[1]}", data['question'])
+                if duplicate and duplicate[0] != question_id and not data.get('allow_duplicate'):
+                    return jsonify({
+                        'error': 'A similar question already exists for this role',
+                        'duplicate_id': duplicate[0],
+                        'similarity': duplicate[1]
+                    }), 409
                 update_fields.append('question = ?')
                 params.append(data['question'])
             if 'topic' in data:
@@ -2167,6 +2933,9 @@ def update_question(current_user_id, question_id):
                     WHERE id = ?
                 ''', params)
             
+            if 'question' in data:
+                question_index.add(f"custom_role:{result[1]}", question_id, data['question'])
+            
             return jsonify({'message': 'Question updated successfully'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -2177,12 +2946,12 @@ def update_question(current_user_id, question_id):
 def delete_question(current_user_id, question_id):
     """Delete a question"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Verify ownership through role
             cursor.execute('''
-                SELECT cr.user_id
+                SELECT cr.user_id, cq.role_id
                 FROM custom_questions cq
                 JOIN custom_roles cr ON cq.role_id = cr.id
                 WHERE cq.id = ?
@@ -2193,6 +2962,7 @@ def delete_question(current_user_id, question_id):
                 return jsonify({'error': 'Question not found or unauthorized'}), 404
             
             cursor.execute('DELETE FROM custom_questions WHERE id = ?', (question_id,))
+            question_index.remove(f"custom_role:{result[1]}", question_id)
             
             return jsonify({'message': 'Question deleted successfully'}), 200
     except Exception as e:
@@ -2206,7 +2976,7 @@ def delete_question(current_user_id, question_id):
 def get_resources(current_user_id):
     """Get all learning resources"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -2242,7 +3012,7 @@ def create_resource(current_user_id):
         return jsonify({'error': 'Resource title is required'}), 400
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -2274,7 +3044,7 @@ def update_resource(current_user_id, resource_id):
     data = request.json
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Verify ownership
@@ -2322,7 +3092,7 @@ def update_resource(current_user_id, resource_id):
 def delete_resource(current_user_id, resource_id):
     """Delete a resource"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Verify ownership
@@ -2373,25 +3143,26 @@ def start_multi_round_interview(current_user_id):
         return jsonify({'error': 'Job role and selected rounds are required'}), 400
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Create interview
             cursor.execute('''
-                INSERT INTO interviews (user_id, job_role, status, created_at)
-                VALUES (?, ?, 'in_progress', datetime('now'))
-            ''', (current_user_id, job_role))
+                INSERT INTO interviews (user_id, job_role, resume_path, job_description, status, created_at)
+                VALUES (?, ?, '', ?, 'in_progress', datetime('now'))
+            ''', (current_user_id, job_role, job_description))
             
             interview_id = cursor.lastrowid
             
             # Create rounds
             round_ids = []
+            prefetch_status = 'pending' if app.config['ROUND_PREFETCH'] else None
             for idx, round_data in enumerate(selected_rounds):
                 cursor.execute('''
                     INSERT INTO interview_rounds (
                         interview_id, round_name, round_type, round_order,
-                        duration_minutes, question_count, focus_areas, status
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, 'pending')
+                        duration_minutes, question_count, focus_areas, status, prefetch_status
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', ?)
                 ''', (
                     interview_id,
                     round_data['round_name'],
@@ -2399,110 +3170,280 @@ def start_multi_round_interview(current_user_id):
                     idx + 1,
                     round_data.get('duration_minutes', 30),
                     round_data.get('question_count', 5),
-                    json.dumps(round_data.get('focus_areas', []))
+                    json.dumps(round_data.get('focus_areas', [])),
+                    prefetch_status
                 ))
                 round_ids.append(cursor.lastrowid)
-            
-            return jsonify({
-                'interview_id': interview_id,
-                'round_ids': round_ids,
-                'message': 'Multi-round interview created successfully'
-            }), 200
-            
+        
+        # Queued after the rounds are committed, in round order so the
+        # first rounds are ready first
+        if prefetch_status:
+            for round_id, round_data in zip(round_ids, selected_rounds):
+                queue_round_prefetch(current_user_id, round_id, round_data['round_type'], round_data['round_name'],
+                                     job_role, job_description, round_data.get('question_count', 5))
+        
+        return jsonify({
+            'interview_id': interview_id,
+            'round_ids': round_ids,
+            'message': 'Multi-round interview created successfully'
+        }), 200
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def prefetch_round_questions(user_id, round_id, round_type, round_name, job_role, job_description, question_count):
+    """Draw a round's questions and store them on the round until it starts"""
+    started = time.perf_counter()
+    try:
+        questions = draw_round_questions(user_id, round_type, round_name, job_role, job_description, question_count)
+    except Exception as e:
+        print(f"Error prefetching round questions: {str(e)}")
+        questions = []
+    status = 'ready' if questions else 'failed'
+    
+    try:
+        with db.connection() as conn:
+            conn.execute('''
+                UPDATE interview_rounds SET prefetch_status = ?, prefetched_questions = ?
+                WHERE id = ? AND prefetch_status = 'pending'
+            ''', (status, json.dumps(questions) if questions else None, round_id))
+    except Exception as e:
+        print(f"Error storing prefetched round questions: {str(e)}")
+        status = 'failed'
+    
+    with round_prefetch_lock:
+        round_prefetch_futures.pop(round_id, None)
+        round_prefetch_stats[status] += 1
+        round_prefetch_stats['generate_ms'] += (time.perf_counter() - started) * 1000
+
+
+def queue_round_prefetch(user_id, round_id, round_type, round_name, job_role, job_description, question_count):
+    with round_prefetch_lock:
+        round_prefetch_futures[round_id] = round_prefetch_executor.submit(
+            prefetch_round_questions, user_id, round_id, round_type, round_name, job_role,
+            job_description, question_count
+        )
+        round_prefetch_stats['queued'] += 1
+
+
+def take_prefetched_round_questions(round_id):
+    """
+    Prefetched questions for a round that is starting, or None to generate on demand
+    
+    A prefetch still queued is cancelled. One already running is waited for up
+    to ROUND_PREFETCH_WAIT seconds, since it finishes sooner than a new call.
+    """
+    with round_prefetch_lock:
+        future = round_prefetch_futures.pop(round_id, None)
+    
+    waited = False
+    if future is not None and not future.cancel():
+        waited = not future.done()
+        try:
+            future.result(timeout=app.config['ROUND_PREFETCH_WAIT'])
+        except Exception:
+            pass
+    
+    with db.connection() as conn:
+        # Claim the questions, so a late prefetch cannot store over the on-demand ones
+        conn.execute('''
+            UPDATE interview_rounds SET prefetch_status = 'abandoned'
+            WHERE id = ? AND prefetch_status = 'pending'
+        ''', (round_id,))
+        row = conn.execute('''
+            SELECT prefetch_status, prefetched_questions FROM interview_rounds WHERE id = ?
+        ''', (round_id,)).fetchone()
+    
+    with round_prefetch_lock:
+        if row and row[0] == 'ready' and row[1]:
+            round_prefetch_stats['served'] += 1
+            round_prefetch_stats['waited'] += int(waited)
+            return json.loads(row[1])
+        round_prefetch_stats['on_demand'] += 1
+    return None
+
+
+def get_round_prefetch_stats():
+    """Prefetch outcomes and how many rounds started without waiting on the LLM"""
+    with round_prefetch_lock:
+        stats = dict(round_prefetch_stats)
+        stats['in_flight'] = len(round_prefetch_futures)
+    
+    finished = stats['ready'] + stats['failed']
+    started = stats['served'] + stats['on_demand']
+    stats['enabled'] = app.config['ROUND_PREFETCH']
+    stats['avg_generate_ms'] = round(stats.pop('generate_ms') / finished, 2) if finished else 0
+    stats['instant_start_rate'] = round((stats['served'] - stats['waited']) / started, 4) if started else 0
+    return stats
+
+
 @app.route('/api/start-round/<int:round_id>', methods=['POST'])
 @token_required
 def start_round(current_user_id, round_id):
-    """Start a specific interview round and generate questions"""
+    """Start a specific interview round with its prefetched or freshly generated questions"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Get round details
             cursor.execute('''
-                SELECT ir.*, i.job_role, i.user_id
+                SELECT ir.interview_id, ir.round_name, ir.round_type, ir.question_count,
+                       i.job_role, i.job_description, i.user_id
                 FROM interview_rounds ir
                 JOIN interviews i ON ir.interview_id = i.id
                 WHERE ir.id = ?
             ''', (round_id,))
             
             round_data = cursor.fetchone()
-            if not round_data:
-                return jsonify({'error': 'Round not found'}), 404
-            
-            # Verify ownership
-            if round_data[10] != current_user_id:  # user_id from join
-                return jsonify({'error': 'Unauthorized'}), 403
-            
-            round_name = round_data[2]
-            round_type = round_data[3]
-            question_count = round_data[6]
-            job_role = round_data[9]
-            
-            # Generate questions for this round
-            questions = generate_round_questions(
-                round_type, round_name, job_role, '', question_count
-            )
-            
-            # Store questions
-            question_ids = []
-            for q in questions:
-                cursor.execute('''
-                    INSERT INTO interview_questions (
-                        interview_id, round_id, question, expected_points,
-                        question_type, time_limit_seconds
-                    ) VALUES (?, ?, ?, ?, 'main', 300)
-                ''', (
-                    round_data[1],  # interview_id
-                    round_id,
-                    q['question'],
-                    json.dumps(q.get('expected_points', []))
-                ))
-                question_ids.append(cursor.lastrowid)
-            
-            # Update round status
-            cursor.execute('''
-                UPDATE interview_rounds
-                SET status = 'in_progress', started_at = datetime('now')
-                WHERE id = ?
+        
+        if not round_data:
+            return jsonify({'error': 'Round not found'}), 404
+        
+        # Verify ownership
+        if round_data[6] != current_user_id:
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        # Claim the round, so a repeated or concurrent start cannot store a second set of questions
+        with db.connection() as conn:
+            cursor = conn.execute('''
+                UPDATE interview_rounds SET status = 'in_progress', started_at = datetime('now')
+                WHERE id = ? AND COALESCE(status, 'pending') = 'pending'
             ''', (round_id,))
-            
-            # Get full question details
-            cursor.execute('''
-                SELECT id, question, expected_points
-                FROM interview_questions
-                WHERE id IN ({})
-            '''.format(','.join('?' * len(question_ids))), question_ids)
-            
-            questions_with_ids = [
-                {
-                    'id': row[0],
-                    'question': row[1],
-                    'expected_points': json.loads(row[2]) if row[2] else []
-                }
-                for row in cursor.fetchall()
-            ]
-            
-            return jsonify({
-                'round_id': round_id,
-                'round_name': round_name,
-                'round_type': round_type,
-                'questions': questions_with_ids
-            }), 200
-            
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Round has already been started'}), 409
+        
+        try:
+            response = start_claimed_round(current_user_id, round_id, *round_data[:6])
+        except ValueError as e:
+            release_round_claim(round_id)
+            return jsonify({'error': str(e)}), 502
+        except Exception:
+            release_round_claim(round_id)
+            raise
+        
+        if response is None:
+            release_round_claim(round_id)
+            return jsonify({'error': 'No questions are available that were not already asked in this interview'}), 409
+        return response
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def release_round_claim(round_id):
+    """Put a round start_round claimed back to pending so it can be started again"""
+    with db.connection() as conn:
+        conn.execute('''
+            UPDATE interview_rounds SET status = 'pending', started_at = NULL WHERE id = ?
+        ''', (round_id,))
+
+
+def start_claimed_round(current_user_id, round_id, interview_id, round_name, round_type,
+                        question_count, job_role, job_description):
+    """
+    Store the questions of a round start_round has marked in progress
+    
+    Returns:
+        the response, or None when every available question paraphrases one
+        already asked in the interview
+    
+    Raises:
+        ValueError: no questions could be generated
+    """
+    with db.connection() as conn:
+        asked = [
+            row[0] for row in
+            conn.execute('SELECT question FROM interview_questions WHERE interview_id = ?', (interview_id,))
+        ]
+    
+    # Use the questions drawn when the interview was created; draw them
+    # now only if that failed, never ran or is taking too long
+    questions = take_prefetched_round_questions(round_id)
+    if questions is None:
+        questions = draw_round_questions(
+            current_user_id, round_type, round_name, job_role, job_description or '', question_count
+        )
+    
+    # Skip paraphrases of questions asked in earlier rounds, and draw once
+    # more for the ones skipped
+    questions = [questions[position] for position in question_index.unique([q['question'] for q in questions], asked)]
+    missing = question_count - len(questions)
+    extra = []
+    if missing > 0:
+        extra = draw_round_questions(
+            current_user_id, round_type, round_name, job_role, job_description or '', missing
+        )
+        kept = asked + [q['question'] for q in questions]
+        questions += [extra[position] for position in question_index.unique([q['question'] for q in extra], kept)]
+    
+    if not questions:
+        # The last draw came back empty: a generation failure, not a repeat
+        if not extra:
+            raise ValueError('Could not generate questions for this round')
+        return None
+    
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        
+        # Store questions
+        question_ids = []
+        for q in questions:
+            cursor.execute('''
+                INSERT INTO interview_questions (
+                    interview_id, round_id, question, expected_points,
+                    question_type, time_limit_seconds
+                ) VALUES (?, ?, ?, ?, 'main', 300)
+            ''', (
+                interview_id,
+                round_id,
+                q['question'],
+                json.dumps(q.get('expected_points', []))
+            ))
+            question_ids.append(cursor.lastrowid)
+            # Compile the points now so answers are scored without the setup cost
+            evaluation_engine.coverage.prepare(q.get('expected_points', []))
+        
+        # Only questions the round keeps count as served from the bank
+        question_bank.mark_served(current_user_id, [q['bank_id'] for q in questions if q.get('bank_id')])
+        
+        # The prefetched copy is no longer needed
+        cursor.execute('''
+            UPDATE interview_rounds
+            SET prefetch_status = 'consumed', prefetched_questions = NULL
+            WHERE id = ?
+        ''', (round_id,))
+        
+        # Get full question details
+        cursor.execute('''
+            SELECT id, question, expected_points
+            FROM interview_questions
+            WHERE id IN ({})
+        '''.format(','.join('?' * len(question_ids))), question_ids)
+        
+        questions_with_ids = [
+            {
+                'id': row[0],
+                'question': row[1],
+                'expected_points': json.loads(row[2]) if row[2] else []
+            }
+            for row in cursor.fetchall()
+        ]
+    
+    return jsonify({
+        'round_id': round_id,
+        'round_name': round_name,
+        'round_type': round_type,
+        'questions': questions_with_ids
+    }), 200
+
+
 @app.route('/api/complete-round/<int:round_id>', methods=['POST'])
 @token_required
 def complete_round(current_user_id, round_id):
     """Complete a round and calculate score"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Get round and verify ownership
@@ -2563,7 +3504,7 @@ def complete_round(current_user_id, round_id):
                 response['all_rounds_complete'] = True
             
             return jsonify(response), 200
-            
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2584,7 +3525,7 @@ def start_role_interview(current_user_id):
     difficulty_level = data.get('difficultyLevel', 'medium')
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Get role information
@@ -2629,6 +3570,7 @@ def start_role_interview(current_user_id):
                     INSERT INTO interview_questions (interview_id, question, topic, expected_points)
                     VALUES (?, ?, ?, ?)
                 ''', (interview_id, q[1], q[2], q[3]))
+                evaluation_engine.coverage.prepare(json.loads(q[3]) if q[3] else [])
                 
                 q_id = cursor.lastrowid
                 questions_with_ids.append({
@@ -2649,21 +3591,204 @@ def start_role_interview(current_user_id):
         return jsonify({'error': str(e)}), 500
 
 
+def resolve_followup_question(question_text, answer, prompt_type, speculation=None):
+    """
+    Produce the follow-up for the real score, reusing the speculative one when it matches
+    
+    speculation is the {'type', 'future'} set up before the answer was
+    evaluated, or None when no evaluation ran (cache hit or reused scores) or
+    speculation is off. A mismatched speculation is cancelled if it has not
+    started yet, otherwise its result is discarded. Outcomes of speculated
+    evaluations are counted in followup_speculation_stats.
+    """
+    speculative_future = speculation.get('future') if speculation else None
+    if speculative_future is not None and speculation['type'] == prompt_type:
+        outcome = 'used'
+        followup_question = speculative_future.result()
+    else:
+        if speculative_future is not None:
+            outcome = 'cancelled' if speculative_future.cancel() else 'wasted'
+        elif not speculation:
+            outcome = None
+        else:
+            outcome = 'missed' if prompt_type else 'skipped'
+        
+        followup_question = None
+        if prompt_type:
+            followup_question = generate_followup_question(question_text, answer, prompt_type=prompt_type)
+    
+    if outcome:
+        with followup_speculation_lock:
+            if speculative_future is not None:
+                followup_speculation_stats['speculated'] += 1
+            followup_speculation_stats[outcome] += 1
+    
+    return followup_question
+
+
+def get_followup_speculation_stats():
+    """Speculative follow-up outcome counters and the share of speculations that were thrown away"""
+    with followup_speculation_lock:
+        stats = dict(followup_speculation_stats)
+    
+    stats['enabled'] = app.config['SPECULATIVE_FOLLOWUP']
+    stats['waste_rate'] = round((stats['cancelled'] + stats['wasted']) / stats['speculated'], 4) if stats['speculated'] else 0
+    return stats
+
+
+def process_answer_evaluation(interview_id, question_id, question_text, answer,
+                              expected_points, evaluation_criteria, is_main_question):
+    """
+    Evaluate an answer, store the scores and create a follow-up question if needed
+    
+    No database connection is held while the LLM calls run, so this is safe to
+    call from the request thread or from a background job worker.
+    
+    Returns:
+        response payload with the evaluation and the optional follow-up
+    """
+    # Speculatively start the follow-up the pre-score predicts, so it runs
+    # alongside evaluation instead of after it. Only a real evaluation is worth
+    # overlapping; a cache hit or reused scores return at once
+    speculation = {}
+    
+    def speculate():
+        pre_score = evaluation_engine.estimate_overall_score(answer, expected_points, evaluation_criteria)
+        speculation['type'] = followup_prompt_type(pre_score)
+        if speculation['type']:
+            speculation['future'] = followup_executor.submit(
+                generate_followup_question, question_text, answer, prompt_type=speculation['type']
+            )
+    
+    # Evaluate the answer using the enhanced evaluation engine
+    evaluation_result = evaluate_response_cached(
+        question_text,
+        answer,
+        expected_points,
+        evaluation_criteria,
+        on_evaluate=speculate if is_main_question and app.config['SPECULATIVE_FOLLOWUP'] else None
+    )
+    
+    # Generate follow-up question if needed
+    followup_question = None
+    followup_question_id = None
+    
+    if is_main_question:
+        followup_question = resolve_followup_question(
+            question_text,
+            answer,
+            followup_prompt_type(evaluation_result['overall_score']),
+            speculation
+        )
+    
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        
+        # Store answer and detailed scores
+        cursor.execute('''
+            UPDATE interview_questions
+            SET answer = ?, 
+                score = ?,
+                technical_score = ?,
+                communication_score = ?,
+                confidence_score = ?,
+                feedback = ?
+            WHERE id = ? AND interview_id = ?
+        ''', (
+            answer,
+            evaluation_result['overall_score'],
+            evaluation_result['technical_score'],
+            evaluation_result['communication_score'],
+            evaluation_result['confidence_score'],
+            evaluation_result['feedback'],
+            question_id,
+            interview_id
+        ))
+        
+        # Update overall interview score
+        cursor.execute('''
+            UPDATE interviews
+            SET score = (
+                SELECT AVG(score)
+                FROM interview_questions
+                WHERE interview_id = ? AND score IS NOT NULL
+            )
+            WHERE id = ?
+        ''', (interview_id, interview_id))
+        
+        if followup_question:
+            # Store follow-up question in database
+            cursor.execute('''
+                INSERT INTO interview_questions 
+                (interview_id, question, question_type, parent_question_id, time_limit_seconds, expected_points)
+                VALUES (?, ?, 'followup', ?, 120, ?)
+            ''', (interview_id, followup_question, question_id, json.dumps([])))
+            
+            followup_question_id = cursor.lastrowid
+            
+            # Mark main question as having follow-up
+            cursor.execute('''
+                UPDATE interview_questions
+                SET requires_followup = TRUE
+                WHERE id = ?
+            ''', (question_id,))
+    
+    response_data = {
+        'message': 'Answer evaluated successfully',
+        'evaluation': evaluation_result,
+        'interviewId': interview_id,
+        'questionId': question_id
+    }
+    
+    # Add follow-up if generated
+    if followup_question:
+        response_data['followup'] = {
+            'question': followup_question,
+            'questionId': followup_question_id,
+            'timeLimit': 120  # 2 minutes for follow-up
+        }
+    
+    return response_data
+
+
+def run_answer_evaluation_job(payload):
+    """Background job handler for asynchronous answer evaluation"""
+    return process_answer_evaluation(
+        payload['interview_id'],
+        payload['question_id'],
+        payload['question_text'],
+        payload['answer'],
+        payload['expected_points'],
+        payload['evaluation_criteria'],
+        payload['is_main_question']
+    )
+
+
+job_queue.register('evaluate_answer', run_answer_evaluation_job)
+
+
 @app.route('/api/submit-answer-enhanced', methods=['POST'])
 @token_required
 @rate_limit('submit_answer')
 def submit_answer_enhanced(current_user_id):
-    """Submit answer with enhanced multi-dimensional evaluation"""
+    """
+    Submit answer with enhanced multi-dimensional evaluation
+    
+    With "async": true in the body (or ASYNC_ANSWER_EVALUATION enabled), the
+    answer is saved, an evaluation job is queued and 202 is returned with the
+    job id. Results are then available from /api/jobs/<job_id> or its SSE stream.
+    """
     data = request.json
     interview_id = data.get('interviewId')
     question_id = data.get('questionId')
     answer = data.get('answer')
+    run_async = data.get('async', app.config['ASYNC_ANSWER_EVALUATION'])
     
     if not all([interview_id, question_id, answer]):
         return jsonify({'error': 'Missing required fields'}), 400
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Verify interview belongs to user and get evaluation weights
@@ -2679,7 +3804,7 @@ def submit_answer_enhanced(current_user_id):
             
             # Get question details
             cursor.execute('''
-                SELECT question, expected_points
+                SELECT question, expected_points, question_type
                 FROM interview_questions
                 WHERE id = ? AND interview_id = ?
             ''', (question_id, interview_id))
@@ -2690,6 +3815,8 @@ def submit_answer_enhanced(current_user_id):
             
             question_text = question_data[0]
             expected_points = json.loads(question_data[1]) if question_data[1] else []
+            # Follow-ups are only generated for main questions
+            is_main_question = question_data[2] == 'main'
             
             # Get evaluation criteria - prioritize custom weights from interview
             evaluation_criteria = {'technical_weight': 0.4, 'communication_weight': 0.3, 'confidence_weight': 0.3}  # Default
@@ -2707,101 +3834,151 @@ def submit_answer_enhanced(current_user_id):
                 if role_data and role_data[0]:
                     evaluation_criteria = json.loads(role_data[0])
             
-            # Evaluate the answer using the enhanced evaluation engine
-            evaluation_result = evaluation_engine.evaluate_response(
-                question_text,
-                answer,
-                expected_points,
-                evaluation_criteria
-            )
-            
-            # Store answer and detailed scores
-            cursor.execute('''
-                UPDATE interview_questions
-                SET answer = ?, 
-                    score = ?,
-                    technical_score = ?,
-                    communication_score = ?,
-                    confidence_score = ?,
-                    feedback = ?
-                WHERE id = ? AND interview_id = ?
-            ''', (
-                answer,
-                evaluation_result['overall_score'],
-                evaluation_result['technical_score'],
-                evaluation_result['communication_score'],
-                evaluation_result['confidence_score'],
-                evaluation_result['feedback'],
-                question_id,
-                interview_id
-            ))
-            
-            # Update overall interview score
-            cursor.execute('''
-                UPDATE interviews
-                SET score = (
-                    SELECT AVG(score)
-                    FROM interview_questions
-                    WHERE interview_id = ? AND score IS NOT NULL
-                )
-                WHERE id = ?
-            ''', (interview_id, interview_id))
-            
-            # Generate follow-up question if needed
-            followup_question = None
-            followup_question_id = None
-            overall_score = evaluation_result['overall_score']
-            
-            # Check if this is a main question (not already a follow-up)
-            cursor.execute('SELECT question_type FROM interview_questions WHERE id = ?', (question_id,))
-            q_type_result = cursor.fetchone()
-            is_main_question = q_type_result and q_type_result[0] == 'main'
-            
-            if is_main_question and (overall_score < 60 or overall_score >= 85):
-                followup_question = generate_followup_question(
-                    question_text,
-                    answer,
-                    overall_score
-                )
-                
-                if followup_question:
-                    # Store follow-up question in database
-                    cursor.execute('''
-                        INSERT INTO interview_questions 
-                        (interview_id, question, question_type, parent_question_id, time_limit_seconds, expected_points)
-                        VALUES (?, ?, 'followup', ?, 120, ?)
-                    ''', (interview_id, followup_question, question_id, json.dumps([])))
-                    
-                    followup_question_id = cursor.lastrowid
-                    
-                    # Mark main question as having follow-up
-                    cursor.execute('''
-                        UPDATE interview_questions
-                        SET requires_followup = TRUE
-                        WHERE id = ?
-                    ''', (question_id,))
+            if run_async:
+                # Save the answer now; scores are filled in by the job
+                cursor.execute('''
+                    UPDATE interview_questions
+                    SET answer = ?
+                    WHERE id = ? AND interview_id = ?
+                ''', (answer, question_id, interview_id))
+        
+        if run_async:
+            job_id = job_queue.enqueue('evaluate_answer', {
+                'interview_id': interview_id,
+                'question_id': question_id,
+                'question_text': question_text,
+                'answer': answer,
+                'expected_points': expected_points,
+                'evaluation_criteria': evaluation_criteria,
+                'is_main_question': is_main_question
+            }, user_id=current_user_id)
             
-            response_data = {
-                'message': 'Answer evaluated successfully',
-                'evaluation': evaluation_result,
+            return jsonify({
+                'message': 'Answer saved, evaluation queued',
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f'/api/jobs/{job_id}',
+                'stream_url': f'/api/jobs/{job_id}/stream',
                 'interviewId': interview_id,
                 'questionId': question_id
-            }
-            
-            # Add follow-up if generated
-            if followup_question:
-                response_data['followup'] = {
-                    'question': followup_question,
-                    'questionId': followup_question_id,
-                    'timeLimit': 120  # 2 minutes for follow-up
-                }
-            
-            return jsonify(response_data), 200
-            
+            }), 202
+        
+        response_data = process_answer_evaluation(
+            interview_id,
+            question_id,
+            question_text,
+            answer,
+            expected_points,
+            evaluation_criteria,
+            is_main_question
+        )
+        
+        return jsonify(response_data), 200
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+# ============ BACKGROUND JOB ENDPOINTS ============
+
+def sse_event(event, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def get_owned_job(job_id, current_user_id):
+    """Return the job if it exists and belongs to the user, else None"""
+    job = job_queue.get(job_id)
+    if not job or job['user_id'] != current_user_id:
+        return None
+    return job
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@token_required
+def get_job_status(current_user_id, job_id):
+    """Poll the status and result of a background job"""
+    job = get_owned_job(job_id, current_user_id)
+    if not job:
+        return jsonify({'error': 'Job not found or unauthorized'}), 404
+    
+    return jsonify(job), 200
+
+
+@app.route('/api/jobs/<job_id>/stream', methods=['GET'])
+@token_required
+def stream_job_status(current_user_id, job_id):
+    """Stream status and progress changes of a background job as Server-Sent Events until it finishes"""
+    job = get_owned_job(job_id, current_user_id)
+    if not job:
+        return jsonify({'error': 'Job not found or unauthorized'}), 404
+    
+    def generate():
+        last_status = None
+        last_progress = None
+        deadline = time.time() + app.config['JOB_STREAM_TIMEOUT']
+        
+        while time.time() < deadline:
+            current = job_queue.get(job_id)
+            if current['status'] != last_status or current.get('progress') != last_progress:
+                last_status = current['status']
+                last_progress = current.get('progress')
+                yield sse_event('status', current)
+                if last_status in ('completed', 'failed'):
+                    return
+            else:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+            
+            job_queue.wait_for_change(timeout=5)
+        
+        yield sse_event('timeout', {'job_id': job_id, 'status': last_status})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def load_scored_responses(cursor, interview_id):
+    """
+    Load an interview's scored answers
+    
+    Returns:
+        (all_responses, interview_data): score dicts for calculate_interview_metrics
+        and question/answer/feedback dicts for the improvement plan
+    """
+    # Get all question responses with scores
+    cursor.execute('''
+        SELECT question, answer, score, technical_score, communication_score, 
+               confidence_score, feedback
+        FROM interview_questions
+        WHERE interview_id = ? AND score IS NOT NULL
+    ''', (interview_id,))
+    
+    # Prepare response data for evaluation
+    all_responses = []
+    interview_data = []
+    
+    for resp in cursor.fetchall():
+        response_dict = {
+            'overall_score': resp[2],
+            'technical_score': resp[3],
+            'communication_score': resp[4],
+            'confidence_score': resp[5]
+        }
+        all_responses.append(response_dict)
+        
+        interview_data.append({
+            'question': resp[0],
+            'answer': resp[1],
+            'feedback': resp[6]
+        })
+    
+    return all_responses, interview_data
+
+
 @app.route('/api/complete-interview', methods=['POST'])
 @token_required
 def complete_interview(current_user_id):
@@ -2813,7 +3990,7 @@ def complete_interview(current_user_id):
         return jsonify({'error': 'Missing interview ID'}), 400
     
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Verify interview belongs to user
@@ -2826,38 +4003,11 @@ def complete_interview(current_user_id):
             
             role_id = interview[1]
             
-            # Get all question responses with scores
-            cursor.execute('''
-                SELECT question, answer, score, technical_score, communication_score, 
-                       confidence_score, feedback
-                FROM interview_questions
-                WHERE interview_id = ? AND score IS NOT NULL
-            ''', (interview_id,))
+            all_responses, interview_data = load_scored_responses(cursor, interview_id)
             
-            responses = cursor.fetchall()
-            
-            if not responses:
+            if not all_responses:
                 return jsonify({'error': 'No scored answers found'}), 404
             
-            # Prepare response data for evaluation
-            all_responses = []
-            interview_data = []
-            
-            for resp in responses:
-                response_dict = {
-                    'overall_score': resp[2],
-                    'technical_score': resp[3],
-                    'communication_score': resp[4],
-                    'confidence_score': resp[5]
-                }
-                all_responses.append(response_dict)
-                
-                interview_data.append({
-                    'question': resp[0],
-                    'answer': resp[1],
-                    'feedback': resp[6]
-                })
-            
             # Calculate aggregate metrics
             evaluation_metrics = evaluation_engine.calculate_interview_metrics(all_responses)
             
@@ -2920,7 +4070,7 @@ def complete_interview(current_user_id):
                 response_data['personalized_feedback'] = personalized_feedback
             
             return jsonify(response_data), 200
-            
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2930,7 +4080,7 @@ def complete_interview(current_user_id):
 def get_personalized_feedback(current_user_id, interview_id):
     """Get personalized feedback and learning path for an interview"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             cursor = conn.cursor()
             
             # Verify interview belongs to user
@@ -2966,17 +4116,179 @@ def get_personalized_feedback(current_user_id, interview_id):
                 'resources': json.loads(feedback_data[3]),
                 'generated_at': feedback_data[4]
             }), 200
-            
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/personalized-feedback/<int:interview_id>/stream', methods=['GET'])
+@token_required
+def stream_personalized_feedback_route(current_user_id, interview_id):
+    """
+    Generate personalized feedback and stream it token-by-token as Server-Sent Events
+    
+    Sends 'token' events with raw model output, then a 'done' event with the
+    parsed feedback once it has been saved to learning_paths.
+    """
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM interviews WHERE id = ? AND user_id = ?',
+                      (interview_id, current_user_id))
+        if not cursor.fetchone():
+            return jsonify({'error': 'Interview not found or unauthorized'}), 404
+    
+    def generate():
+        for event, data in stream_personalized_feedback(interview_id):
+            yield sse_event(event, {'text': data} if event == 'token' else data)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/interview-questions/<int:question_id>/feedback/stream', methods=['GET'])
+@token_required
+def stream_answer_feedback(current_user_id, question_id):
+    """
+    Regenerate feedback for an evaluated answer and stream it as Server-Sent Events
+    
+    The assembled feedback replaces interview_questions.feedback when the stream
+    ends; if it fails part way an 'error' event is sent and the stored feedback is kept.
+    """
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT iq.question, iq.answer, iq.expected_points, iq.technical_score,
+                   iq.communication_score, iq.confidence_score
+            FROM interview_questions iq
+            JOIN interviews i ON iq.interview_id = i.id
+            WHERE iq.id = ? AND i.user_id = ?
+        ''', (question_id, current_user_id))
+        question_data = cursor.fetchone()
+    
+    if not question_data:
+        return jsonify({'error': 'Question not found or unauthorized'}), 404
+    
+    question_text, answer, expected_points, technical, communication, confidence = question_data
+    if answer is None or technical is None:
+        return jsonify({'error': 'Answer has not been evaluated yet'}), 400
+    
+    def generate():
+        chunks = []
+        try:
+            for text in evaluation_engine.stream_feedback(
+                question_text,
+                answer,
+                json.loads(expected_points) if expected_points else [],
+                technical,
+                communication,
+                confidence
+            ):
+                chunks.append(text)
+                yield sse_event('token', {'text': text})
+        except Exception as e:
+            print(f"Error streaming answer feedback: {str(e)}")
+            yield sse_event('error', 'Could not generate feedback')
+            return
+        
+        feedback = ''.join(chunks).strip()
+        if not feedback:
+            yield sse_event('error', 'Could not generate feedback')
+            return
+        with db.connection() as conn:
+            conn.execute('UPDATE interview_questions SET feedback = ? WHERE id = ?', (feedback, question_id))
+        
+        yield sse_event('done', {'feedback': feedback})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/improvement-plan/<int:interview_id>/stream', methods=['GET'])
+@token_required
+def stream_improvement_plan(current_user_id, interview_id):
+    """
+    Generate the improvement plan and stream its improvement steps as Server-Sent Events
+    
+    The finished plan replaces the steps of the interview's latest improvement
+    plan, or is stored as a new plan if none exists yet.
+    """
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, role_id FROM interviews WHERE id = ? AND user_id = ?',
+                      (interview_id, current_user_id))
+        interview = cursor.fetchone()
+        
+        if not interview:
+            return jsonify({'error': 'Interview not found or unauthorized'}), 404
+        
+        all_responses, interview_data = load_scored_responses(cursor, interview_id)
+    
+    if not all_responses:
+        return jsonify({'error': 'No scored answers found'}), 404
+    
+    evaluation_metrics = evaluation_engine.calculate_interview_metrics(all_responses)
+    
+    def generate():
+        for event, data in improvement_generator.stream_improvement_plan(
+            interview_data, evaluation_metrics, interview[1]
+        ):
+            if event == 'token':
+                yield sse_event('token', {'text': data})
+                continue
+            if event == 'error':
+                # The stored plan is left as it was
+                yield sse_event('error', data)
+                return
+            
+            with db.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    UPDATE improvement_plans
+                    SET improvement_steps = ?
+                    WHERE id = (
+                        SELECT id FROM improvement_plans
+                        WHERE interview_id = ?
+                        ORDER BY created_at DESC, id DESC
+                        LIMIT 1
+                    )
+                ''', (json.dumps(data['improvement_steps']), interview_id))
+                
+                if cursor.rowcount == 0:
+                    cursor.execute('''
+                        INSERT INTO improvement_plans
+                        (interview_id, weak_areas, improvement_steps, recommended_resources, 
+                         practice_plan, overall_recommendation)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (
+                        interview_id,
+                        json.dumps(data['weak_areas']),
+                        json.dumps(data['improvement_steps']),
+                        json.dumps(data['recommended_resources']),
+                        data['practice_plan'],
+                        data['overall_recommendation']
+                    ))
+            
+            yield sse_event('done', {'evaluation_metrics': evaluation_metrics, 'improvement_plan': data})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/interview-results/<int:interview_id>', methods=['GET'])
 @token_required
 def get_interview_results(current_user_id, interview_id):
     """Get complete interview results including evaluation and improvement plan"""
     try:
-        with sqlite3.connect(app.config['DATABASE']) as conn:
+        with db.connection() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             
@@ -3059,10 +4371,62 @@ def get_interview_results(current_user_id, interview_id):
             }
             
             return jsonify(result), 200
-            
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-        
+
+# ============ METRICS ENDPOINTS ============
+
+@app.route('/api/admin/risk-signals/rebuild', methods=['POST'])
+@token_required
+@require_role('admin')
+def rebuild_risk_signals(current_user_id):
+    """Rebuild the in-memory risk counters from audit_logs"""
+    audit_writer.flush()
+    risk_signals.rebuild()
+    log_audit(current_user_id, 'risk_signals_rebuilt', 'admin', None, None, True)
+    return jsonify({'message': 'Risk signals rebuilt', 'stats': risk_signals.get_stats()}), 200
+
+
+@app.route('/api/metrics', methods=['GET'])
+@token_required
+@require_role('admin')
+def get_metrics(current_user_id):
+    """Get performance metrics for the evaluation pipeline"""
+    return jsonify({
+        'evaluation': {
+            'mode': evaluation_engine.mode,
+            'timings': evaluation_engine.get_timing_stats(),
+            'fused': evaluation_engine.get_fused_stats(),
+            'coverage': evaluation_engine.get_coverage_stats()
+        },
+        'llm_gateway': llm_gateway.get_stats(),
+        'job_queue': job_queue.get_stats(),
+        'evaluation_cache': evaluation_cache.get_stats(),
+        'followup_speculation': get_followup_speculation_stats(),
+        'database': db.get_stats(),
+        'rate_limiter': rate_limiter.get_stats(),
+        'audit_writer': audit_writer.get_stats(),
+        'risk_signals': risk_signals.get_stats(),
+        'login': get_login_stats(),
+        'auth_workers': auth_workers.get_stats(),
+        'authorization_cache': authorization_cache.get_stats(),
+        'resume_store': resume_store.get_stats(),
+        'pdf_extractor': pdf_extractor.get_stats(),
+        'resume_condenser': resume_condenser.get_stats(),
+        'resume_pipeline': get_resume_pipeline_stats(),
+        'question_generation': get_question_generation_stats(),
+        'round_prefetch': get_round_prefetch_stats(),
+        'question_bank': question_bank.get_stats(),
+        'near_duplicates': question_index.get_stats(),
+        'answer_reuse': answer_reuse.get_stats()
+    }), 200
+
+
+# Start background workers once every job handler is registered
+job_queue.start()
+
+
 if __name__ == '__main__':
     app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
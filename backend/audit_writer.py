@@ -0,0 +1,185 @@
+"""
+Audit Writer Module
+Write-behind audit logger
+Events are queued in memory and a background thread inserts them into
+audit_logs in batches, so request handlers never wait on an audit commit
+"""
+
+import atexit
+import queue
+import threading
+import time
+
+
+AUDIT_COLUMNS = ('user_id', 'action', 'resource', 'resource_id', 'ip_address',
+                 'user_agent', 'details', 'success', 'timestamp')
+
+
+class AuditLogWriter:
+    def __init__(self, database, max_queue=10000, batch_size=200, flush_interval_ms=250):
+        """
+        Args:
+            database: shared Database holding the audit_logs table
+            max_queue: pending events held in memory before log() writes synchronously
+            batch_size: events written per transaction at most
+            flush_interval_ms: longest an event waits in the queue before being written
+        """
+        self.db = database
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._write_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._worker = None
+        
+        # enqueued/completed let flush() wait for events already taken by the worker
+        self._progress = threading.Condition()
+        self._enqueued = 0
+        self._completed = 0
+        
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'written': 0,
+            'batches': 0,
+            'sync_writes': 0,
+            'failed': 0,
+            'max_depth': 0,
+            'write_ms': 0.0
+        }
+    
+    def start(self):
+        """Start the background writer and flush pending events at exit"""
+        if self._worker:
+            return
+        
+        self._worker = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._worker.start()
+        atexit.register(self.stop)
+    
+    def stop(self, timeout=5):
+        """Stop the writer thread and write everything still queued"""
+        self._stopping.set()
+        if self._worker:
+            self._worker.join(timeout)
+        self.flush()
+    
+    def log(self, event):
+        """
+        Queue one audit event
+        
+        Args:
+            event: tuple of values in AUDIT_COLUMNS order
+        
+        When the queue is full the event is written synchronously instead, so
+        audit records are never dropped; sync_writes in get_stats shows how often.
+        """
+        with self._progress:
+            self._enqueued += 1
+        
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats['sync_writes'] += 1
+            self._write([event])
+            return
+        
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            if depth > self._stats['max_depth']:
+                self._stats['max_depth'] = depth
+    
+    def flush(self, timeout=2.0):
+        """
+        Write all queued events now
+        
+        Returns once every event logged before the call is in the database,
+        or after timeout seconds if the worker is still busy.
+        """
+        with self._progress:
+            target = self._enqueued
+        
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                break
+            self._write(batch)
+        
+        deadline = time.monotonic() + timeout
+        with self._progress:
+            while self._completed < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._progress.wait(remaining)
+    
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            
+            # Collect up to batch_size events or until flush_interval has passed
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            self._write(batch)
+    
+    def _write(self, batch):
+        """Insert a batch of events in one transaction"""
+        started = time.perf_counter()
+        
+        try:
+            with self._write_lock:
+                with self.db.connection() as conn:
+                    conn.executemany(f'''
+                        INSERT INTO audit_logs ({', '.join(AUDIT_COLUMNS)})
+                        VALUES ({', '.join('?' * len(AUDIT_COLUMNS))})
+                    ''', batch)
+            failed = False
+        except Exception as e:
+            print(f"Audit logging error: {str(e)}")
+            failed = True
+        
+        with self._stats_lock:
+            if failed:
+                self._stats['failed'] += len(batch)
+            else:
+                self._stats['written'] += len(batch)
+                self._stats['batches'] += 1
+                self._stats['write_ms'] += (time.perf_counter() - started) * 1000
+        
+        with self._progress:
+            self._completed += len(batch)
+            self._progress.notify_all()
+    
+    def get_stats(self):
+        """Write counters plus queue depth; sync_writes and max_depth show backpressure"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        
+        stats['queue_depth'] = self._queue.qsize()
+        stats['queue_capacity'] = self.max_queue
+        stats['avg_batch_size'] = round(stats['written'] / stats['batches'], 2) if stats['batches'] else 0
+        stats['avg_write_ms'] = round(stats.pop('write_ms') / stats['batches'], 2) if stats['batches'] else 0
+        return stats
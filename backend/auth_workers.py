@@ -0,0 +1,251 @@
+"""
+Auth Workers Module
+Process pool for CPU-bound authentication work
+Password hashing and TOTP QR rendering run in worker processes, so a burst of
+sign-ups no longer holds the GIL of the process serving every other request
+"""
+
+import base64
+import io
+import math
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import qrcode
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class AuthWorkersBusy(Exception):
+    """A task did not finish within the timeout, or the pool could not run it"""
+    
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# Task functions run in the workers; they live at module level so they pickle by name
+
+def hash_password(password):
+    return generate_password_hash(password)
+
+
+def verify_password(password_hash, password):
+    return check_password_hash(password_hash, password)
+
+
+def render_totp_qr(provisioning_uri):
+    """Render a provisioning URI as a base64-encoded PNG QR code"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(provisioning_uri)
+    qr.make(fit=True)
+    
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffered = io.BytesIO()
+    img.save(buffered)
+    return base64.b64encode(buffered.getvalue()).decode('utf-8')
+
+
+def _timed(fn, *args):
+    """Run fn in the worker and report how long the work itself took"""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+class AuthWorkerPool:
+    def __init__(self, max_workers=2, timeout=10.0, qr_cache_size=1024):
+        """
+        Args:
+            max_workers: worker processes; 0 runs every task inline in the caller
+            timeout: seconds a request waits for a task before AuthWorkersBusy is raised
+            qr_cache_size: users whose rendered QR code is kept in memory
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.qr_cache_size = qr_cache_size
+        
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._inline = max_workers <= 0
+        self._pooled = False  # set by start(); until then tasks run inline
+        self._started_at = time.time()
+        
+        self._qr_cache = OrderedDict()  # user_id -> (provisioning_uri, qr_code)
+        self._qr_lock = threading.Lock()
+        
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+        self._counters = {'qr_cache_hits': 0, 'qr_cache_misses': 0, 'timeouts': 0, 'broken_pools': 0, 'rebuilds': 0}
+    
+    def start(self):
+        """
+        Fork the worker processes
+        
+        Call this before the app starts any background thread. Workers are
+        forked rather than spawned so they do not re-import app.py, and forking
+        while only the main thread exists keeps them free of inherited locks.
+        A pool broken by a dying worker is replaced on the next task; its
+        workers only hash passwords and render QR codes. Without fork support
+        the pool runs tasks inline.
+        """
+        if self._executor or self._inline:
+            return
+        
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            self._inline = True
+            return
+        
+        self._executor = self._new_executor()
+        self._pooled = True
+        # Each concurrent submit forks one more worker until the pool is full
+        warmup = [self._executor.submit(time.sleep, 0.05) for _ in range(self.max_workers)]
+        for future in warmup:
+            future.result()
+    
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('fork')
+        )
+    
+    def stop(self):
+        with self._executor_lock:
+            self._pooled = False
+            if self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+    
+    def _current_executor(self):
+        """The pool, replacing one that broke"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = self._new_executor()
+                self._count('rebuilds')
+            return self._executor
+    
+    def _discard(self, executor, error):
+        """Drop a broken pool so the next task builds a new one"""
+        with self._executor_lock:
+            if self._executor is executor:
+                print(f"Error in auth worker pool, replacing it: {str(error)}")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self._count('broken_pools')
+    
+    def _run(self, kind, fn, *args):
+        """
+        Run fn on a worker, blocking the calling request thread until it returns
+        
+        A task that meets a broken pool is retried once on a new pool.
+        
+        Raises:
+            AuthWorkersBusy: the task timed out, or failed on the new pool too
+        """
+        started = time.perf_counter()
+        retry_after = max(1, math.ceil(self.timeout))
+        
+        if not self._pooled:
+            result, work_ms = _timed(fn, *args)
+        else:
+            for attempt in range(2):
+                executor = self._current_executor()
+                future = None
+                try:
+                    future = executor.submit(_timed, fn, *args)
+                    result, work_ms = future.result(timeout=self.timeout)
+                    break
+                except BrokenProcessPool as e:
+                    self._discard(executor, e)
+                    if attempt:
+                        raise AuthWorkersBusy('Authentication workers are unavailable', retry_after)
+                except FuturesTimeoutError:
+                    # A task already running cannot be stopped; a queued one is dropped
+                    future.cancel()
+                    self._count('timeouts')
+                    raise AuthWorkersBusy('Authentication workers are busy', retry_after)
+        
+        blocked_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            stats = self._stats.setdefault(kind, {'calls': 0, 'work_ms': 0.0, 'blocked_ms': 0.0, 'max_blocked_ms': 0.0})
+            stats['calls'] += 1
+            stats['work_ms'] += work_ms
+            stats['blocked_ms'] += blocked_ms
+            stats['max_blocked_ms'] = max(stats['max_blocked_ms'], blocked_ms)
+        return result
+    
+    def _count(self, key):
+        with self._stats_lock:
+            self._counters[key] += 1
+    
+    def hash_password(self, password):
+        return self._run('hash_password', hash_password, password)
+    
+    def verify_password(self, password_hash, password):
+        return self._run('verify_password', verify_password, password_hash, password)
+    
+    def totp_qr(self, user_id, provisioning_uri):
+        """Base64 PNG QR code for a user's provisioning URI, rendered once and cached"""
+        with self._qr_lock:
+            cached = self._qr_cache.get(user_id)
+            if cached and cached[0] == provisioning_uri:
+                self._qr_cache.move_to_end(user_id)
+                with self._stats_lock:
+                    self._counters['qr_cache_hits'] += 1
+                return cached[1]
+        
+        qr_code = self._run('render_totp_qr', render_totp_qr, provisioning_uri)
+        
+        with self._qr_lock:
+            self._qr_cache[user_id] = (provisioning_uri, qr_code)
+            self._qr_cache.move_to_end(user_id)
+            while len(self._qr_cache) > self.qr_cache_size:
+                self._qr_cache.popitem(last=False)
+        with self._stats_lock:
+            self._counters['qr_cache_misses'] += 1
+        return qr_code
+    
+    def invalidate_qr(self, user_id):
+        with self._qr_lock:
+            self._qr_cache.pop(user_id, None)
+    
+    def get_stats(self):
+        """
+        Per-task counters
+        
+        work_ms is time spent computing in a worker and blocked_ms is time the
+        request thread waited, so blocked minus work is queueing and IPC overhead.
+        """
+        with self._stats_lock:
+            tasks = {kind: dict(stats) for kind, stats in self._stats.items()}
+            counters = dict(self._counters)
+        
+        uptime = max(time.time() - self._started_at, 1e-9)
+        for stats in tasks.values():
+            calls = stats['calls']
+            stats['avg_work_ms'] = round(stats['work_ms'] / calls, 2)
+            stats['avg_blocked_ms'] = round(stats['blocked_ms'] / calls, 2)
+            stats['max_blocked_ms'] = round(stats['max_blocked_ms'], 2)
+            # Sustainable rate per worker, and the rate actually served so far
+            stats['per_worker_per_second'] = round(1000 * calls / stats['work_ms'], 2) if stats['work_ms'] else 0
+            stats['per_second'] = round(calls / uptime, 4)
+            stats['work_ms'] = round(stats['work_ms'], 2)
+            stats['blocked_ms'] = round(stats['blocked_ms'], 2)
+        
+        with self._qr_lock:
+            counters['qr_cache_entries'] = len(self._qr_cache)
+        
+        return {
+            'workers': self.max_workers if self._pooled else 0,
+            'inline': not self._pooled,
+            'tasks': tasks,
+            **counters
+        }
@@ -0,0 +1,128 @@
+"""
+Authorization Cache Module
+Role and permission resolution for require_role without per-request queries
+Access tokens carry the role and permissions as claims; users whose role
+changed since a token was issued, and tokens without claims, fall back to a
+TTL LRU of user_roles rows
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_ROLE = 'candidate'
+
+
+class AuthorizationCache:
+    def __init__(self, database, max_entries=10000, ttl_seconds=300, token_lifetime=900):
+        """
+        Args:
+            database: shared Database holding the user_roles table
+            max_entries: users kept in the LRU
+            ttl_seconds: lifetime of a cached role, bounding staleness after
+                changes made outside invalidate() (e.g. by another process)
+            token_lifetime: access token lifetime; role changes older than this
+                can no longer affect a live token and are forgotten
+        """
+        self.db = database
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.token_lifetime = token_lifetime
+        
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user_id -> (expires_at, context)
+        self._changed_at = {}  # user_id -> time of the last role change
+        self._stats = {
+            'claim_hits': 0,
+            'stale_claims': 0,
+            'cache_hits': 0,
+            'misses': 0,
+            'invalidations': 0,
+            'evictions': 0
+        }
+    
+    def get(self, user_id):
+        """
+        Role and permissions for a user, from the LRU or user_roles
+        
+        Returns:
+            dict with 'role' and 'permissions'
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self._stats['cache_hits'] += 1
+                return entry[1]
+            self._stats['misses'] += 1
+        
+        context = self._load(user_id)
+        
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl_seconds, context)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return context
+    
+    def _load(self, user_id):
+        try:
+            with self.db.connection() as conn:
+                row = conn.execute(
+                    'SELECT role, permissions FROM user_roles WHERE user_id = ?', (user_id,)
+                ).fetchone()
+        except Exception as e:
+            print(f"Error loading user role: {str(e)}")
+            row = None
+        
+        if not row:
+            return {'role': DEFAULT_ROLE, 'permissions': []}
+        return {'role': row[0], 'permissions': json.loads(row[1]) if row[1] else []}
+    
+    def resolve(self, user_id, claims=None):
+        """
+        Authorization context for a request
+        
+        Args:
+            user_id: authenticated user
+            claims: decoded access token; its 'role'/'permissions' claims are
+                used unless the user's role changed after the token's 'iat'
+        """
+        if claims and 'role' in claims and 'iat' in claims:
+            with self._lock:
+                changed_at = self._changed_at.get(user_id)
+                # iat has one-second resolution, so a token issued in the same
+                # second as a change is treated as stale
+                if changed_at is None or claims['iat'] > changed_at:
+                    self._stats['claim_hits'] += 1
+                    return {'role': claims['role'], 'permissions': claims.get('permissions', [])}
+                self._stats['stale_claims'] += 1
+        
+        return self.get(user_id)
+    
+    def invalidate(self, user_id):
+        """Drop a user's cached role and distrust the claims in tokens issued before now"""
+        now = time.time()
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._changed_at[user_id] = now
+            self._stats['invalidations'] += 1
+            
+            cutoff = now - self.token_lifetime
+            for stale_user in [u for u, changed_at in self._changed_at.items() if changed_at < cutoff]:
+                del self._changed_at[stale_user]
+    
+    def get_stats(self):
+        """Lookup counters; misses are the only lookups that query the database"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['recent_changes'] = len(self._changed_at)
+        
+        lookups = stats['claim_hits'] + stats['cache_hits'] + stats['misses']
+        stats['query_free_rate'] = round((lookups - stats['misses']) / lookups, 4) if lookups else 0
+        return stats
@@ -0,0 +1,222 @@
+"""
+Coverage Scorer Module
+Local scoring of how well an answer covers a question's expected points
+Each question's expected points are compiled once into weighted term and phrase
+vectors, with terms shared by several points weighted down. An answer is scored
+by BM25-style saturated term frequency against every point, without an LLM
+call; batches of answers are scored as one matrix product when NumPy is installed
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from near_duplicates import stem
+
+try:
+    import numpy as np
+except ImportError:  # batches are scored one answer at a time
+    np = None
+
+
+STOPWORDS = frozenset((
+    'a', 'an', 'the', 'and', 'or', 'but', 'of', 'to', 'in', 'on', 'for', 'with', 'at', 'by',
+    'from', 'as', 'into', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'it', 'its', 'this',
+    'that', 'these', 'those', 'there', 'their', 'they', 'them', 'which', 'who', 'what', 'when',
+    'where', 'how', 'why', 'can', 'could', 'would', 'should', 'will', 'may', 'might', 'must',
+    'do', 'does', 'did', 'has', 'have', 'had', 'not', 'no', 'so', 'if', 'then', 'than', 'also',
+    'i', 'we', 'you', 'my', 'our', 'your', 'me', 'us', 'very', 'just', 'like', 'such', 'about'
+))
+
+# BM25 term-frequency saturation and answer-length normalization
+BM25_K1 = 1.2
+BM25_B = 0.3
+# Answer length in content words treated as average by the length normalization
+AVERAGE_ANSWER_WORDS = 60
+
+# Phrases (adjacent word pairs) count this much more than single words
+PHRASE_WEIGHT = 1.5
+# Weighted share of a point's terms an answer has to use to cover the point fully
+FULL_COVERAGE = 0.6
+# Score of an answer covering nothing, and of any answer when there are no points
+SCORE_FLOOR = 20.0
+NO_POINTS_SCORE = 60.0
+
+
+def features(text):
+    """
+    Counts of stemmed content words and adjacent word pairs
+    
+    Returns:
+        (Counter of features, number of content words)
+    """
+    words = [
+        stem(word) for word in re.findall(r'[a-z0-9+#]+', (text or '').lower())
+        if word not in STOPWORDS
+    ]
+    counts = Counter(words)
+    counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return counts, len(words)
+
+
+class _CompiledPoints:
+    """Weighted feature vectors of one question's expected points"""
+    
+    def __init__(self, expected_points):
+        point_features = [(str(point), set(features(str(point))[0])) for point in expected_points]
+        point_features = [(text, terms) for text, terms in point_features if terms]
+        self.texts = [text for text, _ in point_features]
+        point_features = [terms for _, terms in point_features]
+        
+        # IDF across the question's own points: a term every point mentions
+        # says little about which point an answer covers
+        count = len(point_features)
+        frequency = Counter(term for terms in point_features for term in terms)
+        idf = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5)) * (PHRASE_WEIGHT if ' ' in term else 1)
+            for term, df in frequency.items()
+        }
+        
+        # Each point's weights sum to 1, so its coverage is a fraction
+        self.points = []
+        for terms in point_features:
+            total = sum(idf[term] for term in terms)
+            self.points.append({term: idf[term] / total for term in terms})
+        
+        self.vocabulary = {term: column for column, term in enumerate(sorted(frequency))}
+        self.matrix = None
+        if np is not None and self.points:
+            self.matrix = np.zeros((len(self.points), len(self.vocabulary)))
+            for row, weights in enumerate(self.points):
+                for term, weight in weights.items():
+                    self.matrix[row, self.vocabulary[term]] = weight
+
+
+def _saturation(tf, length):
+    """BM25 term-frequency saturation, 1 for a single mention in an average-length answer"""
+    norm = 1 - BM25_B + BM25_B * length / AVERAGE_ANSWER_WORDS
+    return min(1.0, tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm))
+
+
+def _score(coverages):
+    """Technical score from per-point coverage fractions"""
+    covered = sum(min(1.0, coverage / FULL_COVERAGE) for coverage in coverages) / len(coverages)
+    return round(SCORE_FLOOR + (100 - SCORE_FLOOR) * covered, 2)
+
+
+class CoverageScorer:
+    def __init__(self, max_questions=4096):
+        """
+        Args:
+            max_questions: compiled expected-point sets kept, least recently used first out
+        """
+        self.max_questions = max_questions
+        
+        self._compiled = OrderedDict()  # tuple of expected points -> _CompiledPoints
+        self._lock = threading.Lock()
+        self._stats = {
+            'compiled': 0,
+            'compile_hits': 0,
+            'scores': 0,
+            'batches': 0,
+            'batch_answers': 0,
+            'score_us': 0.0,
+            'batch_us': 0.0
+        }
+    
+    def prepare(self, expected_points):
+        """Compile a question's expected points, or return the compiled copy"""
+        key = tuple(str(point) for point in expected_points or ())
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                self._stats['compile_hits'] += 1
+                return compiled
+        
+        compiled = _CompiledPoints(key)
+        with self._lock:
+            self._compiled[key] = compiled
+            self._stats['compiled'] += 1
+            while len(self._compiled) > self.max_questions:
+                self._compiled.popitem(last=False)
+        return compiled
+    
+    def coverage(self, answer, expected_points):
+        """Fraction (0-1) of each expected point's weighted terms found in the answer"""
+        return self._coverages(self.prepare(expected_points), answer)
+    
+    def missed_points(self, answer, expected_points, threshold=0.5):
+        """Expected points, in order, the answer covers less than threshold of the way to full coverage"""
+        compiled = self.prepare(expected_points)
+        return [
+            text for text, coverage in zip(compiled.texts, self._coverages(compiled, answer))
+            if coverage < threshold * FULL_COVERAGE
+        ]
+    
+    @staticmethod
+    def _coverages(compiled, answer):
+        counts, length = features(answer)
+        saturated = {term: _saturation(tf, length) for term, tf in counts.items()}
+        return [
+            sum(weight * saturated.get(term, 0.0) for term, weight in weights.items())
+            for weights in compiled.points
+        ]
+    
+    def score(self, answer, expected_points):
+        """Technical coverage score (0-100) of one answer"""
+        started = time.perf_counter()
+        coverages = self.coverage(answer, expected_points)
+        score = _score(coverages) if coverages else NO_POINTS_SCORE
+        
+        with self._lock:
+            self._stats['scores'] += 1
+            self._stats['score_us'] += (time.perf_counter() - started) * 1e6
+        return score
+    
+    def score_batch(self, answers, expected_points):
+        """
+        Technical coverage scores of many answers to the same question
+        
+        With NumPy the saturated term frequencies of every answer form one
+        matrix that is multiplied by the points' weights in a single product;
+        without it each answer is scored in turn.
+        """
+        started = time.perf_counter()
+        compiled = self.prepare(expected_points)
+        
+        if not compiled.points:
+            scores = [NO_POINTS_SCORE] * len(answers)
+        elif compiled.matrix is None:
+            scores = [_score(self._coverages(compiled, answer)) for answer in answers]
+        else:
+            saturated = np.zeros((len(answers), len(compiled.vocabulary)))
+            for row, answer in enumerate(answers):
+                counts, length = features(answer)
+                for term, tf in counts.items():
+                    column = compiled.vocabulary.get(term)
+                    if column is not None:
+                        saturated[row, column] = _saturation(tf, length)
+            
+            covered = np.minimum(1.0, saturated @ compiled.matrix.T / FULL_COVERAGE).mean(axis=1)
+            scores = [round(float(score), 2) for score in SCORE_FLOOR + (100 - SCORE_FLOOR) * covered]
+        
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['batch_answers'] += len(answers)
+            self._stats['batch_us'] += (time.perf_counter() - started) * 1e6
+        return scores
+    
+    def get_stats(self):
+        """Compiled question count and scoring latency"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_questions'] = len(self._compiled)
+        
+        stats['backend'] = 'numpy' if np is not None else 'python'
+        stats['avg_score_us'] = round(stats.pop('score_us') / stats['scores'], 1) if stats['scores'] else 0
+        batch_us = stats.pop('batch_us')
+        stats['avg_batch_answer_us'] = round(batch_us / stats['batch_answers'], 1) if stats['batch_answers'] else 0
+        return stats
@@ -0,0 +1,211 @@
+"""
+Database Module
+Pooled SQLite access layer shared by the app and its background components
+Connections are opened once in WAL mode with tuned pragmas and reused,
+so statements stay prepared in each connection's statement cache
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+# Applied to every new connection; journal_mode=WAL persists in the database file
+CONNECTION_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('temp_store', 'MEMORY'),
+)
+
+
+class Database:
+    def __init__(self, database_path, pool_size=16, busy_timeout_ms=5000,
+                 cache_size_kb=16384, mmap_size=268435456, cached_statements=256):
+        """
+        Args:
+            database_path: SQLite database file
+            pool_size: idle connections kept open for reuse; extra ones are closed on release
+            busy_timeout_ms: how long a writer waits for a lock before raising "database is locked"
+            cache_size_kb: page cache per connection
+            mmap_size: bytes of the database file to memory-map
+            cached_statements: prepared statements kept per connection
+        """
+        self.database_path = database_path
+        self.pool_size = pool_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+        
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'opened': 0,
+            'closed': 0,
+            'checkouts': 0,
+            'reused': 0,
+            'nested': 0,
+            'commits': 0,
+            'rollbacks': 0
+        }
+    
+    def _connect(self):
+        """Open and configure a new connection"""
+        conn = sqlite3.connect(
+            self.database_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        for pragma, value in CONNECTION_PRAGMAS:
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        conn.execute(f'PRAGMA cache_size = -{int(self.cache_size_kb)}')
+        conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+        
+        self._count('opened')
+        return conn
+    
+    def _checkout(self):
+        """Take an idle connection from the pool or open a new one"""
+        try:
+            conn = self._pool.get_nowait()
+            self._count('reused')
+        except queue.Empty:
+            conn = self._connect()
+        
+        # Callers switch row_factory per block; never leak it into the next checkout
+        conn.row_factory = None
+        self._count('checkouts')
+        return conn
+    
+    def _release(self, conn):
+        """Return a connection to the pool, closing it if the pool is full"""
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+            self._count('closed')
+    
+    @contextmanager
+    def connection(self, immediate=False, trace=None):
+        """
+        Context manager yielding a pooled connection
+        
+        Behaves like `with sqlite3.connect(...) as conn`: the block commits on
+        success and rolls back on an exception. Blocks nested on the same
+        thread share the outer connection and transaction, and only the
+        outermost block commits, so helpers such as audit logging no longer
+        contend with their caller for the write lock.
+        
+        Args:
+            immediate: take the write lock up front with BEGIN IMMEDIATE
+                (outermost block only), for read-then-write sequences
+            trace: callable receiving every SQL statement the block runs,
+                including the final COMMIT (outermost block only)
+        """
+        state = getattr(self._local, 'state', None)
+        
+        if state is not None:
+            # Nested block: join the outer transaction
+            conn = state['conn']
+            row_factory = conn.row_factory
+            state['depth'] += 1
+            self._count('nested')
+            try:
+                yield conn
+            finally:
+                state['depth'] -= 1
+                conn.row_factory = row_factory
+            return
+        
+        conn = self._checkout()
+        self._local.state = {'conn': conn, 'depth': 1}
+        healthy = True
+        if trace:
+            conn.set_trace_callback(trace)
+        try:
+            if immediate:
+                conn.execute('BEGIN IMMEDIATE')
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+                self._count('commits')
+        except BaseException:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                    self._count('rollbacks')
+            except sqlite3.Error:
+                healthy = False
+            raise
+        finally:
+            self._local.state = None
+            if trace:
+                conn.set_trace_callback(None)
+            if healthy:
+                self._release(conn)
+            else:
+                conn.close()
+                self._count('closed')
+    
+    def ensure_indexes(self, indexes, prefix='ix_'):
+        """
+        Create the managed index set and drop managed indexes no longer listed
+        
+        Args:
+            indexes: iterable of (name, table, columns) tuples
+            prefix: name prefix marking an index as managed
+        
+        Returns:
+            (created, dropped) lists of index names
+        """
+        wanted = {name for name, _, _ in indexes}
+        
+        with self.connection() as conn:
+            existing = {
+                row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE ?", (prefix + '%',)
+                )
+            }
+            
+            created = []
+            for name, table, columns in indexes:
+                if name not in existing:
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})')
+                    created.append(name)
+            
+            dropped = sorted(existing - wanted)
+            for name in dropped:
+                conn.execute(f'DROP INDEX IF EXISTS {name}')
+            
+            # Refresh planner statistics for the tables whose indexes changed
+            if created or dropped:
+                conn.execute('PRAGMA optimize')
+        
+        return created, dropped
+    
+    def close_all(self):
+        """Close every idle pooled connection"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            self._count('closed')
+    
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+    
+    def get_stats(self):
+        """Connection pool counters"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['idle'] = self._pool.qsize()
+        stats['pool_size'] = self.pool_size
+        stats['reuse_rate'] = round(stats['reused'] / stats['checkouts'], 4) if stats['checkouts'] else 0
+        return stats
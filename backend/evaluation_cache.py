@@ -0,0 +1,227 @@
+"""
+Evaluation Cache Module
+Content-addressed cache for answer evaluations
+Bounded in-process LRU backed by a SQLite table with TTL eviction
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+class EvaluationCache:
+    def __init__(self, database, max_entries=1024, ttl_seconds=604800):
+        """
+        Args:
+            database: shared Database holding the evaluation_cache table
+            max_entries: size of the in-memory LRU
+            ttl_seconds: lifetime of a cached evaluation
+        """
+        self.db = database
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._in_flight = {}  # key -> threading.Event for single-flight computation
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0,
+            'expired': 0,
+            'degraded_skipped': 0
+        }
+        
+        self._init_table()
+    
+    def _init_table(self):
+        """Create the persistent cache table"""
+        with self.db.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS evaluation_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_evaluation_cache_expires ON evaluation_cache (expires_at)')
+    
+    @staticmethod
+    def _normalize(value):
+        """Normalize inputs so cosmetic differences map to the same key"""
+        if isinstance(value, str):
+            return re.sub(r'\s+', ' ', value).strip()
+        if isinstance(value, float):
+            return round(value, 4)
+        if isinstance(value, dict):
+            return {str(k): EvaluationCache._normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [EvaluationCache._normalize(v) for v in value]
+        return value
+    
+    def make_key(self, namespace, model, prompt_version, **inputs):
+        """
+        Build a content-addressed cache key
+        
+        Args:
+            namespace: name of the cached operation (e.g. 'evaluate_response')
+            model: LLM model name, so a model change invalidates old entries
+            prompt_version: prompt/mode version, bumped whenever prompts change
+            inputs: the evaluation inputs (question, answer, expected points, weights)
+        """
+        payload = json.dumps({
+            'namespace': namespace,
+            'model': model,
+            'prompt_version': str(prompt_version),
+            'inputs': self._normalize(inputs)
+        }, sort_keys=True, ensure_ascii=True)
+        return f"{namespace}:{hashlib.sha256(payload.encode()).hexdigest()}"
+    
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        now = time.time()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return value
+                del self._entries[key]
+                self._stats['expired'] += 1
+        
+        try:
+            with self.db.connection() as conn:
+                row = conn.execute(
+                    'SELECT result, expires_at FROM evaluation_cache WHERE cache_key = ?', (key,)
+                ).fetchone()
+                
+                if row and row[1] <= now:
+                    conn.execute('DELETE FROM evaluation_cache WHERE cache_key = ?', (key,))
+                    with self._lock:
+                        self._stats['expired'] += 1
+                    row = None
+        except Exception as e:
+            print(f"Evaluation cache read error: {str(e)}")
+            row = None
+        
+        if not row:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+        
+        value = json.loads(row[0])
+        with self._lock:
+            self._stats['disk_hits'] += 1
+            self._remember(key, row[1], value)
+        return value
+    
+    def set(self, key, value):
+        """Store value under key in memory and on disk"""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._stats['writes'] += 1
+            run_eviction = self._stats['writes'] % 100 == 0
+        
+        try:
+            with self.db.connection() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO evaluation_cache (cache_key, namespace, result, created_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (key, key.split(':', 1)[0], json.dumps(value), now, expires_at))
+        except Exception as e:
+            print(f"Evaluation cache write error: {str(e)}")
+        
+        if run_eviction:
+            self.evict_expired()
+    
+    def _remember(self, key, expires_at, value):
+        """Insert into the in-memory LRU (caller holds the lock)"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+    
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, computing and storing it on a miss
+        
+        Concurrent callers with the same key (e.g. client retries) wait for the
+        first computation instead of each calling the LLM. Results marked
+        'degraded' (an LLM call failed and defaults stand in) are returned
+        but not stored, so the next request evaluates again.
+        
+        Returns:
+            (value, hit) tuple
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value, True
+            
+            with self._lock:
+                event = self._in_flight.get(key)
+                if event is None:
+                    event = self._in_flight[key] = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+            
+            if owner:
+                break
+            
+            # Another thread is computing this key; if it fails we compute ourselves
+            event.wait()
+        
+        try:
+            value = compute()
+            if isinstance(value, dict) and value.get('degraded'):
+                with self._lock:
+                    self._stats['degraded_skipped'] += 1
+            else:
+                self.set(key, value)
+            return value, False
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            event.set()
+    
+    def evict_expired(self):
+        """Remove expired entries from memory and disk"""
+        now = time.time()
+        
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+        
+        try:
+            with self.db.connection() as conn:
+                cursor = conn.execute('DELETE FROM evaluation_cache WHERE expires_at <= ?', (now,))
+                with self._lock:
+                    self._stats['expired'] += cursor.rowcount
+        except Exception as e:
+            print(f"Evaluation cache eviction error: {str(e)}")
+    
+    def get_stats(self):
+        """Hit/miss counters and current in-memory size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._entries)
+        
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0
+        return stats
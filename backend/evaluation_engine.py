@@ -4,16 +4,87 @@ Multi-dimensional evaluation system with fairness and bias mitigation
 Implements gender-neutral, accent-neutral, culturally-neutral evaluation
 """
 
+import json
 import re
-from groq import Groq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import os
 
+from coverage_scorer import CoverageScorer
+
+
+EVALUATION_MODEL = "llama-3.3-70b-versatile"
+
+# Bump whenever an evaluation prompt changes so cached evaluations are invalidated
+PROMPT_VERSION = 2
+
+# Supported evaluation modes:
+# - serial: technical, grammar and feedback LLM calls run one after another
+# - concurrent: technical and grammar calls run in parallel, feedback starts
+#   as soon as both scores are available
+# - fused: one structured JSON call returns technical score, grammar score
+#   and feedback; falls back to a per-dimension mode if the call fails
+EVALUATION_MODES = ('serial', 'concurrent', 'fused')
+
+# Expected shape of the fused evaluation response: field -> (type, min, max)
+FUSED_RESPONSE_SCHEMA = {
+    'technical_score': ((int, float), 0, 100),
+    'grammar_score': ((int, float), 0, 100),
+    'feedback': (str, None, None)
+}
+
+# Returned when feedback generation fails
+DEFAULT_FEEDBACK = "Good effort on this answer. Consider providing more specific examples and structuring your response more clearly to demonstrate your knowledge."
+
+# Stages reported in the per-evaluation timing breakdown
+TIMING_STAGES = ('technical', 'grammar', 'communication', 'confidence', 'feedback')
+
+# LLM calls one evaluate_response makes in each mode when nothing fails
+LLM_CALLS_PER_EVALUATION = {'serial': 3, 'concurrent': 3, 'fused': 1}
+
+# Template feedback: the suggestion for the weakest dimension when it falls below TIP_BELOW
+TIP_BELOW = 70
+FEEDBACK_TIPS = {
+    'technical': "Explain the underlying concepts in more depth and tie each one back to the question.",
+    'communication': "Structure the answer in clear steps and finish each point before starting the next.",
+    'confidence': "State your points directly and back them with a concrete example from your own work."
+}
+
 
 class EvaluationEngine:
-    def __init__(self, groq_api_key):
-        self.groq_client = Groq(api_key=groq_api_key)
+    def __init__(self, llm_gateway, mode='serial', max_workers=8, fallback_mode='concurrent',
+                 coverage_blend=0.0):
+        """
+        Args:
+            coverage_blend: weight (0-1) of the local expected-point coverage
+                score in the technical score; the LLM's score has the rest
+        """
+        if mode not in EVALUATION_MODES:
+            raise ValueError(f"Unknown evaluation mode: {mode}")
+        if fallback_mode not in EVALUATION_MODES or fallback_mode == 'fused':
+            raise ValueError(f"Invalid fallback mode: {fallback_mode}")
+        if not 0 <= coverage_blend <= 1:
+            raise ValueError(f"Invalid coverage blend: {coverage_blend}")
+        
+        self.llm = llm_gateway
+        self.mode = mode
+        self.fallback_mode = fallback_mode
+        self.coverage_blend = coverage_blend
+        
+        # Local technical score, also used when the technical LLM call fails
+        self.coverage = CoverageScorer()
+        self._coverage_fallbacks = 0
+        
+        # Bounded pool shared by all requests so concurrent mode cannot
+        # open an unbounded number of simultaneous LLM calls
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='evaluation')
+        
+        self._timing_lock = threading.Lock()
+        self._timing_totals = {}
+        self._fused_stats = {'calls': 0, 'fallbacks': 0, 'prompt_tokens': 0}
     
-    def evaluate_response(self, question, answer, expected_points, role_criteria):
+    def evaluate_response(self, question, answer, expected_points, role_criteria, mode=None):
         """
         Evaluate a single interview response across multiple dimensions
         
@@ -22,12 +93,29 @@ class EvaluationEngine:
         - Communication score: Grammar matters, but accent/culture don't
         - Confidence score: Delivery matters, but cultural style doesn't
         
+        Args:
+            mode: overrides the engine's default evaluation mode for this call
+        
         Returns:
-            dict with scores for communication, technical, confidence, and overall
+            dict with scores for communication, technical, confidence, and overall;
+            'degraded': True when an LLM call failed and a default or local
+            score stands in for it
         """
+        mode = mode or self.mode
+        if mode == 'fused':
+            result = self._evaluate_response_fused(question, answer, expected_points, role_criteria)
+            if result is not None:
+                return result
+            mode = self.fallback_mode
+        
+        if mode == 'concurrent':
+            return self._evaluate_response_concurrent(question, answer, expected_points, role_criteria)
+        
         # Get individual dimension scores
-        technical_score = self._evaluate_technical_correctness(question, answer, expected_points)
-        communication_score = self._evaluate_communication(answer)
+        failures = []
+        technical_score = self._evaluate_technical_correctness(question, answer, expected_points, failures)
+        grammar_score = self._check_grammar_clarity(answer, failures)
+        communication_score = self._evaluate_communication(answer, grammar_score)
         confidence_score = self._evaluate_confidence(answer)
         
         # Calculate weighted overall score based on role criteria
@@ -41,7 +129,43 @@ class EvaluationEngine:
         # Generate detailed feedback
         feedback = self._generate_feedback(
             question, answer, expected_points,
-            technical_score, communication_score, confidence_score
+            technical_score, communication_score, confidence_score, failures
+        )
+        
+        result = {
+            'technical_score': round(technical_score, 2),
+            'communication_score': round(communication_score, 2),
+            'confidence_score': round(confidence_score, 2),
+            'overall_score': round(overall_score, 2),
+            'grammar_score': round(grammar_score, 2),
+            'feedback': feedback
+        }
+        if failures:
+            result['degraded'] = True
+        return result
+    
+    def complete_evaluation(self, question, answer, expected_points, role_criteria,
+                            technical_score, grammar_score):
+        """
+        Build an evaluate_response result from technical and grammar scores
+        obtained elsewhere (e.g. reused from near-identical answers)
+        
+        Makes no LLM calls: the local communication and confidence heuristics
+        run on this answer and its feedback comes from _template_feedback, so
+        only the two LLM-judged scores are taken as given.
+        """
+        communication_score = self._evaluate_communication(answer, grammar_score)
+        confidence_score = self._evaluate_confidence(answer)
+        
+        weights = role_criteria
+        overall_score = (
+            technical_score * weights.get('technical_weight', 0.4) +
+            communication_score * weights.get('communication_weight', 0.3) +
+            confidence_score * weights.get('confidence_weight', 0.3)
+        )
+        
+        feedback = self._template_feedback(
+            answer, expected_points, technical_score, communication_score, confidence_score
         )
         
         return {
@@ -49,15 +173,285 @@ class EvaluationEngine:
             'communication_score': round(communication_score, 2),
             'confidence_score': round(confidence_score, 2),
             'overall_score': round(overall_score, 2),
+            'grammar_score': round(grammar_score, 2),
             'feedback': feedback
         }
     
-    def _evaluate_technical_correctness(self, question, answer, expected_points):
+    def estimate_overall_score(self, answer, expected_points, role_criteria):
+        """
+        Cheap local estimate of evaluate_response's overall score
+        
+        Makes no LLM calls: technical correctness is the local expected-point
+        coverage score, and grammar is assumed to be at the passing default.
+        Used to start speculative work before the real evaluation returns.
+        """
+        technical_score = self.coverage.score(answer, expected_points)
+        
+        communication_score = self._evaluate_communication(answer, grammar_score=70.0)
+        confidence_score = self._evaluate_confidence(answer)
+        
+        weights = role_criteria
+        return (
+            technical_score * weights.get('technical_weight', 0.4) +
+            communication_score * weights.get('communication_weight', 0.3) +
+            confidence_score * weights.get('confidence_weight', 0.3)
+        )
+    
+    def _evaluate_response_concurrent(self, question, answer, expected_points, role_criteria):
+        """
+        Concurrent variant of evaluate_response
+        
+        The technical and grammar LLM calls are independent, so they run in
+        parallel on the shared executor while the local heuristics run on the
+        calling thread. Feedback needs all three dimension scores and is
+        generated as soon as both calls have returned.
+        
+        Returns:
+            same dict as evaluate_response, plus a 'timings' breakdown in milliseconds
+        """
+        started = time.perf_counter()
+        timings = {}
+        failures = []
+        
+        technical_future = self._executor.submit(
+            self._timed, timings, 'technical',
+            self._evaluate_technical_correctness, question, answer, expected_points, failures
+        )
+        grammar_future = self._executor.submit(
+            self._timed, timings, 'grammar', self._check_grammar_clarity, answer, failures
+        )
+        
+        confidence_score = self._timed(timings, 'confidence', self._evaluate_confidence, answer)
+        
+        technical_score = technical_future.result()
+        grammar_score = grammar_future.result()
+        communication_score = self._timed(
+            timings, 'communication', self._evaluate_communication, answer, grammar_score
+        )
+        
+        weights = role_criteria
+        overall_score = (
+            technical_score * weights.get('technical_weight', 0.4) +
+            communication_score * weights.get('communication_weight', 0.3) +
+            confidence_score * weights.get('confidence_weight', 0.3)
+        )
+        
+        feedback = self._timed(
+            timings, 'feedback', self._generate_feedback,
+            question, answer, expected_points,
+            technical_score, communication_score, confidence_score, failures
+        )
+        
+        timings['wall_clock'] = (time.perf_counter() - started) * 1000
+        # What the same stages would have cost if run one after another
+        timings['serial_estimate'] = sum(timings[stage] for stage in TIMING_STAGES)
+        timings['saved'] = timings['serial_estimate'] - timings['wall_clock']
+        self._record_timings(timings)
+        
+        result = {
+            'technical_score': round(technical_score, 2),
+            'communication_score': round(communication_score, 2),
+            'confidence_score': round(confidence_score, 2),
+            'overall_score': round(overall_score, 2),
+            'grammar_score': round(grammar_score, 2),
+            'feedback': feedback,
+            'timings': {stage: round(ms, 2) for stage, ms in timings.items()}
+        }
+        if failures:
+            result['degraded'] = True
+        return result
+    
+    def _evaluate_response_fused(self, question, answer, expected_points, role_criteria):
+        """
+        Single-call variant of evaluate_response
+        
+        Asks for the technical score, the grammar/clarity score and the feedback
+        in one structured JSON response, so the question, answer and expected
+        points are only sent once. The fairness rules of the three per-dimension
+        prompts are all carried over.
+        
+        Returns:
+            same dict as evaluate_response, or None if the response could not be
+            obtained or failed schema validation (caller falls back)
+        """
+        started = time.perf_counter()
+        
+        # Confidence is purely local, so its score can inform the feedback
+        confidence_score = self._evaluate_confidence(answer)
+        
+        prompt = f"""Evaluate this interview answer on two dimensions and give feedback.
+
+Question: {question}
+
+Expected Key Points:
+{chr(10).join(f"- {point}" for point in expected_points)}
+
+Candidate's Answer: {answer}
+
+1. technical_score (0-100) - CRITICAL INSTRUCTIONS FOR FAIRNESS:
+   - IGNORE all grammar mistakes, communication style, confidence or hesitation
+   - FOCUS ONLY on technical accuracy and completeness
+   - Accuracy of technical information (40 points), coverage of expected key points (30 points), depth of technical understanding (30 points)
+   - Even if the answer has poor grammar or sounds uncertain, if the technical content is correct, give full points
+
+2. grammar_score (0-100) - IMPORTANT FAIRNESS RULES:
+   - Focus on CLARITY - can you understand the message?
+   - IGNORE accent-related patterns and non-native grammar if meaning is clear
+   - Only penalize grammar that truly obscures meaning
+   - 90-100: clear and correct, 70-89: minor issues but clear, 50-69: issues affecting clarity, 0-49: meaning obscured
+
+3. feedback - CRITICAL FAIRNESS RULES:
+   - Use gender-neutral language (they/their, not he/she)
+   - DO NOT mention accent, speaking style, or cultural patterns
+   - Focus on content, structure, and completeness
+   - 2-3 encouraging, actionable sentences: what was done well, what could be improved, one specific suggestion
+   - The candidate's confidence score is {confidence_score}/100
+
+Respond with ONLY valid JSON in this format:
+{{"technical_score": 75, "grammar_score": 85, "feedback": "Feedback text here"}}"""
+
+        try:
+            response = self.llm.chat(
+                'evaluation.fused',
+                model=EVALUATION_MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a fair interview evaluator and supportive coach. The technical score covers ONLY technical content, completely ignoring grammar, accent, or communication style. The grammar score focuses on clarity of meaning, not linguistic perfection. Feedback focuses on content and substance, not style or delivery. You are gender-neutral, accent-neutral, and culturally-neutral. You respond only with JSON."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.3,
+                max_tokens=300,
+                response_format={"type": "json_object"}
+            )
+            
+            data = self._validate_fused_response(response.choices[0].message.content)
+            prompt_tokens = getattr(getattr(response, 'usage', None), 'prompt_tokens', 0) or 0
+        
+        except Exception as e:
+            print(f"Error in fused evaluation, falling back to {self.fallback_mode}: {str(e)}")
+            with self._timing_lock:
+                self._fused_stats['fallbacks'] += 1
+            return None
+        
+        technical_score = self._blend_coverage(data['technical_score'], answer, expected_points)
+        communication_score = self._evaluate_communication(answer, grammar_score=data['grammar_score'])
+        
+        weights = role_criteria
+        overall_score = (
+            technical_score * weights.get('technical_weight', 0.4) +
+            communication_score * weights.get('communication_weight', 0.3) +
+            confidence_score * weights.get('confidence_weight', 0.3)
+        )
+        
+        timings = {'fused': (time.perf_counter() - started) * 1000}
+        self._record_timings(timings)
+        with self._timing_lock:
+            self._fused_stats['calls'] += 1
+            self._fused_stats['prompt_tokens'] += prompt_tokens
+        
+        return {
+            'technical_score': round(technical_score, 2),
+            'communication_score': round(communication_score, 2),
+            'confidence_score': round(confidence_score, 2),
+            'overall_score': round(overall_score, 2),
+            'grammar_score': round(data['grammar_score'], 2),
+            'feedback': data['feedback'],
+            'timings': {stage: round(ms, 2) for stage, ms in timings.items()}
+        }
+    
+    def _validate_fused_response(self, content):
+        """
+        Parse the fused evaluation response and validate it against FUSED_RESPONSE_SCHEMA
+        
+        Raises:
+            ValueError if the content is not JSON or does not match the schema
+        """
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            # Tolerate prose or markdown around the JSON object
+            json_match = re.search(r'\{.*\}', content, re.DOTALL)
+            if not json_match:
+                raise ValueError("No JSON object found in response")
+            data = json.loads(json_match.group(0))
+        
+        if not isinstance(data, dict):
+            raise ValueError("Response is not a JSON object")
+        
+        validated = {}
+        for field, (expected_type, minimum, maximum) in FUSED_RESPONSE_SCHEMA.items():
+            value = data.get(field)
+            # bool is a subclass of int, but never a valid score
+            if not isinstance(value, expected_type) or isinstance(value, bool):
+                raise ValueError(f"Field '{field}' missing or of wrong type")
+            if minimum is not None and not minimum <= value <= maximum:
+                raise ValueError(f"Field '{field}' out of range: {value}")
+            if isinstance(value, str):
+                value = value.strip()
+                if not value:
+                    raise ValueError(f"Field '{field}' is empty")
+            validated[field] = float(value) if minimum is not None else value
+        
+        return validated
+    
+    def get_fused_stats(self):
+        """Call, fallback and prompt token counts for the fused evaluation path"""
+        with self._timing_lock:
+            stats = dict(self._fused_stats)
+        stats['avg_prompt_tokens'] = round(stats['prompt_tokens'] / stats['calls'], 1) if stats['calls'] else 0
+        return stats
+    
+    def get_coverage_stats(self):
+        """Local coverage scorer usage, and how often it stood in for a failed LLM score"""
+        stats = self.coverage.get_stats()
+        with self._timing_lock:
+            stats['llm_fallbacks'] = self._coverage_fallbacks
+        stats['blend'] = self.coverage_blend
+        return stats
+    
+    def _timed(self, timings, stage, func, *args):
+        """Run func and record its duration in milliseconds under timings[stage]"""
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            timings[stage] = (time.perf_counter() - started) * 1000
+    
+    def _record_timings(self, timings):
+        """Accumulate per-stage timings for get_timing_stats"""
+        with self._timing_lock:
+            for stage, ms in timings.items():
+                total = self._timing_totals.setdefault(stage, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+                total['count'] += 1
+                total['total_ms'] += ms
+                total['max_ms'] = max(total['max_ms'], ms)
+    
+    def get_timing_stats(self):
+        """Average and max duration per stage across all concurrent evaluations"""
+        with self._timing_lock:
+            return {
+                stage: {
+                    'count': total['count'],
+                    'avg_ms': round(total['total_ms'] / total['count'], 2),
+                    'max_ms': round(total['max_ms'], 2)
+                }
+                for stage, total in self._timing_totals.items()
+            }
+    
+    def _evaluate_technical_correctness(self, question, answer, expected_points, failures=None):
         """
         Evaluate ONLY technical accuracy and completeness
         
         FAIRNESS: This evaluation is completely grammar-blind and accent-blind.
         We only care about: Is the technical content correct?
+        
+        Args:
+            failures: list 'technical' is appended to when the local fallback score is used
         """
         prompt = f"""Evaluate the technical correctness of this interview answer.
 
@@ -85,8 +479,9 @@ Respond with ONLY a number between 0-100 wrapped in <SCORE></SCORE> tags.
 Example: <SCORE>75</SCORE>"""
 
         try:
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
+            response = self.llm.chat(
+                'evaluation.technical',
+                model=EVALUATION_MODEL,
                 messages=[
                     {
                         "role": "system",
@@ -105,15 +500,26 @@ Example: <SCORE>75</SCORE>"""
             
             if score_match:
                 score = float(re.sub(r'[^\d.]', '', score_match.group(1).strip()))
-                return min(max(score, 0), 100)
-            
-            return 50.0  # Default if parsing fails
-            
+                return self._blend_coverage(min(max(score, 0), 100), answer, expected_points)
+        
         except Exception as e:
             print(f"Error in technical evaluation: {str(e)}")
-            return 50.0
+        
+        # No usable LLM score: fall back to the local coverage score
+        with self._timing_lock:
+            self._coverage_fallbacks += 1
+        if failures is not None:
+            failures.append('technical')
+        return self.coverage.score(answer, expected_points)
     
-    def _evaluate_communication(self, answer):
+    def _blend_coverage(self, technical_score, answer, expected_points):
+        """Mix the local coverage score into an LLM technical score by coverage_blend"""
+        if not self.coverage_blend:
+            return technical_score
+        local_score = self.coverage.score(answer, expected_points)
+        return (1 - self.coverage_blend) * technical_score + self.coverage_blend * local_score
+    
+    def _evaluate_communication(self, answer, grammar_score=None, failures=None):
         """
         Evaluate grammar and clarity
         
@@ -122,6 +528,10 @@ Example: <SCORE>75</SCORE>"""
         - DON'T penalize: Accent, non-native patterns, cultural communication style
         
         Focus: Can the message be understood clearly?
+        
+        Args:
+            grammar_score: precomputed _check_grammar_clarity result, fetched here if None
+            failures: passed on to _check_grammar_clarity
         """
         words = answer.split()
         word_count = len(words)
@@ -161,14 +571,18 @@ Example: <SCORE>75</SCORE>"""
             score += 10  # Multiple complete thoughts
         
         # 5. GRAMMAR CHECK (via LLM - accent-neutral)
-        grammar_score = self._check_grammar_clarity(answer)
+        if grammar_score is None:
+            grammar_score = self._check_grammar_clarity(answer, failures)
         score = (score * 0.7) + (grammar_score * 0.3)  # Blend scores
         
         return min(max(score, 0), 100)
     
-    def _check_grammar_clarity(self, answer):
+    def _check_grammar_clarity(self, answer, failures=None):
         """
         Use LLM to check grammar while being accent-neutral
+        
+        Args:
+            failures: list 'grammar' is appended to when the default score is used
         """
         prompt = f"""Rate the grammar and clarity of this text from 0-100.
 
@@ -189,8 +603,9 @@ Rate 0-100 where:
 Return ONLY a number 0-100."""
 
         try:
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
+            response = self.llm.chat(
+                'evaluation.grammar',
+                model=EVALUATION_MODEL,
                 messages=[
                     {
                         "role": "system",
@@ -209,6 +624,8 @@ Return ONLY a number 0-100."""
             score = float(re.sub(r'[^\d.]', '', score_text))
             return min(max(score, 0), 100)
         except:
+            if failures is not None:
+                failures.append('grammar')
             return 70.0  # Default to passing score
     
     def _evaluate_confidence(self, answer):
@@ -266,13 +683,9 @@ Return ONLY a number 0-100."""
         
         return min(max(score, 0), 100)
     
-    def _generate_feedback(self, question, answer, expected_points, 
-                          technical_score, communication_score, confidence_score):
-        """
-        Generate constructive, bias-free feedback
-        
-        FAIRNESS: Feedback must be gender-neutral, accent-neutral, culturally-neutral
-        """
+    def _feedback_messages(self, question, answer, expected_points,
+                           technical_score, communication_score, confidence_score):
+        """Build the chat messages for feedback generation"""
         prompt = f"""Generate constructive feedback for this interview answer.
 
 CRITICAL FAIRNESS RULES:
@@ -301,28 +714,97 @@ Provide brief, actionable feedback in 2-3 sentences covering:
 
 Keep it encouraging, fair, and bias-free."""
 
+        return [
+            {
+                "role": "system",
+                "content": "You are a fair, supportive interview coach. You provide gender-neutral, accent-neutral, culturally-neutral feedback. You focus on content and substance, not style or delivery."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def _generate_feedback(self, question, answer, expected_points, 
+                          technical_score, communication_score, confidence_score, failures=None):
+        """
+        Generate constructive, bias-free feedback
+        
+        FAIRNESS: Feedback must be gender-neutral, accent-neutral, culturally-neutral
+        
+        Args:
+            failures: list 'feedback' is appended to when DEFAULT_FEEDBACK is returned
+        """
+        messages = self._feedback_messages(
+            question, answer, expected_points,
+            technical_score, communication_score, confidence_score
+        )
+        
         try:
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a fair, supportive interview coach. You provide gender-neutral, accent-neutral, culturally-neutral feedback. You focus on content and substance, not style or delivery."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            response = self.llm.chat(
+                'evaluation.feedback',
+                model=EVALUATION_MODEL,
+                messages=messages,
                 temperature=0.7,
                 max_tokens=200
             )
             
             return response.choices[0].message.content.strip()
-            
+        
         except Exception as e:
             print(f"Error generating feedback: {str(e)}")
-            return "Good effort on this answer. Consider providing more specific examples and structuring your response more clearly to demonstrate your knowledge."
+            if failures is not None:
+                failures.append('feedback')
+            return DEFAULT_FEEDBACK
+    
+    def _template_feedback(self, answer, expected_points,
+                           technical_score, communication_score, confidence_score):
+        """
+        Feedback built locally from the dimension scores and the expected points
+        the answer misses, without an LLM call
+        
+        FAIRNESS: Speaks only to content, structure and completeness, like the LLM prompt
+        """
+        scores = {
+            'technical': technical_score,
+            'communication': communication_score,
+            'confidence': confidence_score
+        }
+        strongest = max(scores, key=scores.get)
+        weakest = min(scores, key=scores.get)
+        
+        sentences = [f"Your {strongest} score was the strongest part of this answer ({scores[strongest]:.0f}/100)."]
+        missed = self.coverage.missed_points(answer, expected_points)
+        if missed:
+            sentences.append(f"To make it more complete, also cover: {'; '.join(missed[:3])}.")
+        if weakest != strongest and scores[weakest] < TIP_BELOW:
+            sentences.append(FEEDBACK_TIPS[weakest])
+        elif not missed:
+            sentences.append("Keep adding concrete examples to show the depth of your knowledge.")
+        return ' '.join(sentences)
+    
+    def stream_feedback(self, question, answer, expected_points,
+                        technical_score, communication_score, confidence_score):
+        """
+        Streaming variant of _generate_feedback, yielding text chunks as they arrive
+        
+        FAIRNESS: Same prompt and rules as _generate_feedback
+        
+        Errors are raised, even after chunks have been yielded, so a cut-off
+        stream is never mistaken for complete feedback.
+        """
+        messages = self._feedback_messages(
+            question, answer, expected_points,
+            technical_score, communication_score, confidence_score
+        )
+        
+        yield from self.llm.stream(
+            'evaluation.feedback_stream',
+            model=EVALUATION_MODEL,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=200
+        )
     
     def calculate_interview_metrics(self, all_responses):
         """Calculate aggregate metrics for entire interview"""
@@ -3,15 +3,26 @@ Improvement Plan Generator Module
 Generates personalized improvement plans and learning resource recommendations
 """
 
-from groq import Groq
 import sqlite3
 import json
 
 
+NO_WEAK_AREAS_STEP = "Great job! Continue practicing to maintain your performance level."
+
+# Returned when improvement step generation fails
+DEFAULT_IMPROVEMENT_STEPS = (
+    "Review fundamental concepts in your weak areas",
+    "Practice explaining technical concepts clearly",
+    "Record yourself answering practice questions",
+    "Seek feedback from peers or mentors",
+    "Take online courses to strengthen knowledge gaps"
+)
+
+
 class ImprovementPlanGenerator:
-    def __init__(self, groq_api_key, database_path='interview_bot.db'):
-        self.groq_client = Groq(api_key=groq_api_key)
-        self.database_path = database_path
+    def __init__(self, llm_gateway, database):
+        self.llm = llm_gateway
+        self.db = database
     
     def generate_improvement_plan(self, interview_data, evaluation_metrics, role_id):
         """
@@ -45,6 +56,34 @@ class ImprovementPlanGenerator:
             'overall_recommendation': self._generate_overall_recommendation(evaluation_metrics)
         }
     
+    def stream_improvement_plan(self, interview_data, evaluation_metrics, role_id):
+        """
+        Streaming variant of generate_improvement_plan
+        
+        Yields ('token', text) for each chunk of the LLM-generated improvement
+        steps, then ('done', plan) with the same dict generate_improvement_plan
+        returns, or ('error', message) if the steps could not be streamed in full.
+        """
+        weak_areas = self._identify_weak_areas(evaluation_metrics)
+        
+        chunks = []
+        try:
+            for text in self.stream_improvement_steps(weak_areas, interview_data):
+                chunks.append(text)
+                yield 'token', text
+        except Exception as e:
+            print(f"Error streaming improvement steps: {str(e)}")
+            yield 'error', 'Could not generate improvement plan'
+            return
+        
+        yield 'done', {
+            'weak_areas': weak_areas,
+            'improvement_steps': self.parse_improvement_steps(''.join(chunks)),
+            'recommended_resources': self._recommend_resources(weak_areas, role_id),
+            'practice_plan': self._create_practice_plan(weak_areas),
+            'overall_recommendation': self._generate_overall_recommendation(evaluation_metrics)
+        }
+    
     def _identify_weak_areas(self, evaluation_metrics):
         """Identify areas that need improvement based on scores"""
         weak_areas = []
@@ -77,11 +116,8 @@ class ImprovementPlanGenerator:
         
         return weak_areas
     
-    def _generate_improvement_steps(self, weak_areas, interview_data):
-        """Generate specific, actionable improvement steps"""
-        if not weak_areas:
-            return ["Great job! Continue practicing to maintain your performance level."]
-        
+    def _improvement_steps_messages(self, weak_areas):
+        """Build the chat messages for improvement step generation"""
         prompt = f"""Based on these weak areas from an interview, generate 5 specific, actionable improvement steps.
 
 Weak Areas:
@@ -94,44 +130,69 @@ Generate 5 concrete action items the candidate should take to improve. Each shou
 
 Format as a numbered list."""
 
+        return [
+            {
+                "role": "system",
+                "content": "You are a career coach providing actionable improvement advice."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def parse_improvement_steps(self, content):
+        """Parse the numbered list returned by the model into a list of steps"""
+        content = content.strip()
+        steps = [line.strip() for line in content.split('\n') if line.strip() and any(char.isdigit() for char in line[:3])]
+        return steps if steps else [content]
+    
+    def _generate_improvement_steps(self, weak_areas, interview_data):
+        """Generate specific, actionable improvement steps"""
+        if not weak_areas:
+            return [NO_WEAK_AREAS_STEP]
+        
         try:
-            response = self.groq_client.chat.completions.create(
+            response = self.llm.chat(
+                'improvement.steps',
                 model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a career coach providing actionable improvement advice."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=self._improvement_steps_messages(weak_areas),
                 temperature=0.7,
                 max_tokens=400
             )
             
-            content = response.choices[0].message.content.strip()
-            # Parse numbered list
-            steps = [line.strip() for line in content.split('\n') if line.strip() and any(char.isdigit() for char in line[:3])]
-            return steps if steps else [content]
+            return self.parse_improvement_steps(response.choices[0].message.content)
             
         except Exception as e:
             print(f"Error generating improvement steps: {str(e)}")
-            return [
-                "Review fundamental concepts in your weak areas",
-                "Practice explaining technical concepts clearly",
-                "Record yourself answering practice questions",
-                "Seek feedback from peers or mentors",
-                "Take online courses to strengthen knowledge gaps"
-            ]
+            return list(DEFAULT_IMPROVEMENT_STEPS)
+    
+    def stream_improvement_steps(self, weak_areas, interview_data):
+        """
+        Streaming variant of _generate_improvement_steps, yielding text chunks as they arrive
+        
+        The assembled text can be turned into a list with parse_improvement_steps.
+        Errors are raised, even after chunks have been yielded, so a cut-off
+        stream is never stored as the plan.
+        """
+        if not weak_areas:
+            yield NO_WEAK_AREAS_STEP
+            return
+        
+        yield from self.llm.stream(
+            'improvement.steps_stream',
+            model="llama-3.3-70b-versatile",
+            messages=self._improvement_steps_messages(weak_areas),
+            temperature=0.7,
+            max_tokens=400
+        )
     
     def _recommend_resources(self, weak_areas, role_id):
         """Recommend learning resources from database based on weak areas"""
         recommendations = []
         
         try:
-            with sqlite3.connect(self.database_path) as conn:
+            with self.db.connection() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -0,0 +1,290 @@
+"""
+Job Queue Module
+Durable SQLite-backed background job queue with a worker thread pool
+Jobs are persisted before they run, so anything still queued or running
+when the process stops is picked up again on the next start
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+
+JOB_STATUSES = ('queued', 'running', 'completed', 'failed')
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help; the job fails on this attempt"""
+
+
+class JobQueue:
+    def __init__(self, database, num_workers=4, poll_interval=1.0, max_attempts=3):
+        """
+        Args:
+            database: shared Database holding the background_jobs table
+            num_workers: number of worker threads
+            poll_interval: seconds between checks for jobs enqueued by other processes
+            max_attempts: attempts before a job is marked failed
+        """
+        self.db = database
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        
+        self._handlers = {}
+        self._failure_handlers = {}  # job type -> callable(payload, error) run after the last failure
+        self._workers = []
+        self._running = False
+        self._local = threading.local()  # job id the current worker thread is running
+        
+        # Notified on every enqueue and status change; workers and SSE streams wait on it
+        self._changed = threading.Condition()
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+        
+        self._init_table()
+    
+    def _init_table(self):
+        """Create the persistent job table"""
+        with self.db.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS background_jobs (
+                    id TEXT PRIMARY KEY,
+                    job_type TEXT NOT NULL,
+                    user_id INTEGER,
+                    payload TEXT,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    completed_at REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_background_jobs_status ON background_jobs (status, created_at)')
+            
+            try:
+                conn.execute('ALTER TABLE background_jobs ADD COLUMN progress TEXT')
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+    
+    def register(self, job_type, handler, on_failure=None):
+        """
+        Register the handler for a job type
+        
+        The handler is called with the job payload (a dict) and must return a
+        JSON-serializable result. Raising marks the attempt as failed; it is
+        retried unless the exception is a PermanentJobError. Long handlers can
+        report intermediate state with update_progress().
+        
+        on_failure, if given, is called with the payload and the error message
+        once the job has failed for good, to clean up what it leaves behind.
+        """
+        self._handlers[job_type] = handler
+        if on_failure:
+            self._failure_handlers[job_type] = on_failure
+    
+    def start(self):
+        """Requeue interrupted jobs and start the worker threads"""
+        if self._running:
+            return
+        
+        with self.db.connection() as conn:
+            conn.execute("UPDATE background_jobs SET status = 'queued' WHERE status = 'running'")
+        
+        self._running = True
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f'job-worker-{i}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+    
+    def stop(self, timeout=5):
+        """Stop the worker threads after their current job"""
+        self._running = False
+        with self._changed:
+            self._changed.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+    
+    def enqueue(self, job_type, payload, user_id=None):
+        """Persist a new job and wake a worker; returns the job id"""
+        if job_type not in self._handlers:
+            raise ValueError(f"No handler registered for job type: {job_type}")
+        
+        job_id = uuid.uuid4().hex
+        with self.db.connection() as conn:
+            conn.execute('''
+                INSERT INTO background_jobs (id, job_type, user_id, payload, status, created_at)
+                VALUES (?, ?, ?, ?, 'queued', ?)
+            ''', (job_id, job_type, user_id, json.dumps(payload), time.time()))
+        
+        self._count(job_type, 'enqueued')
+        with self._changed:
+            self._changed.notify_all()
+        return job_id
+    
+    def get(self, job_id):
+        """Return the job as a dict, or None if it does not exist"""
+        with self.db.connection() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute('SELECT * FROM background_jobs WHERE id = ?', (job_id,)).fetchone()
+        
+        if not row:
+            return None
+        
+        job = {
+            'job_id': row['id'],
+            'job_type': row['job_type'],
+            'user_id': row['user_id'],
+            'status': row['status'],
+            'attempts': row['attempts'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'completed_at': row['completed_at']
+        }
+        if row['result'] is not None:
+            job['result'] = json.loads(row['result'])
+        if row['error'] is not None:
+            job['error'] = row['error']
+        if row['progress'] is not None:
+            job['progress'] = json.loads(row['progress'])
+        return job
+    
+    def update_progress(self, progress):
+        """
+        Store JSON-serializable progress for the job running on this thread
+        
+        Pollers see it under 'progress' in get(); SSE streams are woken up.
+        Outside a job handler this does nothing, so handlers can also be
+        called inline.
+        """
+        job_id = getattr(self._local, 'job_id', None)
+        if job_id is None:
+            return
+        
+        with self.db.connection() as conn:
+            conn.execute('UPDATE background_jobs SET progress = ? WHERE id = ?', (json.dumps(progress), job_id))
+        with self._changed:
+            self._changed.notify_all()
+    
+    def wait_for_change(self, timeout):
+        """Block until any job changes state or timeout seconds pass"""
+        with self._changed:
+            self._changed.wait(timeout)
+    
+    def _claim_next(self):
+        """Atomically move the oldest queued job to running; returns (id, type, payload) or None"""
+        with self.db.connection(immediate=True) as conn:
+            row = conn.execute('''
+                SELECT id, job_type, payload FROM background_jobs
+                WHERE status = 'queued'
+                ORDER BY created_at
+                LIMIT 1
+            ''').fetchone()
+            
+            if row:
+                conn.execute('''
+                    UPDATE background_jobs
+                    SET status = 'running', started_at = ?, attempts = attempts + 1
+                    WHERE id = ?
+                ''', (time.time(), row[0]))
+            return row
+    
+    def _worker_loop(self):
+        while self._running:
+            try:
+                job = self._claim_next()
+            except Exception as e:
+                print(f"Job queue claim error: {str(e)}")
+                job = None
+            
+            if not job:
+                with self._changed:
+                    self._changed.wait(self.poll_interval)
+                continue
+            
+            self._run(*job)
+    
+    def _run(self, job_id, job_type, payload):
+        """Run one claimed job and persist its outcome"""
+        started = time.perf_counter()
+        self._local.job_id = job_id
+        
+        retry = True
+        try:
+            result = self._handlers[job_type](json.loads(payload))
+            status, result_json, error = 'completed', json.dumps(result), None
+        except PermanentJobError as e:
+            print(f"Job {job_id} ({job_type}) failed permanently: {str(e)}")
+            status, result_json, error = 'failed', None, str(e)
+            retry = False
+        except Exception as e:
+            print(f"Job {job_id} ({job_type}) failed: {str(e)}")
+            traceback.print_exc()
+            status, result_json, error = 'failed', None, str(e)
+        finally:
+            self._local.job_id = None
+        
+        with self.db.connection() as conn:
+            if status == 'failed' and retry:
+                attempts = conn.execute('SELECT attempts FROM background_jobs WHERE id = ?', (job_id,)).fetchone()[0]
+                if attempts < self.max_attempts:
+                    status = 'queued'
+            
+            conn.execute('''
+                UPDATE background_jobs
+                SET status = ?, result = ?, error = ?, completed_at = ?
+                WHERE id = ?
+            ''', (status, result_json, error, time.time() if status != 'queued' else None, job_id))
+        
+        if status == 'failed' and job_type in self._failure_handlers:
+            try:
+                self._failure_handlers[job_type](json.loads(payload), error)
+            except Exception as e:
+                print(f"Error cleaning up failed job {job_id} ({job_type}): {str(e)}")
+        
+        self._count(job_type, 'retried' if status == 'queued' else status, (time.perf_counter() - started) * 1000)
+        with self._changed:
+            self._changed.notify_all()
+    
+    def _count(self, job_type, outcome, duration_ms=None):
+        with self._stats_lock:
+            stats = self._stats.setdefault(job_type, {
+                'enqueued': 0, 'completed': 0, 'failed': 0, 'retried': 0, 'total_ms': 0.0
+            })
+            stats[outcome] += 1
+            if duration_ms is not None:
+                stats['total_ms'] += duration_ms
+    
+    def get_stats(self):
+        """Per-job-type counters plus the current queue depth"""
+        with self.db.connection() as conn:
+            depth = dict(conn.execute('''
+                SELECT status, COUNT(*) FROM background_jobs
+                WHERE status IN ('queued', 'running')
+                GROUP BY status
+            ''').fetchall())
+        
+        with self._stats_lock:
+            job_types = {}
+            for job_type, stats in self._stats.items():
+                finished = stats['completed'] + stats['failed'] + stats['retried']
+                job_types[job_type] = {
+                    'enqueued': stats['enqueued'],
+                    'completed': stats['completed'],
+                    'failed': stats['failed'],
+                    'retried': stats['retried'],
+                    'avg_ms': round(stats['total_ms'] / finished, 2) if finished else 0
+                }
+        
+        return {
+            'workers': self.num_workers,
+            'queued': depth.get('queued', 0),
+            'running': depth.get('running', 0),
+            'job_types': job_types
+        }
@@ -0,0 +1,179 @@
+"""
+JSON Repair Module
+Tolerant parsing of JSON written by a language model
+The document is read left to right in one pass, accepting the usual near-misses:
+single quotes, unquoted keys and values, Python literals, comments, missing or
+trailing commas, stray quotes inside strings and output cut off mid-document.
+Whatever was parsed before the text ran out is returned
+"""
+
+import json
+
+
+_LITERALS = {'true': True, 'false': False, 'null': None, 'True': True, 'False': False, 'None': None}
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f'}
+
+# Characters that may follow a closing quote; anything else means the quote
+# belonged inside the string (e.g. an apostrophe in a single-quoted string)
+_AFTER_STRING = ',:]}'
+
+
+class JSONRepairError(ValueError):
+    """The text contains no JSON value at all"""
+
+
+class _Parser:
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+    
+    def _peek(self):
+        return self.text[self.pos] if self.pos < len(self.text) else ''
+    
+    def _skip(self):
+        """Skip whitespace and // or /* */ comments"""
+        text = self.text
+        while self.pos < len(text):
+            if text[self.pos].isspace():
+                self.pos += 1
+            elif text.startswith('//', self.pos):
+                end = text.find('\n', self.pos)
+                self.pos = len(text) if end < 0 else end + 1
+            elif text.startswith('/*', self.pos):
+                end = text.find('*/', self.pos + 2)
+                self.pos = len(text) if end < 0 else end + 2
+            else:
+                break
+    
+    def parse(self):
+        self._skip()
+        if not self._peek():
+            raise JSONRepairError("Empty JSON document")
+        return self._value()
+    
+    def _value(self):
+        ch = self._peek()
+        if ch == '{':
+            return self._object()
+        if ch == '[':
+            return self._array()
+        if ch in '"\'':
+            return self._string()
+        return self._bare()
+    
+    def _object(self):
+        self.pos += 1
+        result = {}
+        while True:
+            self._skip()
+            ch = self._peek()
+            if not ch or ch == '}':
+                self.pos += 1
+                return result
+            if ch in ',]':
+                # Separator, or a bracket that does not belong here
+                self.pos += 1
+                continue
+            
+            key = self._string() if ch in '"\'' else self._bare(stop=':,}')
+            self._skip()
+            if self._peek() == ':':
+                self.pos += 1
+                self._skip()
+            
+            # A key without a value (e.g. cut off after the colon) is dropped
+            if self._peek() in ('', ',', '}'):
+                continue
+            result[str(key)] = self._value()
+    
+    def _array(self):
+        self.pos += 1
+        result = []
+        while True:
+            self._skip()
+            ch = self._peek()
+            if not ch or ch == ']':
+                self.pos += 1
+                return result
+            if ch in ',}:':
+                self.pos += 1
+                continue
+            result.append(self._value())
+    
+    def _string(self):
+        text = self.text
+        quote = text[self.pos]
+        self.pos += 1
+        chars = []
+        while self.pos < len(text):
+            ch = text[self.pos]
+            if ch == '\\':
+                escaped = text[self.pos + 1:self.pos + 2]
+                if escaped == 'u':
+                    try:
+                        chars.append(chr(int(text[self.pos + 2:self.pos + 6], 16)))
+                        self.pos += 6
+                        continue
+                    except ValueError:
+                        pass
+                # Unknown escapes such as \_ keep the escaped character
+                chars.append(_ESCAPES.get(escaped, escaped))
+                self.pos += 2
+                continue
+            
+            if ch == quote and self._closes_string():
+                self.pos += 1
+                return ''.join(chars)
+            
+            chars.append(ch)
+            self.pos += 1
+        
+        # Cut off inside the string
+        return ''.join(chars)
+    
+    def _closes_string(self):
+        """Whether the quote at pos ends the string rather than sitting inside it"""
+        text = self.text
+        index = self.pos + 1
+        while index < len(text) and text[index] in ' \t\r':
+            index += 1
+        # A line break after the quote also ends the string, so values on
+        # separate lines with no comma between them still split correctly
+        return index >= len(text) or text[index] in _AFTER_STRING or text[index] == '\n'
+    
+    def _bare(self, stop=',]}\n'):
+        """An unquoted token: a literal, a number or free text"""
+        start = self.pos
+        while self.pos < len(self.text) and self.text[self.pos] not in stop:
+            self.pos += 1
+        
+        token = self.text[start:self.pos].strip()
+        if not token:
+            # Nothing usable here; step over the character so parsing moves on
+            self.pos += 1
+            return None
+        if token in _LITERALS:
+            return _LITERALS[token]
+        
+        try:
+            return json.loads(token)
+        except ValueError:
+            return token.strip('"\'')
+
+
+def loads(text):
+    """
+    Parse JSON, repairing it if the strict parser rejects it
+    
+    Returns:
+        (value, repaired) where repaired is True when the strict parse failed
+    
+    Raises:
+        JSONRepairError: the text holds no JSON value
+    """
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+    return _Parser(text).parse(), True
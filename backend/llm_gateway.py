@@ -0,0 +1,186 @@
+"""
+LLM Gateway Module
+Single shared entry point for all Groq chat completions
+Owns one keep-alive HTTP connection pool, per-call-site timeouts,
+the retry policy and a global concurrency cap
+"""
+
+import threading
+import time
+
+import httpx
+from groq import APIError, Groq
+
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+# What a gateway call raises when the API fails, times out or cannot be reached
+LLM_ERRORS = (APIError, httpx.HTTPError)
+
+# Request timeout in seconds for each call site; 'default' covers anything unlisted
+CALL_SITE_TIMEOUTS = {
+    'generate_questions': 60,
+    'generate_questions_topup': 30,
+    'generate_followup_question': 15,
+    'evaluate_answer': 20,
+    'suggest_interview_rounds': 45,
+    'generate_round_questions': 60,
+    'generate_personalized_feedback': 90,
+    'stream_personalized_feedback': 90,
+    'evaluation.technical': 20,
+    'evaluation.grammar': 10,
+    'evaluation.feedback': 20,
+    'evaluation.feedback_stream': 30,
+    'evaluation.fused': 30,
+    'improvement.steps': 30,
+    'improvement.steps_stream': 45,
+    'default': 30
+}
+
+
+class LLMGateway:
+    def __init__(self, api_key, max_concurrency=16, max_connections=32,
+                 keepalive_expiry=120, max_retries=2, timeouts=None):
+        """
+        Args:
+            api_key: Groq API key
+            max_concurrency: maximum number of in-flight completions across all call sites
+            max_connections: size of the shared HTTP connection pool
+            keepalive_expiry: seconds an idle pooled connection is kept open
+            max_retries: retries on connection errors, 429 and 5xx responses
+            timeouts: per-call-site overrides for CALL_SITE_TIMEOUTS
+        """
+        self.timeouts = dict(CALL_SITE_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self.max_concurrency = max_concurrency
+        
+        # One pooled client for the whole process, so TLS sessions and sockets
+        # are reused across requests instead of being set up per client
+        self._http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            timeout=httpx.Timeout(self.timeouts['default'], connect=5.0)
+        )
+        self.client = Groq(api_key=api_key, http_client=self._http_client, max_retries=max_retries)
+        
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+        self._in_flight = 0
+    
+    def chat(self, call_site, messages, model=DEFAULT_MODEL, **kwargs):
+        """
+        Create a chat completion on behalf of call_site
+        
+        Blocks while max_concurrency completions are already in flight.
+        Extra keyword arguments are passed through to chat.completions.create.
+        """
+        timeout = self.timeouts.get(call_site, self.timeouts['default'])
+        
+        wait_started = time.perf_counter()
+        self._semaphore.acquire()
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._in_flight += 1
+        
+        error = False
+        try:
+            return self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                timeout=timeout,
+                **kwargs
+            )
+        except Exception:
+            error = True
+            raise
+        finally:
+            finished = time.perf_counter()
+            self._semaphore.release()
+            self._record(call_site, (started - wait_started) * 1000, (finished - started) * 1000, error)
+    
+    def stream(self, call_site, messages, model=DEFAULT_MODEL, **kwargs):
+        """
+        Stream a chat completion on behalf of call_site, yielding text chunks
+        
+        The concurrency slot is held until the stream is exhausted or closed,
+        so abandoned streams release it when the generator is garbage collected.
+        """
+        timeout = self.timeouts.get(call_site, self.timeouts['default'])
+        
+        wait_started = time.perf_counter()
+        self._semaphore.acquire()
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._in_flight += 1
+        
+        error = False
+        first_token_ms = None
+        try:
+            completion = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                timeout=timeout,
+                stream=True,
+                **kwargs
+            )
+            for chunk in completion:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    if first_token_ms is None:
+                        first_token_ms = (time.perf_counter() - started) * 1000
+                    yield text
+        except Exception:
+            error = True
+            raise
+        finally:
+            finished = time.perf_counter()
+            self._semaphore.release()
+            self._record(call_site, (started - wait_started) * 1000, (finished - started) * 1000, error, first_token_ms)
+    
+    def _record(self, call_site, wait_ms, call_ms, error, first_token_ms=None):
+        """Accumulate per-call-site counters"""
+        with self._stats_lock:
+            self._in_flight -= 1
+            stats = self._stats.setdefault(call_site, {
+                'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'queue_wait_ms': 0.0,
+                'streams': 0, 'first_token_ms': 0.0
+            })
+            stats['calls'] += 1
+            stats['errors'] += int(error)
+            stats['total_ms'] += call_ms
+            stats['max_ms'] = max(stats['max_ms'], call_ms)
+            stats['queue_wait_ms'] += wait_ms
+            if first_token_ms is not None:
+                stats['streams'] += 1
+                stats['first_token_ms'] += first_token_ms
+    
+    def get_stats(self):
+        """Per-call-site call counts, latencies and time spent waiting for a concurrency slot"""
+        with self._stats_lock:
+            call_sites = {
+                call_site: {
+                    'calls': stats['calls'],
+                    'errors': stats['errors'],
+                    'avg_ms': round(stats['total_ms'] / stats['calls'], 2),
+                    'max_ms': round(stats['max_ms'], 2),
+                    'avg_queue_wait_ms': round(stats['queue_wait_ms'] / stats['calls'], 2),
+                    'avg_first_token_ms': round(stats['first_token_ms'] / stats['streams'], 2) if stats['streams'] else None,
+                    'timeout_seconds': self.timeouts.get(call_site, self.timeouts['default'])
+                }
+                for call_site, stats in self._stats.items()
+            }
+            return {
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self._in_flight,
+                'call_sites': call_sites
+            }
+    
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self._http_client.close()
@@ -0,0 +1,279 @@
+"""
+Near Duplicates Module
+MinHash/LSH index for spotting paraphrased questions
+Question text is reduced to word and word-pair shingles and a MinHash signature;
+LSH buckets per scope (a question bank pool, a custom role) turn "is there a
+near-duplicate?" into a few dictionary lookups. Signatures are written to
+SQLite as questions are added, and loaded back into the buckets at startup
+"""
+
+import hashlib
+import random
+import re
+import sqlite3
+import threading
+import time
+from array import array
+
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Seeds the MinHash permutations; persisted signatures are only comparable under the same seed
+SIGNATURE_SEED = 20240917
+
+# Bump whenever shingles(), stem() or STOPWORDS change, so stored signatures are recomputed
+SHINGLE_VERSION = 1
+
+# Words that change how a question is phrased but not what it asks
+STOPWORDS = frozenset((
+    'a', 'an', 'the', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'with', 'at', 'by', 'from',
+    'is', 'are', 'was', 'were', 'be', 'been', 'do', 'does', 'did', 'it', 'its', 'this', 'that',
+    'these', 'those', 'what', 'which', 'how', 'why', 'when', 'where', 'who', 'can', 'could',
+    'would', 'should', 'will', 'you', 'your', 'me', 'we', 'our', 'i', 'my', 'explain',
+    'describe', 'tell', 'about', 'give', 'example', 'please', 'briefly', 'discuss', 'between'
+))
+
+
+def stem(word):
+    """Crude suffix stripping, enough for 'multithreaded' and 'multithreading' to meet"""
+    if len(word) > 5 and word.endswith('ing'):
+        return word[:-3]
+    if len(word) > 4 and word.endswith('ed'):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def shingles(text):
+    """Stemmed content words and adjacent word pairs"""
+    words = [
+        stem(word) for word in re.findall(r'[a-z0-9+#]+', (text or '').lower())
+        if word not in STOPWORDS
+    ]
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+class NearDuplicateIndex:
+    def __init__(self, database, num_perm=64, rows_per_band=3, threshold=0.5, table='question_signatures'):
+        """
+        Args:
+            database: shared Database holding the signature table
+            num_perm: MinHash permutations per signature
+            rows_per_band: signature rows hashed together into one LSH bucket;
+                fewer rows find more candidates at lower similarity
+            threshold: estimated Jaccard similarity at which two questions
+                count as near-duplicates
+            table: signature table, so other kinds of text get their own index
+        """
+        self.db = database
+        self.table = table
+        self.num_perm = num_perm
+        self.rows_per_band = rows_per_band
+        self.bands = num_perm // rows_per_band
+        self.threshold = threshold
+        
+        # Stored with every signature; rows signed under another version are re-signed on load
+        self.version = f"{SHINGLE_VERSION}:{SIGNATURE_SEED}:{num_perm}"
+        
+        # Fixed seed: persisted signatures must stay comparable across restarts
+        rng = random.Random(SIGNATURE_SEED)
+        self._perms = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        
+        self._lock = threading.Lock()
+        self._signatures = {}  # (scope, item_id) -> signature
+        self._buckets = {}  # (scope, band, band bytes) -> set of item ids
+        self._stats = {
+            'adds': 0, 'removes': 0, 'lookups': 0, 'near_duplicates': 0,
+            'lookup_us': 0.0, 'load_ms': 0.0, 'resigned': 0
+        }
+        
+        self._init_table()
+        self.load()
+    
+    def _init_table(self):
+        with self.db.connection() as conn:
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    scope TEXT NOT NULL,
+                    item_id INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    signature BLOB NOT NULL,
+                    version TEXT,
+                    PRIMARY KEY (scope, item_id)
+                )
+            ''')
+            try:
+                conn.execute(f'ALTER TABLE {self.table} ADD COLUMN version TEXT')
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+    
+    def signature(self, text):
+        """MinHash signature of a question; empty text gets an all-max signature"""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+            for shingle in shingles(text)
+        ]
+        if not hashes:
+            return array('Q', [MERSENNE_PRIME] * self.num_perm)
+        return array('Q', [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in self._perms])
+    
+    def similarity(self, sig_a, sig_b):
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / self.num_perm
+    
+    def matches(self, signature, signatures):
+        """Whether a signature is a near-duplicate of any of the others"""
+        return any(self.similarity(signature, other) >= self.threshold for other in signatures)
+    
+    def _band_keys(self, scope, signature):
+        raw = signature.tobytes()
+        width = self.rows_per_band * signature.itemsize
+        return [(scope, band, raw[band * width:(band + 1) * width]) for band in range(self.bands)]
+    
+    def _insert(self, scope, item_id, signature):
+        """Add a signature to the in-memory buckets; caller holds the lock"""
+        self._signatures[(scope, item_id)] = signature
+        for key in self._band_keys(scope, signature):
+            self._buckets.setdefault(key, set()).add(item_id)
+    
+    def _discard(self, scope, item_id):
+        signature = self._signatures.pop((scope, item_id), None)
+        if signature is None:
+            return
+        for key in self._band_keys(scope, signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del self._buckets[key]
+    
+    def load(self):
+        """Rebuild the buckets from the persisted signatures, re-signing rows written under another version"""
+        started = time.perf_counter()
+        with self.db.connection() as conn:
+            rows = conn.execute(f'SELECT scope, item_id, text, signature, version FROM {self.table}').fetchall()
+        
+        stale = []
+        with self._lock:
+            self._signatures.clear()
+            self._buckets.clear()
+            for scope, item_id, text, blob, version in rows:
+                if version == self.version:
+                    signature = array('Q')
+                    signature.frombytes(blob)
+                else:
+                    signature = self.signature(text)
+                    stale.append((signature.tobytes(), self.version, scope, item_id))
+                self._insert(scope, item_id, signature)
+            self._stats['load_ms'] = (time.perf_counter() - started) * 1000
+            self._stats['resigned'] = len(stale)
+        
+        if stale:
+            with self.db.connection() as conn:
+                conn.executemany(f'''
+                    UPDATE {self.table} SET signature = ?, version = ? WHERE scope = ? AND item_id = ?
+                ''', stale)
+    
+    def neighbours(self, scope, text, signature=None, limit=None):
+        """
+        Near-duplicates of text within a scope
+        
+        Returns:
+            list of (item_id, similarity) at or above the threshold, most
+            similar first, at most limit long
+        """
+        started = time.perf_counter()
+        signature = signature or self.signature(text)
+        
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(scope, signature):
+                candidates |= self._buckets.get(key, set())
+            
+            matches = []
+            for item_id in candidates:
+                similarity = self.similarity(signature, self._signatures[(scope, item_id)])
+                if similarity >= self.threshold:
+                    matches.append((item_id, similarity))
+            
+            self._stats['lookups'] += 1
+            self._stats['near_duplicates'] += int(bool(matches))
+            self._stats['lookup_us'] += (time.perf_counter() - started) * 1e6
+        
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit] if limit else matches
+    
+    def find(self, scope, text, signature=None):
+        """
+        Closest near-duplicate of text within a scope
+        
+        Returns:
+            (item_id, similarity) of the most similar indexed item at or
+            above the threshold, or None
+        """
+        matches = self.neighbours(scope, text, signature, limit=1)
+        return matches[0] if matches else None
+    
+    def add(self, scope, item_id, text, signature=None):
+        """Index a stored question, replacing any earlier text for the same item"""
+        signature = signature or self.signature(text)
+        with self.db.connection() as conn:
+            conn.execute(f'''
+                INSERT OR REPLACE INTO {self.table} (scope, item_id, text, signature, version)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (scope, item_id, text, signature.tobytes(), self.version))
+        
+        with self._lock:
+            self._discard(scope, item_id)
+            self._insert(scope, item_id, signature)
+            self._stats['adds'] += 1
+    
+    def remove(self, scope, item_id):
+        with self.db.connection() as conn:
+            conn.execute(f'DELETE FROM {self.table} WHERE scope = ? AND item_id = ?', (scope, item_id))
+        
+        with self._lock:
+            self._discard(scope, item_id)
+            self._stats['removes'] += 1
+    
+    def backfill(self, items):
+        """Index (scope, item_id, text) rows that are not indexed yet; returns how many were added"""
+        with self._lock:
+            missing = [item for item in items if (item[0], item[1]) not in self._signatures]
+        for scope, item_id, text in missing:
+            self.add(scope, item_id, text)
+        return len(missing)
+    
+    def unique(self, texts, existing=()):
+        """
+        Positions of the texts that are not near-duplicates of an existing text
+        or of an earlier text in the list; for checks within one interview
+        that do not touch the persisted index
+        """
+        kept = [self.signature(text) for text in existing]
+        positions = []
+        for position, text in enumerate(texts):
+            signature = self.signature(text)
+            if self.matches(signature, kept):
+                continue
+            kept.append(signature)
+            positions.append(position)
+        return positions
+    
+    def get_stats(self):
+        """Index size and lookup latency"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._signatures)
+            stats['buckets'] = len(self._buckets)
+            stats['scopes'] = len({scope for scope, _ in self._signatures})
+        
+        lookups = stats['lookups']
+        stats['avg_lookup_us'] = round(stats.pop('lookup_us') / lookups, 1) if lookups else 0
+        stats['load_ms'] = round(stats['load_ms'], 2)
+        stats['threshold'] = self.threshold
+        return stats
@@ -0,0 +1,187 @@
+"""
+PDF Extractor Module
+Bounded resume text extraction
+Pages are read one at a time and extraction stops at a character or page budget
+sized for the question-generation prompt. Large files are parsed in a worker
+process that is killed if it runs past a hard timeout. Each worker runs this
+module on its own, so it never imports the app or forks the threaded server:
+
+    python pdf_extractor.py <path> <max_chars> <max_pages>
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import PyPDF2
+
+
+def iter_page_text(reader, max_pages):
+    """Yield the text of each page, one page at a time, up to max_pages"""
+    for index, page in enumerate(reader.pages):
+        if index >= max_pages:
+            return
+        yield page.extract_text() or ''
+
+
+def extract_text(path, max_chars, max_pages):
+    """
+    Extract at most max_chars characters from the first max_pages pages
+    
+    Runs in a worker process for large files, through main().
+    
+    Returns:
+        dict with 'text', 'pages' (pages read), 'total_pages' and 'truncated'
+    """
+    with open(path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        total_pages = len(reader.pages)
+        
+        parts = []
+        chars = 0
+        pages = 0
+        for text in iter_page_text(reader, max_pages):
+            pages += 1
+            remaining = max_chars - chars
+            if len(text) >= remaining:
+                parts.append(text[:remaining])
+                chars = max_chars
+                break
+            parts.append(text)
+            chars += len(text)
+    
+    return {
+        'text': '\n'.join(parts),
+        'pages': pages,
+        'total_pages': total_pages,
+        'truncated': pages < total_pages or chars >= max_chars
+    }
+
+
+class PDFExtractor:
+    def __init__(self, max_chars=12000, max_pages=10, max_bytes=10485760,
+                 pool_min_bytes=524288, workers=1, timeout=15.0):
+        """
+        Args:
+            max_chars: characters kept from a document
+            max_pages: pages read from a document
+            max_bytes: files larger than this are rejected without parsing
+            pool_min_bytes: files at least this large are parsed in a worker process
+            workers: worker processes running at once; 0 parses everything
+                inline without a timeout
+            timeout: seconds a worker may spend on one file before it is killed
+        """
+        self.max_chars = max_chars
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.pool_min_bytes = pool_min_bytes
+        self.workers = workers
+        self.timeout = timeout
+        
+        # Further large files wait for a free worker
+        self._slots = threading.BoundedSemaphore(max(workers, 1))
+        
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'extractions': 0,
+            'pooled': 0,
+            'truncated': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'errors': 0,
+            'pages': 0,
+            'chars': 0,
+            'extract_ms': 0.0,
+            'max_extract_ms': 0.0
+        }
+    
+    def extract(self, path):
+        """
+        Text of a PDF within the character and page budget
+        
+        Raises:
+            ValueError: the file is too large, unreadable or timed out
+        """
+        started = time.perf_counter()
+        size = os.path.getsize(path)
+        if size > self.max_bytes:
+            self._count('rejected')
+            raise ValueError(f"Resume is larger than {self.max_bytes // 1048576} MB")
+        
+        pooled = self.workers > 0 and size >= self.pool_min_bytes
+        try:
+            if pooled:
+                result = self._extract_pooled(path)
+            else:
+                result = extract_text(path, self.max_chars, self.max_pages)
+        except ValueError:
+            raise
+        except Exception as e:
+            self._count('errors')
+            raise ValueError(f"Could not read resume: {str(e)}")
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self._stats['extractions'] += 1
+            self._stats['pooled'] += int(pooled)
+            self._stats['truncated'] += int(result['truncated'])
+            self._stats['pages'] += result['pages']
+            self._stats['chars'] += len(result['text'])
+            self._stats['extract_ms'] += elapsed_ms
+            self._stats['max_extract_ms'] = max(self._stats['max_extract_ms'], elapsed_ms)
+        return result['text']
+    
+    def _extract_pooled(self, path):
+        """Run extract_text in a new worker process, killed after timeout seconds"""
+        command = [sys.executable, os.path.abspath(__file__), path, str(self.max_chars), str(self.max_pages)]
+        with self._slots:
+            try:
+                completed = subprocess.run(command, capture_output=True, text=True, timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                # run() has killed the worker; the next file gets a fresh one
+                self._count('timeouts')
+                raise ValueError(f"Resume took longer than {self.timeout:g}s to read")
+        
+        if completed.returncode != 0:
+            lines = completed.stderr.strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else f"worker exited with status {completed.returncode}")
+        return json.loads(completed.stdout)
+    
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+    
+    def get_stats(self):
+        """Extraction counters; chars and pages are totals over successful extractions"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        
+        count = stats['extractions']
+        stats['avg_extract_ms'] = round(stats.pop('extract_ms') / count, 2) if count else 0
+        stats['max_extract_ms'] = round(stats['max_extract_ms'], 2)
+        stats['avg_chars'] = round(stats['chars'] / count) if count else 0
+        stats['workers'] = max(self.workers, 0)
+        stats['budget'] = {'max_chars': self.max_chars, 'max_pages': self.max_pages, 'max_bytes': self.max_bytes}
+        return stats
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3:
+        print("usage: python pdf_extractor.py <path> <max_chars> <max_pages>", file=sys.stderr)
+        return 2
+    
+    try:
+        result = extract_text(argv[0], int(argv[1]), int(argv[2]))
+    except Exception as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    json.dump(result, sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""
+Query Plans Module
+Managed secondary indexes for the interview schema and the registry of hot queries
+Running this module checks every hot query with EXPLAIN QUERY PLAN and exits
+non-zero if any of them falls back to a full table scan, or no longer appears
+in the backend source:
+    
+    python query_plans.py [database]
+    flask --app app check-query-plans
+"""
+
+import glob
+import os
+import re
+import sqlite3
+import sys
+
+
+# Managed indexes: (name, table, columns). Indexes prefixed with ix_ that are not
+# listed here are dropped by Database.ensure_indexes, so rename an index when
+# changing its columns.
+INDEXES = (
+    ('ix_interviews_user', 'interviews', ('user_id',)),
+    ('ix_interview_questions_interview', 'interview_questions', ('interview_id',)),
+    ('ix_interview_questions_round', 'interview_questions', ('round_id',)),
+    ('ix_interview_rounds_interview', 'interview_rounds', ('interview_id', 'round_order')),
+    ('ix_audit_logs_time', 'audit_logs', ('timestamp',)),
+    ('ix_audit_logs_action_user_ip', 'audit_logs', ('action', 'user_id', 'ip_address', 'timestamp')),
+    ('ix_custom_roles_user', 'custom_roles', ('user_id',)),
+    ('ix_custom_roles_public', 'custom_roles', ('is_public',)),
+    ('ix_custom_questions_role_difficulty', 'custom_questions', ('role_id', 'difficulty_level')),
+    ('ix_custom_resources_user_created', 'custom_resources', ('user_id', 'created_at')),
+    ('ix_learning_paths_interview_created', 'learning_paths', ('interview_id', 'created_at')),
+    ('ix_improvement_plans_interview_created', 'improvement_plans', ('interview_id', 'created_at')),
+    ('ix_evaluation_metrics_interview', 'evaluation_metrics', ('interview_id',)),
+    ('ix_user_sessions_user_active_expires', 'user_sessions', ('user_id', 'active', 'expires_at')),
+    ('ix_user_roles_user', 'user_roles', ('user_id',)),
+)
+
+# Queries on request paths, the rate limit snapshots and the startup rebuilds, keyed by
+# where they run. Each must appear verbatim (up to whitespace) in a backend module.
+# Periodic maintenance queries (cleanup_old_data) are deliberately not listed.
+HOT_QUERIES = {
+    'rate_limiter.load': '''
+        SELECT identifier, endpoint, tokens, updated_at FROM rate_limits
+        WHERE tokens IS NOT NULL
+    ''',
+    'rate_limiter.flush': '''
+        INSERT INTO rate_limits (identifier, endpoint, request_count, window_start, tokens, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(identifier, endpoint) DO UPDATE SET
+            request_count = excluded.request_count,
+            window_start = excluded.window_start,
+            tokens = excluded.tokens,
+            updated_at = excluded.updated_at
+    ''',
+    'create_session.enforce_limit': '''
+        UPDATE user_sessions
+        SET active = FALSE
+        WHERE id = (
+            SELECT id FROM user_sessions
+            WHERE user_id = ? AND active = TRUE
+            ORDER BY created_at ASC
+            LIMIT 1
+        )
+        AND (
+            SELECT COUNT(*) FROM user_sessions
+            WHERE user_id = ? AND active = TRUE AND expires_at > ?
+        ) >= ?
+    ''',
+    'authorization_cache.load': 'SELECT role, permissions FROM user_roles WHERE user_id = ?',
+    'risk_signals.rebuild_windows': '''
+        SELECT user_id, action, ip_address, timestamp FROM audit_logs
+        WHERE user_id IS NOT NULL AND timestamp > datetime('now', ?)
+        ORDER BY timestamp, id
+    ''',
+    'risk_signals.rebuild_recent_ips': '''
+        SELECT user_id, ip_address, MAX(timestamp) AS last_seen FROM audit_logs
+        WHERE action = 'login_success' AND user_id IS NOT NULL AND ip_address IS NOT NULL
+        GROUP BY user_id, ip_address
+        ORDER BY last_seen
+    ''',
+    'login.user_with_role': '''
+        SELECT id, password_hash, name, totp_secret, totp_verified,
+               (SELECT role FROM user_roles WHERE user_id = users.id) AS role,
+               (SELECT permissions FROM user_roles WHERE user_id = users.id) AS permissions
+        FROM users WHERE email = ?
+    ''',
+    'resume_store.text': 'SELECT text FROM resume_files WHERE content_hash = ?',
+    'resume_store.question_set': '''
+        SELECT questions FROM question_sets
+        WHERE resume_hash = ? AND context_hash = ? AND owner_id = ? AND created_at > ?
+    ''',
+    'get_interviews': 'SELECT * FROM interviews WHERE user_id = ?',
+    'interview_owner': 'SELECT id, role_id FROM interviews WHERE id = ? AND user_id = ?',
+    'interview_questions.by_interview': '''
+        SELECT question, answer, score, technical_score, communication_score,
+               confidence_score, feedback, topic
+        FROM interview_questions
+        WHERE interview_id = ?
+        ORDER BY id
+    ''',
+    'interview_questions.by_id_and_interview': '''
+        SELECT id, question
+        FROM interview_questions
+        WHERE id = ? AND interview_id = ?
+    ''',
+    'interview_questions.scored': '''
+        SELECT question, answer, score, technical_score, communication_score,
+               confidence_score, feedback
+        FROM interview_questions
+        WHERE interview_id = ? AND score IS NOT NULL
+    ''',
+    'interview_questions.average_score': '''
+        UPDATE interviews
+        SET score = (
+            SELECT AVG(score)
+            FROM interview_questions
+            WHERE interview_id = ? AND score IS NOT NULL
+        )
+        WHERE id = ?
+    ''',
+    'interview_questions.owned_feedback': '''
+        SELECT iq.question, iq.answer, iq.expected_points, iq.technical_score,
+               iq.communication_score, iq.confidence_score
+        FROM interview_questions iq
+        JOIN interviews i ON iq.interview_id = i.id
+        WHERE iq.id = ? AND i.user_id = ?
+    ''',
+    'complete_round.average_score': '''
+        SELECT AVG(score)
+        FROM interview_questions
+        WHERE round_id = ? AND score IS NOT NULL
+    ''',
+    'complete_round.next_round': '''
+        SELECT id, round_name, round_type
+        FROM interview_rounds
+        WHERE interview_id = ? AND status = 'pending'
+        ORDER BY round_order
+        LIMIT 1
+    ''',
+    'start_round.round_with_owner': '''
+        SELECT ir.interview_id, ir.round_name, ir.round_type, ir.question_count,
+               i.job_role, i.job_description, i.user_id
+        FROM interview_rounds ir
+        JOIN interviews i ON ir.interview_id = i.id
+        WHERE ir.id = ?
+    ''',
+    'start_round.prefetched_questions': '''
+        SELECT prefetch_status, prefetched_questions FROM interview_rounds WHERE id = ?
+    ''',
+    'question_bank.unseen': '''
+        SELECT id, question, expected_points FROM question_bank
+        WHERE bank_key = ? AND id NOT IN (
+            SELECT question_id FROM question_bank_served WHERE user_id = ?
+        )
+    ''',
+    'question_bank.pool_size': '''
+        SELECT COUNT(*) FROM question_bank WHERE bank_key = ?
+    ''',
+    'question_bank.repeats': '''
+        SELECT q.id, q.question, q.expected_points
+        FROM question_bank_served s
+        JOIN question_bank q ON q.id = s.question_id
+        WHERE s.user_id = ? AND q.bank_key = ?
+        ORDER BY s.served_at
+        LIMIT ?
+    ''',
+    'question_bank.suggestions': '''
+        SELECT rounds FROM round_suggestions WHERE suggestion_key = ? AND created_at > ?
+    ''',
+    'answer_reuse.neighbour_scores': '''
+        SELECT id, technical_score, grammar_score
+        FROM answer_scores WHERE id IN (?, ?, ?) AND grammar_score IS NOT NULL
+    ''',
+    'answer_reuse.evict': '''
+        SELECT id FROM answer_scores WHERE question_key = ?
+        ORDER BY id DESC LIMIT -1 OFFSET ?
+    ''',
+    'get_custom_roles': '''
+        SELECT id, name, description, icon, evaluation_criteria, created_at
+        FROM custom_roles
+        WHERE user_id = ? OR is_public = TRUE
+        ORDER BY created_at DESC
+    ''',
+    'get_custom_role.questions': '''
+        SELECT id, question, topic, difficulty_level, expected_points
+        FROM custom_questions
+        WHERE role_id = ?
+        ORDER BY difficulty_level, id
+    ''',
+    'start_role_interview.questions': '''
+        SELECT id, question, topic, expected_points
+        FROM custom_questions
+        WHERE role_id = ? AND (difficulty_level = ? OR difficulty_level IS NULL)
+        ORDER BY id
+    ''',
+    'custom_question_owner': '''
+        SELECT cr.user_id, cq.role_id
+        FROM custom_questions cq
+        JOIN custom_roles cr ON cq.role_id = cr.id
+        WHERE cq.id = ?
+    ''',
+    'get_custom_resources': '''
+        SELECT * FROM custom_resources
+        WHERE user_id = ?
+        ORDER BY created_at DESC
+    ''',
+    'improvement_generator.recommend_resources': '''
+        SELECT title, type, url, description, tags
+        FROM custom_resources
+        WHERE user_id = ?
+        ORDER BY created_at DESC
+    ''',
+    'get_personalized_feedback': '''
+        SELECT strengths, weaknesses, roadmap, recommended_resources, created_at
+        FROM learning_paths
+        WHERE interview_id = ?
+        ORDER BY created_at DESC
+        LIMIT 1
+    ''',
+    'interview_results.evaluation_metrics': '''
+        SELECT * FROM evaluation_metrics
+        WHERE interview_id = ?
+    ''',
+    'interview_results.improvement_plan': '''
+        SELECT * FROM improvement_plans
+        WHERE interview_id = ?
+    ''',
+    'stream_improvement_plan.latest_plan': '''
+        UPDATE improvement_plans
+        SET improvement_steps = ?
+        WHERE id = (
+            SELECT id FROM improvement_plans
+            WHERE interview_id = ?
+            ORDER BY created_at DESC, id DESC
+            LIMIT 1
+        )
+    ''',
+}
+
+# Hot queries that read every row by design, such as loading all snapshots at startup
+FULL_READ_QUERIES = frozenset(('rate_limiter.load',))
+
+# Plan rows such as "SCAN audit_logs" or "SCAN custom_roles USING INDEX ..." read
+# every row of a table or index; SEARCH rows and constant/subquery scans do not
+FULL_SCAN_PATTERN = re.compile(r'^SCAN (?!CONSTANT ROW)(?!SUBQUERY)')
+
+# A parameter list written as IN (?, ?, ?) also matches one built at run time,
+# such as IN ({','.join('?' * len(ids))})
+PARAMETER_LIST = re.escape('(?, ?, ?)')
+PARAMETER_LIST_SOURCE = r'\((?:\?(?:, \?)*|\{[^}]*\})\)'
+
+
+def _normalize(text):
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def source_text(directory=None):
+    """The backend modules next to this one, whitespace collapsed"""
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    paths = sorted(glob.glob(os.path.join(directory, '*.py')))
+    return _normalize(' '.join(
+        open(path, encoding='utf-8').read() for path in paths
+        if os.path.basename(path) != os.path.basename(__file__)
+    ))
+
+
+def in_source(sql, source):
+    """Whether sql appears in source, ignoring whitespace"""
+    pattern = re.escape(_normalize(sql)).replace(PARAMETER_LIST, PARAMETER_LIST_SOURCE)
+    return re.search(pattern, source) is not None
+
+
+def explain(conn, sql):
+    """Return the EXPLAIN QUERY PLAN detail lines for sql, binding NULL to every parameter"""
+    rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', (None,) * sql.count('?')).fetchall()
+    return [row[-1] for row in rows]
+
+
+def check_query_plans(conn, queries=None):
+    """
+    Explain every hot query and look for it in the backend source
+    
+    Returns:
+        list of dicts with the query name, its plan, the full-scan plan rows
+        (none for FULL_READ_QUERIES) and whether the query is still in the source
+    """
+    source = source_text()
+    results = []
+    for name, sql in (queries or HOT_QUERIES).items():
+        plan = explain(conn, sql)
+        results.append({
+            'name': name,
+            'plan': plan,
+            'full_scans': [] if name in FULL_READ_QUERIES else [
+                detail for detail in plan if FULL_SCAN_PATTERN.match(detail)
+            ],
+            'in_source': in_source(sql, source)
+        })
+    return results
+
+
+def report(results, out=sys.stdout):
+    """Print a summary of check_query_plans results; returns the number of failing queries"""
+    failures = 0
+    for result in results:
+        if not result['in_source']:
+            failures += 1
+            print(f"FAIL {result['name']}: not found in the backend source", file=out)
+        elif result['full_scans']:
+            failures += 1
+            print(f"FAIL {result['name']}: {'; '.join(result['full_scans'])}", file=out)
+        else:
+            note = ' (reads every row)' if result['name'] in FULL_READ_QUERIES else ''
+            print(f"ok   {result['name']}{note}: {'; '.join(result['plan']) or 'no plan'}", file=out)
+    
+    print(f"\n{len(results) - failures}/{len(results)} hot queries are in the source and use an index", file=out)
+    return failures
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    database_path = argv[0] if argv else 'interview_system.db'
+    
+    with sqlite3.connect(database_path) as conn:
+        failures = report(check_query_plans(conn))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
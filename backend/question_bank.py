@@ -0,0 +1,362 @@
+"""
+Question Bank Module
+Reusable pools of generated round questions and cached round suggestions
+Questions are pooled per normalized (round type, job role, description hash)
+key, with paraphrases of pooled questions merged away, and each candidate gets
+a random sample of the questions they have not been served yet. The LLM is only called when a candidate has run out of unseen
+questions, and in the background to top a pool up while it is below target
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Round types with their own generation prompt; any other round is keyed by its name
+KNOWN_ROUND_TYPES = ('hr', 'technical', 'system_design', 'behavioral')
+
+# Longest pause between refills of a key whose refills keep failing
+MAX_REFILL_BACKOFF = 3600
+
+
+def normalize(text):
+    """Lowercase words only, so 'Backend Engineer ' and 'backend-engineer' share a pool"""
+    return re.sub(r'[^a-z0-9+#]+', ' ', (text or '').lower()).strip()
+
+
+def description_hash(job_description):
+    normalized = normalize(job_description)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16] if normalized else ''
+
+
+class QuestionBank:
+    def __init__(self, database, index=None, pool_target=25, max_pool=100, refill_batch=10,
+                 refill_cooldown=60, refill_workers=2, suggestion_ttl=86400):
+        """
+        Args:
+            database: shared Database holding the question bank tables
+            index: optional NearDuplicateIndex; new questions that paraphrase
+                one already in their pool are not stored
+            pool_target: questions a pool is topped up to in the background
+            max_pool: pool size at which candidates who have seen every
+                question are served repeats instead of new questions
+            refill_batch: questions requested by one background refill
+            refill_cooldown: seconds between background refills of one key,
+                doubled after every failed refill
+            refill_workers: threads running background refills
+            suggestion_ttl: seconds a cached round suggestion is served
+        """
+        self.db = database
+        self.index = index
+        self.pool_target = pool_target
+        self.max_pool = max_pool
+        self.refill_batch = refill_batch
+        self.refill_cooldown = refill_cooldown
+        self.suggestion_ttl = suggestion_ttl
+        
+        self._executor = ThreadPoolExecutor(max_workers=refill_workers, thread_name_prefix='question-bank')
+        self._refilling = set()  # keys with a background refill queued or running
+        
+        self._lock = threading.Lock()
+        self._stats = {
+            'draws': 0,
+            'pool_draws': 0,
+            'questions_served': 0,
+            'repeats_served': 0,
+            'sync_generations': 0,
+            'refills': 0,
+            'refill_failures': 0,
+            'generated_questions': 0,
+            'duplicate_questions': 0,
+            'merged_paraphrases': 0,
+            'suggestion_hits': 0,
+            'suggestion_misses': 0
+        }
+        
+        self._init_tables()
+    
+    def _init_tables(self):
+        with self.db.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS question_bank (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    bank_key TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    question_hash TEXT NOT NULL,
+                    expected_points TEXT,
+                    served INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    UNIQUE (bank_key, question_hash)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS question_bank_served (
+                    user_id INTEGER NOT NULL,
+                    question_id INTEGER NOT NULL,
+                    served_at REAL NOT NULL,
+                    PRIMARY KEY (user_id, question_id)
+                )
+            ''')
+            # Refill policy state per key
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS question_bank_keys (
+                    bank_key TEXT PRIMARY KEY,
+                    round_type TEXT NOT NULL,
+                    job_role TEXT NOT NULL,
+                    description_hash TEXT NOT NULL,
+                    draws INTEGER NOT NULL DEFAULT 0,
+                    refills INTEGER NOT NULL DEFAULT 0,
+                    failures INTEGER NOT NULL DEFAULT 0,
+                    last_refill_at REAL NOT NULL DEFAULT 0
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS round_suggestions (
+                    suggestion_key TEXT PRIMARY KEY,
+                    rounds TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    uses INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+    
+    def _count(self, **amounts):
+        with self._lock:
+            for key, amount in amounts.items():
+                self._stats[key] += amount
+    
+    @staticmethod
+    def pool_key(round_type, round_name, job_role, job_description):
+        """Normalized key of the pool a round draws from"""
+        kind = round_type if round_type in KNOWN_ROUND_TYPES else f"{round_type}:{normalize(round_name)}"
+        return f"{kind}|{normalize(job_role)}|{description_hash(job_description)}"
+    
+    def _store(self, conn, bank_key, questions):
+        """Add generated questions to a pool, skipping ones it already holds; returns the rows added"""
+        added = []
+        merged = 0
+        for q in questions:
+            text = (q.get('question') or '').strip() if isinstance(q, dict) else ''
+            if not text:
+                continue
+            
+            signature = None
+            if self.index:
+                signature = self.index.signature(text)
+                if self.index.find(bank_key, text, signature):
+                    merged += 1
+                    continue
+            
+            question_hash = hashlib.sha256(normalize(text).encode('utf-8')).hexdigest()
+            expected_points = q.get('expected_points', [])
+            cursor = conn.execute('''
+                INSERT OR IGNORE INTO question_bank (bank_key, question, question_hash, expected_points, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (bank_key, text, question_hash, json.dumps(expected_points), time.time()))
+            if cursor.rowcount:
+                added.append((cursor.lastrowid, text, expected_points))
+                if self.index:
+                    self.index.add(bank_key, cursor.lastrowid, text, signature)
+        
+        self._count(
+            generated_questions=len(added),
+            merged_paraphrases=merged,
+            duplicate_questions=len(questions) - len(added) - merged
+        )
+        return added
+    
+    def draw(self, user_id, round_type, round_name, job_role, job_description, count, generate):
+        """
+        Questions for one round, sampled without replacement from the pool
+        
+        Args:
+            user_id: candidate; questions they were served before are avoided
+            round_type, round_name, job_role, job_description: round being started
+            count: questions wanted
+            generate: callable taking a question count and returning a list of
+                {'question', 'expected_points'} dicts from the LLM
+        
+        Nothing is marked as served here; pass the bank_id of the questions
+        actually stored for the round to mark_served().
+        
+        Returns:
+            list of {'question', 'expected_points', 'bank_id'} dicts
+        """
+        bank_key = self.pool_key(round_type, round_name, job_role, job_description)
+        
+        with self.db.connection() as conn:
+            conn.execute('''
+                INSERT OR IGNORE INTO question_bank_keys (bank_key, round_type, job_role, description_hash)
+                VALUES (?, ?, ?, ?)
+            ''', (bank_key, round_type, normalize(job_role), description_hash(job_description)))
+            conn.execute('UPDATE question_bank_keys SET draws = draws + 1 WHERE bank_key = ?', (bank_key,))
+            
+            rows = conn.execute('''
+                SELECT id, question, expected_points FROM question_bank
+                WHERE bank_key = ? AND id NOT IN (
+                    SELECT question_id FROM question_bank_served WHERE user_id = ?
+                )
+            ''', (bank_key, user_id)).fetchall()
+            pool_size = conn.execute('SELECT COUNT(*) FROM question_bank WHERE bank_key = ?', (bank_key,)).fetchone()[0]
+        
+        unseen = [(row[0], row[1], json.loads(row[2]) if row[2] else []) for row in rows]
+        chosen = random.sample(unseen, min(count, len(unseen)))
+        missing = count - len(chosen)
+        repeats = []
+        
+        if missing and pool_size >= self.max_pool:
+            # A full pool is not grown for one candidate; serve their oldest repeats
+            with self.db.connection() as conn:
+                rows = conn.execute('''
+                    SELECT q.id, q.question, q.expected_points
+                    FROM question_bank_served s
+                    JOIN question_bank q ON q.id = s.question_id
+                    WHERE s.user_id = ? AND q.bank_key = ?
+                    ORDER BY s.served_at
+                    LIMIT ?
+                ''', (user_id, bank_key, missing)).fetchall()
+            repeats = [(row[0], row[1], json.loads(row[2]) if row[2] else []) for row in rows]
+            chosen += repeats
+            missing = count - len(chosen)
+        
+        if missing:
+            # The candidate has seen the whole pool: generate what is missing now
+            generated = generate(missing)
+            self._count(sync_generations=1)
+            with self.db.connection() as conn:
+                added = self._store(conn, bank_key, generated)
+            chosen += added[:missing]
+            pool_size += len(added)
+        
+        self._count(
+            draws=1,
+            pool_draws=int(not missing),
+            repeats_served=len(repeats)
+        )
+        
+        if pool_size < self.pool_target:
+            self._schedule_refill(bank_key, generate)
+        
+        random.shuffle(chosen)
+        return [{'question': row[1], 'expected_points': row[2], 'bank_id': row[0]} for row in chosen]
+    
+    def mark_served(self, user_id, question_ids):
+        """
+        Record drawn questions as served to a candidate
+        
+        Called once they are stored for a round, so questions drawn for a
+        round that never starts, or dropped as paraphrases, stay unseen.
+        """
+        if not question_ids:
+            return
+        
+        now = time.time()
+        with self.db.connection() as conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO question_bank_served (user_id, question_id, served_at)
+                VALUES (?, ?, ?)
+            ''', [(user_id, question_id, now) for question_id in question_ids])
+            conn.executemany('UPDATE question_bank SET served = served + 1 WHERE id = ?',
+                             [(question_id,) for question_id in question_ids])
+        self._count(questions_served=len(question_ids))
+    
+    def _schedule_refill(self, bank_key, generate):
+        """Queue a background top-up of a pool unless its refill policy says to wait"""
+        with self.db.connection() as conn:
+            row = conn.execute(
+                'SELECT failures, last_refill_at FROM question_bank_keys WHERE bank_key = ?', (bank_key,)
+            ).fetchone()
+        
+        failures, last_refill_at = row if row else (0, 0)
+        wait = min(self.refill_cooldown * 2 ** failures, MAX_REFILL_BACKOFF)
+        if time.time() - last_refill_at < wait:
+            return
+        
+        with self._lock:
+            if bank_key in self._refilling:
+                return
+            self._refilling.add(bank_key)
+        
+        self._executor.submit(self._refill, bank_key, generate)
+    
+    def _refill(self, bank_key, generate):
+        try:
+            questions = generate(self.refill_batch)
+            with self.db.connection() as conn:
+                added = self._store(conn, bank_key, questions)
+                conn.execute('''
+                    UPDATE question_bank_keys
+                    SET refills = refills + 1, failures = ?, last_refill_at = ?
+                    WHERE bank_key = ?
+                ''', (0 if added else 1, time.time(), bank_key))
+            
+            if added:
+                self._count(refills=1)
+            else:
+                self._count(refill_failures=1)
+        except Exception as e:
+            print(f"Error refilling question bank: {str(e)}")
+            self._count(refill_failures=1)
+            try:
+                with self.db.connection() as conn:
+                    conn.execute('''
+                        UPDATE question_bank_keys SET failures = failures + 1, last_refill_at = ?
+                        WHERE bank_key = ?
+                    ''', (time.time(), bank_key))
+            except Exception:
+                pass
+        finally:
+            with self._lock:
+                self._refilling.discard(bank_key)
+    
+    @staticmethod
+    def suggestion_key(job_role, job_description):
+        return f"{normalize(job_role)}|{description_hash(job_description)}"
+    
+    def get_suggestions(self, job_role, job_description):
+        """Cached suggested rounds for a role, or None"""
+        key = self.suggestion_key(job_role, job_description)
+        with self.db.connection() as conn:
+            row = conn.execute('''
+                SELECT rounds FROM round_suggestions WHERE suggestion_key = ? AND created_at > ?
+            ''', (key, time.time() - self.suggestion_ttl)).fetchone()
+            if row:
+                conn.execute('UPDATE round_suggestions SET uses = uses + 1 WHERE suggestion_key = ?', (key,))
+        
+        if not row:
+            self._count(suggestion_misses=1)
+            return None
+        self._count(suggestion_hits=1)
+        return json.loads(row[0])
+    
+    def put_suggestions(self, job_role, job_description, rounds):
+        try:
+            with self.db.connection() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO round_suggestions (suggestion_key, rounds, created_at, uses)
+                    VALUES (?, ?, ?, 0)
+                ''', (self.suggestion_key(job_role, job_description), json.dumps(rounds), time.time()))
+        except Exception as e:
+            print(f"Error caching round suggestions: {str(e)}")
+    
+    def get_stats(self):
+        """Draw and refill counters; llm_calls_per_draw is what the bank saves over generating every round"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['refills_in_flight'] = len(self._refilling)
+        
+        with self.db.connection() as conn:
+            stats['pools'], stats['pooled_questions'] = conn.execute(
+                'SELECT COUNT(DISTINCT bank_key), COUNT(*) FROM question_bank'
+            ).fetchone()
+        
+        draws = stats['draws']
+        llm_calls = stats['sync_generations'] + stats['refills'] + stats['refill_failures']
+        stats['llm_calls_per_draw'] = round(llm_calls / draws, 4) if draws else 0
+        stats['pool_hit_rate'] = round(stats['pool_draws'] / draws, 4) if draws else 0
+        lookups = stats['suggestion_hits'] + stats['suggestion_misses']
+        stats['suggestion_hit_rate'] = round(stats['suggestion_hits'] / lookups, 4) if lookups else 0
+        return stats
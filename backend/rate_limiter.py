@@ -0,0 +1,173 @@
+"""
+Rate Limiter Module
+In-memory token-bucket rate limiter driven by the RATE_LIMITS config
+Buckets live in lock-sharded dicts so checks never touch SQLite; a background
+thread snapshots changed buckets to the rate_limits table so limits survive restarts
+"""
+
+import atexit
+import threading
+import time
+import zlib
+from datetime import datetime
+
+
+class RateLimiter:
+    def __init__(self, database, limits, num_shards=16, flush_interval=30.0):
+        """
+        Args:
+            database: shared Database holding the rate_limits table
+            limits: endpoint -> {'requests': N, 'window': seconds}; must include 'default'
+            num_shards: independent lock/bucket partitions
+            flush_interval: seconds between snapshot flushes
+        """
+        self.db = database
+        self.limits = limits
+        self.flush_interval = flush_interval
+        
+        # Each shard: (lock, {(identifier, endpoint): [tokens, updated_at, dirty]})
+        self._shards = [(threading.Lock(), {}) for _ in range(num_shards)]
+        
+        self._stats_lock = threading.Lock()
+        self._stats = {'checks': 0, 'rejected': 0, 'check_ns': 0, 'flushes': 0, 'flushed_rows': 0, 'flush_ms': 0.0}
+        
+        self._stop = threading.Event()
+        self._flusher = None
+        
+        self._load()
+    
+    def _limit(self, endpoint):
+        """(capacity, refill rate in tokens per second) for an endpoint"""
+        config = self.limits.get(endpoint, self.limits['default'])
+        return config['requests'], config['requests'] / config['window']
+    
+    def _shard(self, key):
+        return self._shards[zlib.crc32(f'{key[0]}|{key[1]}'.encode()) % len(self._shards)]
+    
+    def check(self, identifier, endpoint='default'):
+        """
+        Take one token for identifier on endpoint
+        
+        Returns:
+            dict with 'allowed', 'limit', 'remaining', 'reset' (seconds until the
+            bucket is full again) and 'retry_after' (seconds until the next token)
+        """
+        started = time.perf_counter_ns()
+        capacity, rate = self._limit(endpoint)
+        key = (identifier, endpoint)
+        now = time.time()
+        
+        lock, buckets = self._shard(key)
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [float(capacity), now, True]
+            else:
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            
+            allowed = bucket[0] >= 1
+            if allowed:
+                bucket[0] -= 1
+                bucket[2] = True
+            tokens = bucket[0]
+        
+        with self._stats_lock:
+            self._stats['checks'] += 1
+            self._stats['rejected'] += int(not allowed)
+            self._stats['check_ns'] += time.perf_counter_ns() - started
+        
+        return {
+            'allowed': allowed,
+            'limit': capacity,
+            'remaining': int(tokens),
+            'reset': int((capacity - tokens) / rate + 0.999),
+            'retry_after': 0 if allowed else int((1 - tokens) / rate + 0.999)
+        }
+    
+    def _load(self):
+        """Restore bucket snapshots written by a previous process"""
+        try:
+            with self.db.connection() as conn:
+                rows = conn.execute('''
+                    SELECT identifier, endpoint, tokens, updated_at FROM rate_limits
+                    WHERE tokens IS NOT NULL
+                ''').fetchall()
+        except Exception as e:
+            print(f"Error loading rate limit snapshots: {str(e)}")
+            return
+        
+        for identifier, endpoint, tokens, updated_at in rows:
+            key = (identifier, endpoint)
+            lock, buckets = self._shard(key)
+            with lock:
+                buckets[key] = [tokens, updated_at, False]
+    
+    def flush(self):
+        """Write changed buckets to SQLite and drop buckets that have refilled completely"""
+        started = time.perf_counter()
+        now = time.time()
+        rows = []
+        
+        for lock, buckets in self._shards:
+            with lock:
+                for key, bucket in list(buckets.items()):
+                    capacity, rate = self._limit(key[1])
+                    tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                    
+                    if bucket[2]:
+                        rows.append((key[0], key[1], int(capacity - tokens), datetime.now().isoformat(), tokens, bucket[1]))
+                        bucket[2] = False
+                    elif tokens >= capacity:
+                        # A full bucket is the same as no bucket
+                        del buckets[key]
+        
+        if rows:
+            try:
+                with self.db.connection() as conn:
+                    conn.executemany('''
+                        INSERT INTO rate_limits (identifier, endpoint, request_count, window_start, tokens, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(identifier, endpoint) DO UPDATE SET
+                            request_count = excluded.request_count,
+                            window_start = excluded.window_start,
+                            tokens = excluded.tokens,
+                            updated_at = excluded.updated_at
+                    ''', rows)
+            except Exception as e:
+                print(f"Error flushing rate limits: {str(e)}")
+                return
+        
+        with self._stats_lock:
+            self._stats['flushes'] += 1
+            self._stats['flushed_rows'] += len(rows)
+            self._stats['flush_ms'] += (time.perf_counter() - started) * 1000
+    
+    def start(self):
+        """Start the periodic snapshot thread and flush once more at exit"""
+        if self._flusher:
+            return
+        
+        self._flusher = threading.Thread(target=self._flush_loop, name='rate-limit-flush', daemon=True)
+        self._flusher.start()
+        atexit.register(self.stop)
+    
+    def stop(self):
+        self._stop.set()
+        self.flush()
+    
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+    
+    def get_stats(self):
+        """Check counts, average check cost and flush activity"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        
+        check_ns = stats.pop('check_ns')
+        stats['avg_check_us'] = round(check_ns / stats['checks'] / 1000, 2) if stats['checks'] else 0
+        stats['flush_ms'] = round(stats['flush_ms'], 2)
+        stats['buckets'] = sum(len(buckets) for _, buckets in self._shards)
+        stats['shards'] = len(self._shards)
+        return stats
@@ -0,0 +1,192 @@
+"""
+Resume Condenser Module
+Local, rule-based shrinking of resume text before it goes into a prompt
+Lines are cleaned, deduplicated and grouped into sections; when the result is
+still over the token budget, the lines most relevant to the job role and focus
+areas are kept
+"""
+
+import re
+import threading
+import time
+
+
+# Section headings as they appear in resumes, keyed by the section they start
+SECTION_HEADINGS = {
+    'skills': ('skills', 'technical skills', 'key skills', 'core competencies', 'technologies',
+               'tech stack', 'tools', 'tools and technologies', 'languages and frameworks'),
+    'experience': ('experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'internships', 'internship'),
+    'projects': ('projects', 'personal projects', 'academic projects', 'key projects', 'side projects'),
+    'education': ('education', 'academic background', 'qualifications', 'certifications',
+                  'certificates', 'courses', 'coursework'),
+    'other': ('summary', 'profile', 'objective', 'career objective', 'about me', 'achievements',
+              'awards', 'publications', 'activities', 'extracurricular activities', 'interests',
+              'hobbies', 'languages', 'personal details', 'references', 'declaration', 'contact')
+}
+
+# Base weight of a line in each section when trimming to the budget
+SECTION_WEIGHTS = {'skills': 3, 'experience': 2, 'projects': 2, 'education': 1, 'other': 0}
+
+# Sections that carry nothing a technical question could be built on
+DROPPED_SECTIONS = ('hobbies', 'interests', 'personal details', 'references', 'declaration', 'contact')
+
+BOILERPLATE_PATTERNS = (
+    re.compile(r'^(curriculum vitae|resume|cv)$', re.IGNORECASE),
+    re.compile(r'^page \d+( of \d+)?$', re.IGNORECASE),
+    re.compile(r'references (are )?available (up)?on request', re.IGNORECASE),
+    re.compile(r'^i hereby declare', re.IGNORECASE),
+    re.compile(r'^[\w.+-]+@[\w-]+\.[\w.]+$'),  # bare email address
+    re.compile(r'^[+()\d\s-]{7,}$'),  # bare phone number
+    re.compile(r'^(https?://|www\.)\S+$', re.IGNORECASE)  # bare link
+)
+
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it', 'of',
+    'on', 'or', 'the', 'to', 'with', 'job', 'role', 'description', 'focus', 'areas', 'we',
+    'you', 'our', 'will', 'who', 'this', 'that', 'have', 'has'
+))
+
+
+def estimate_tokens(text):
+    """Rough token count for English prose (about four characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def _heading_key(line):
+    return re.sub(r'[^a-z ]', '', line.lower()).strip()
+
+
+class ResumeCondenser:
+    def __init__(self, token_budget=1000):
+        """
+        Args:
+            token_budget: estimated tokens the condensed resume may use in a prompt
+        """
+        self.token_budget = token_budget
+        
+        self._headings = {
+            heading: section
+            for section, headings in SECTION_HEADINGS.items()
+            for heading in headings
+        }
+        
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'trimmed': 0, 'tokens_in': 0, 'tokens_out': 0, 'condense_ms': 0.0}
+    
+    def _clean_lines(self, text):
+        """Normalized, non-boilerplate lines with repeats removed"""
+        seen = set()
+        lines = []
+        for raw in text.splitlines():
+            line = re.sub(r'\s+', ' ', raw).strip(' \t-*•●▪|')
+            if len(line) < 2 or any(pattern.search(line) for pattern in BOILERPLATE_PATTERNS):
+                continue
+            
+            key = line.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            lines.append(line)
+        return lines
+    
+    def _sections(self, lines):
+        """Split lines into (section, heading, lines) blocks in document order"""
+        blocks = [['other', None, []]]
+        for line in lines:
+            key = _heading_key(line)
+            if len(key.split()) <= 4 and key in self._headings:
+                blocks.append([self._headings[key], line.rstrip(':'), []])
+            else:
+                blocks[-1][2].append(line)
+        
+        return [
+            block for block in blocks
+            if block[2] and _heading_key(block[1] or '') not in DROPPED_SECTIONS
+        ]
+    
+    @staticmethod
+    def _terms(context):
+        return {
+            word for word in re.findall(r'[a-z][a-z0-9+#.]*', (context or '').lower())
+            if word not in STOPWORDS and len(word) > 1
+        }
+    
+    def condense(self, text, context=''):
+        """
+        Condense resume text to fit the token budget
+        
+        Args:
+            text: extracted resume text
+            context: job role, description and focus areas used to rank lines
+        
+        Returns:
+            (condensed_text, report) where report has 'tokens_before', 'tokens_after'
+            and 'reduction' (fraction of estimated tokens removed)
+        """
+        started = time.perf_counter()
+        tokens_before = estimate_tokens(text or '')
+        blocks = self._sections(self._clean_lines(text or ''))
+        
+        # Every line as (section index, line index, text), then keep the most
+        # relevant ones when the cleaned resume is still over budget
+        entries = [(b, i, line) for b, block in enumerate(blocks) for i, line in enumerate(block[2])]
+        total = sum(estimate_tokens(line) + 1 for _, _, line in entries)
+        headings = sum(estimate_tokens(block[1]) + 2 for block in blocks if block[1])
+        budget = self.token_budget - headings
+        trimmed = total > budget
+        
+        if trimmed:
+            terms = self._terms(context)
+            
+            def relevance(entry):
+                words = set(re.findall(r'[a-z][a-z0-9+#.]*', entry[2].lower()))
+                return SECTION_WEIGHTS[blocks[entry[0]][0]] + 2 * len(words & terms)
+            
+            kept = set()
+            used = 0
+            for entry in sorted(entries, key=lambda entry: (-relevance(entry), entry[0], entry[1])):
+                cost = estimate_tokens(entry[2]) + 1
+                if used + cost > budget:
+                    continue
+                kept.add(entry[:2])
+                used += cost
+            entries = [entry for entry in entries if entry[:2] in kept]
+        
+        output = []
+        current = None
+        for b, _, line in entries:
+            if b != current:
+                current = b
+                if blocks[b][1]:
+                    output.append(f"{blocks[b][1].upper()}:")
+            output.append(line)
+        
+        condensed = '\n'.join(output)
+        tokens_after = estimate_tokens(condensed)
+        report = {
+            'tokens_before': tokens_before,
+            'tokens_after': tokens_after,
+            'reduction': round(1 - tokens_after / tokens_before, 4) if tokens_before else 0
+        }
+        
+        with self._lock:
+            self._stats['calls'] += 1
+            self._stats['trimmed'] += int(trimmed)
+            self._stats['tokens_in'] += tokens_before
+            self._stats['tokens_out'] += tokens_after
+            self._stats['condense_ms'] += (time.perf_counter() - started) * 1000
+        return condensed, report
+    
+    def get_stats(self):
+        """Token reduction across every condensed resume"""
+        with self._lock:
+            stats = dict(self._stats)
+        
+        calls = stats['calls']
+        stats['token_budget'] = self.token_budget
+        stats['avg_tokens_in'] = round(stats['tokens_in'] / calls) if calls else 0
+        stats['avg_tokens_out'] = round(stats['tokens_out'] / calls) if calls else 0
+        stats['reduction'] = round(1 - stats['tokens_out'] / stats['tokens_in'], 4) if stats['tokens_in'] else 0
+        stats['avg_condense_ms'] = round(stats.pop('condense_ms') / calls, 2) if calls else 0
+        return stats
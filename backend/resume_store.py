@@ -0,0 +1,216 @@
+"""
+Resume Store Module
+Content-addressed storage for uploaded resumes
+Uploads are hashed with SHA-256 while they stream to disk, so identical files are
+stored once; extracted text is kept per file hash and generated question sets per
+(resume hash, interview context hash), so a repeated upload skips PDF parsing and
+question generation
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from werkzeug.utils import secure_filename
+
+
+# How generated question sets are shared between uploads of the same resume
+REUSE_POLICIES = ('never', 'same_user', 'always')
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ResumeStore:
+    def __init__(self, database, upload_folder, reuse_policy='same_user', question_set_ttl=604800):
+        """
+        Args:
+            database: shared Database holding the resume_files and question_sets tables
+            upload_folder: directory resumes are stored under
+            reuse_policy: one of REUSE_POLICIES; 'same_user' only hands a cached
+                question set back to the user it was generated for
+            question_set_ttl: seconds a cached question set stays reusable
+        """
+        if reuse_policy not in REUSE_POLICIES:
+            raise ValueError(f"Unknown question set reuse policy: {reuse_policy}")
+        
+        self.db = database
+        self.folder = os.path.join(upload_folder, 'resumes')
+        self.reuse_policy = reuse_policy
+        self.question_set_ttl = question_set_ttl
+        
+        self._lock = threading.Lock()
+        self._stats = {
+            'uploads': 0,
+            'duplicate_files': 0,
+            'bytes_deduplicated': 0,
+            'hash_ms': 0.0,
+            'text_hits': 0,
+            'text_misses': 0,
+            'question_set_hits': 0,
+            'question_set_misses': 0
+        }
+        
+        os.makedirs(self.folder, exist_ok=True)
+        self._init_tables()
+    
+    def _init_tables(self):
+        with self.db.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS resume_files (
+                    content_hash TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    text TEXT,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS question_sets (
+                    resume_hash TEXT NOT NULL,
+                    context_hash TEXT NOT NULL,
+                    owner_id INTEGER NOT NULL,
+                    questions TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    uses INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (resume_hash, context_hash, owner_id)
+                )
+            ''')
+    
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+    
+    def save(self, file_storage):
+        """
+        Stream an uploaded file to disk, hashing it on the way
+        
+        Args:
+            file_storage: werkzeug FileStorage from request.files
+        
+        Returns:
+            (content_hash, path); path is shared by every upload of the same content
+        """
+        started = time.perf_counter()
+        digest = hashlib.sha256()
+        size = 0
+        
+        fd, temp_path = tempfile.mkstemp(dir=self.folder, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = file_storage.stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        
+        content_hash = digest.hexdigest()
+        extension = os.path.splitext(secure_filename(file_storage.filename or ''))[1].lower() or '.pdf'
+        path = os.path.join(self.folder, f"{content_hash}{extension}")
+        
+        if os.path.exists(path):
+            os.unlink(temp_path)
+            self._count('duplicate_files')
+            self._count('bytes_deduplicated', size)
+        else:
+            os.replace(temp_path, path)
+        
+        with self.db.connection() as conn:
+            conn.execute('''
+                INSERT OR IGNORE INTO resume_files (content_hash, path, size, created_at)
+                VALUES (?, ?, ?, ?)
+            ''', (content_hash, path, size, time.time()))
+        
+        self._count('uploads')
+        self._count('hash_ms', (time.perf_counter() - started) * 1000)
+        return content_hash, path
+    
+    def get_text(self, content_hash, path, extract):
+        """
+        Extracted text for a stored file, running extract(path) only the first time
+        
+        Args:
+            content_hash: hash returned by save()
+            path: path returned by save()
+            extract: callable turning a file path into text
+        """
+        with self.db.connection() as conn:
+            row = conn.execute('SELECT text FROM resume_files WHERE content_hash = ?', (content_hash,)).fetchone()
+        if row and row[0] is not None:
+            self._count('text_hits')
+            return row[0]
+        
+        self._count('text_misses')
+        text = extract(path)
+        with self.db.connection() as conn:
+            conn.execute('UPDATE resume_files SET text = ? WHERE content_hash = ?', (text, content_hash))
+        return text
+    
+    @staticmethod
+    def context_hash(version, **context):
+        """Hash of the interview context a question set was generated for"""
+        normalized = {
+            key: re.sub(r'\s+', ' ', value or '').strip().lower()
+            for key, value in context.items()
+        }
+        payload = json.dumps({'version': version, 'context': normalized}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _owner(self, user_id):
+        return user_id if self.reuse_policy == 'same_user' else 0
+    
+    def get_question_set(self, resume_hash, context_hash, user_id):
+        """Cached question set for this resume and context, or None under the reuse policy"""
+        if self.reuse_policy == 'never':
+            return None
+        
+        with self.db.connection() as conn:
+            row = conn.execute('''
+                SELECT questions FROM question_sets
+                WHERE resume_hash = ? AND context_hash = ? AND owner_id = ? AND created_at > ?
+            ''', (resume_hash, context_hash, self._owner(user_id), time.time() - self.question_set_ttl)).fetchone()
+            
+            if not row:
+                self._count('question_set_misses')
+                return None
+            
+            conn.execute('''
+                UPDATE question_sets SET uses = uses + 1
+                WHERE resume_hash = ? AND context_hash = ? AND owner_id = ?
+            ''', (resume_hash, context_hash, self._owner(user_id)))
+        
+        self._count('question_set_hits')
+        return json.loads(row[0])
+    
+    def put_question_set(self, resume_hash, context_hash, user_id, questions):
+        """Store a freshly generated question set, replacing any expired one"""
+        if self.reuse_policy == 'never':
+            return
+        
+        try:
+            with self.db.connection() as conn:
+                conn.execute('''
+                    INSERT OR REPLACE INTO question_sets (resume_hash, context_hash, owner_id, questions, created_at, uses)
+                    VALUES (?, ?, ?, ?, ?, 0)
+                ''', (resume_hash, context_hash, self._owner(user_id), json.dumps(questions), time.time()))
+        except Exception as e:
+            print(f"Error caching question set: {str(e)}")
+    
+    def get_stats(self):
+        """Upload, deduplication and cache counters"""
+        with self._lock:
+            stats = dict(self._stats)
+        
+        stats['reuse_policy'] = self.reuse_policy
+        stats['avg_hash_ms'] = round(stats.pop('hash_ms') / stats['uploads'], 2) if stats['uploads'] else 0
+        lookups = stats['question_set_hits'] + stats['question_set_misses']
+        stats['question_set_hit_rate'] = round(stats['question_set_hits'] / lookups, 4) if lookups else 0
+        return stats
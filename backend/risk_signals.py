@@ -0,0 +1,151 @@
+"""
+Risk Signals Module
+Per-user sliding-window counters behind check_suspicious_activity
+Updated as audit events are logged, so scoring a login is a few dict
+lookups instead of scans over audit_logs
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+
+
+class RiskSignalStore:
+    def __init__(self, database, failed_login_window=3600, activity_window=300,
+                 recent_ip_count=5, max_events=1000):
+        """
+        Args:
+            database: shared Database holding audit_logs, used by rebuild()
+            failed_login_window: seconds failed logins are counted for
+            activity_window: seconds actions are counted for
+            recent_ip_count: distinct successful-login IPs remembered per user
+            max_events: cap on timestamps kept per window; counts saturate at this value
+        """
+        self.db = database
+        self.failed_login_window = failed_login_window
+        self.activity_window = activity_window
+        self.recent_ip_count = recent_ip_count
+        self.max_events = max_events
+        
+        self._lock = threading.Lock()
+        self._failed_logins = {}  # user_id -> deque of timestamps
+        self._actions = {}  # user_id -> deque of timestamps
+        self._recent_ips = {}  # user_id -> OrderedDict of ip -> None, most recent last
+        self._stats = {'recorded': 0, 'lookups': 0, 'rebuilds': 0, 'rebuild_ms': 0.0, 'rebuilt_events': 0}
+    
+    def record(self, user_id, action, ip_address=None, timestamp=None):
+        """Update the counters for one audit event"""
+        if user_id is None:
+            return
+        
+        timestamp = timestamp or time.time()
+        with self._lock:
+            self._record(user_id, action, ip_address, timestamp)
+            self._stats['recorded'] += 1
+    
+    def _record(self, user_id, action, ip_address, timestamp):
+        """Apply one event (caller holds the lock)"""
+        self._append(self._actions, user_id, timestamp)
+        
+        if action == 'login_failed':
+            self._append(self._failed_logins, user_id, timestamp)
+        elif action == 'login_success' and ip_address:
+            self._record_ip(user_id, ip_address)
+    
+    def _record_ip(self, user_id, ip_address):
+        ips = self._recent_ips.setdefault(user_id, OrderedDict())
+        ips[ip_address] = None
+        ips.move_to_end(ip_address)
+        while len(ips) > self.recent_ip_count:
+            ips.popitem(last=False)
+    
+    def _append(self, windows, user_id, timestamp):
+        events = windows.get(user_id)
+        if events is None:
+            events = windows[user_id] = deque(maxlen=self.max_events)
+        events.append(timestamp)
+    
+    def _count(self, windows, user_id, window_seconds):
+        """Count events inside the window, dropping expired ones (caller holds the lock)"""
+        events = windows.get(user_id)
+        if not events:
+            return 0
+        
+        cutoff = time.time() - window_seconds
+        while events and events[0] <= cutoff:
+            events.popleft()
+        if not events:
+            del windows[user_id]
+            return 0
+        return len(events)
+    
+    def get_signals(self, user_id):
+        """
+        Current risk signals for a user
+        
+        Returns:
+            dict with 'failed_logins' (last failed_login_window seconds),
+            'recent_actions' (last activity_window seconds) and 'recent_ips'
+        """
+        with self._lock:
+            self._stats['lookups'] += 1
+            return {
+                'failed_logins': self._count(self._failed_logins, user_id, self.failed_login_window),
+                'recent_actions': self._count(self._actions, user_id, self.activity_window),
+                'recent_ips': list(self._recent_ips.get(user_id, ()))
+            }
+    
+    def rebuild(self):
+        """Reload every counter from audit_logs, e.g. after a restart"""
+        started = time.perf_counter()
+        longest_window = max(self.failed_login_window, self.activity_window)
+        
+        with self.db.connection() as conn:
+            windowed = conn.execute('''
+                SELECT user_id, action, ip_address, timestamp FROM audit_logs
+                WHERE user_id IS NOT NULL AND timestamp > datetime('now', ?)
+                ORDER BY timestamp, id
+            ''', (f'-{int(longest_window)} seconds',)).fetchall()
+            
+            # Most recent successful-login IPs per user, oldest first
+            logins = conn.execute('''
+                SELECT user_id, ip_address, MAX(timestamp) AS last_seen FROM audit_logs
+                WHERE action = 'login_success' AND user_id IS NOT NULL AND ip_address IS NOT NULL
+                GROUP BY user_id, ip_address
+                ORDER BY last_seen
+            ''').fetchall()
+        
+        with self._lock:
+            self._failed_logins, self._actions, self._recent_ips = {}, {}, {}
+            
+            now = time.time()
+            for user_id, action, ip_address, timestamp in windowed:
+                event_time = self._parse_timestamp(timestamp, now)
+                if now - event_time <= self.activity_window:
+                    self._append(self._actions, user_id, event_time)
+                if action == 'login_failed' and now - event_time <= self.failed_login_window:
+                    self._append(self._failed_logins, user_id, event_time)
+            
+            for user_id, ip_address, _ in logins:
+                self._record_ip(user_id, ip_address)
+            
+            self._stats['rebuilds'] += 1
+            self._stats['rebuilt_events'] = len(windowed) + len(logins)
+            self._stats['rebuild_ms'] = (time.perf_counter() - started) * 1000
+    
+    @staticmethod
+    def _parse_timestamp(value, default):
+        """audit_logs timestamps are UTC 'YYYY-MM-DD HH:MM:SS' strings"""
+        try:
+            return datetime.strptime(value[:19], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc).timestamp()
+        except (TypeError, ValueError):
+            return default
+    
+    def get_stats(self):
+        """Tracked users and update/lookup counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['tracked_users'] = len(set(self._actions) | set(self._failed_logins) | set(self._recent_ips))
+        stats['rebuild_ms'] = round(stats['rebuild_ms'], 2)
+        return stats
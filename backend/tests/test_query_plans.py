@@ -0,0 +1,62 @@
+"""
+Hot query plan tests
+Every query in query_plans.HOT_QUERIES must be answered through an index on the
+app's real schema, and must still appear in the backend source. Run from the
+backend directory:
+
+    python -m pytest tests
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from query_plans import FULL_READ_QUERIES, HOT_QUERIES, check_query_plans  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def conn(tmp_path_factory):
+    """
+    Connection to a database with the app's full schema and managed indexes
+    
+    The schema is created by importing app, which builds interview_system.db
+    in the working directory, so the import runs in an empty temp directory.
+    """
+    directory = tmp_path_factory.mktemp('schema')
+    os.environ.setdefault('GROQ_API_KEY', 'test')
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        import app  # noqa: F401
+    finally:
+        os.chdir(cwd)
+    
+    connection = sqlite3.connect(str(directory / 'interview_system.db'))
+    yield connection
+    connection.close()
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(conn, name):
+    result = check_query_plans(conn, {name: HOT_QUERIES[name]})[0]
+    assert not result['full_scans'], f"{name} scans a whole table: {'; '.join(result['plan'])}"
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_is_in_source(conn, name):
+    result = check_query_plans(conn, {name: HOT_QUERIES[name]})[0]
+    assert result['in_source'], f"{name} no longer appears in the backend source"
+
+
+def test_full_scan_is_reported(conn):
+    result = check_query_plans(conn, {'unindexed': 'SELECT id FROM audit_logs WHERE details = ?'})[0]
+    assert result['full_scans'] == ['SCAN audit_logs']
+
+
+def test_full_reads_are_hot_queries():
+    assert FULL_READ_QUERIES <= set(HOT_QUERIES)
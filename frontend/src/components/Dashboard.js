@@ -872,8 +872,27 @@ function Dashboard() {
       });
       const data = await response.json();
       if(response.ok) {
+        let uploadedQuestions = data.questions;
+        
+        // 202: questions are generated by a background job; poll it until it finishes
+        if (response.status === 202) {
+          let job = { status: data.status };
+          while (job.status === 'queued' || job.status === 'running') {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            const jobResponse = await fetch(`http://127.0.0.1:5000${data.status_url}`, {
+              headers: { 'Authorization': `Bearer ${token}` }
+            });
+            job = await jobResponse.json();
+          }
+          if (job.status !== 'completed') {
+            alert('Error uploading resume: ' + (job.error || 'Question generation failed'));
+            return;
+          }
+          uploadedQuestions = job.result.questions;
+        }
+        
         setInterviewId(data.interview_id);
-        setQuestions(data.questions);
+        setQuestions(uploadedQuestions);
         setSection('interview');
         startInterviewTimer();
         startQuestionTimer(300);
@@ -75,11 +75,22 @@ function Signup() {
       const data = await response.json();
       
       if(response.ok) {
-        // Display TOTP setup screen
+        // Display TOTP setup screen; the QR code is rendered by a separate request
         setTotpSetupData({
           secret: data.totp_secret,
-          qrCode: data.qr_code
+          qrCode: null
         });
+        
+        const qrResponse = await fetch(`http://127.0.0.1:5000${data.qr_url}`, {
+          headers: { 'Authorization': `Bearer ${data.totp_setup_token}` }
+        });
+        if (qrResponse.ok) {
+          const qrData = await qrResponse.json();
+          setTotpSetupData({
+            secret: data.totp_secret,
+            qrCode: qrData.qr_code
+          });
+        }
       } else {
         alert('Registration failed: ' + sanitizeInput(data.error));
       }
@@ -132,11 +143,15 @@ function Signup() {
         <h4 className="form-title">Set Up Two-Factor Authentication</h4>
         <div className="totp-setup">
           <p>Please scan this QR code with Google Authenticator app:</p>
-          <img 
-            src={`data:image/png;base64,${totpSetupData.qrCode}`} 
-            alt="QR Code for Google Authenticator" 
-            className="qr-code"
-          />
+          {totpSetupData.qrCode ? (
+            <img 
+              src={`data:image/png;base64,${totpSetupData.qrCode}`} 
+              alt="QR Code for Google Authenticator" 
+              className="qr-code"
+            />
+          ) : (
+            <p>Loading QR code...</p>
+          )}
           <p>Or manually enter this code in your authenticator app:</p>
           <div className="secret-key">{totpSetupData.secret}</div>
           